@@ -5,23 +5,67 @@ Backed by local SQLite (wfm_data.db) populated from
 `Final_Revenue_Mapping_Cursor.xlsx` via `import_data.py`.
 """
 
+import atexit
+import hashlib
+import hmac
 import io
 import os
-import sqlite3
+import tempfile
+import time
 from datetime import datetime
 from functools import wraps
 from urllib.parse import unquote
-from flask import Flask, render_template, jsonify, request, send_file, session, redirect, url_for
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from flask import Flask, g, render_template, jsonify, request, send_file, session, redirect, url_for
+
+import grr_engine
+import request_metrics
+import request_profiler
+from datastore import DB_PATH, ConnectionPool, ResultCache, data_last_modified, data_version
+from grr_slices import REVENUE_BANDS, SliceError, band_sql, parse_slice, slice_where
+from hcr_facets import FACETS, active_filters, facet_counts, facet_values, top_values
+from hcr_search import has_hcr_fts, indexable, match_subquery
+from pagination import (PageError, decode_cursor, encode_cursor, keyset_clause, order_by, parse_fields,
+                        parse_format, parse_limit, parse_sort)
+from responses import CODINGS, EncodedJSON, FastJSONProvider, negotiate
+from rollups import ACCOUNT_BASE, cohort_select, headline_select, rollup_rows
+from sql_profiler import DEFAULT_DIR as SQL_PROFILE_DIR, SqlProfiler
+from xlsx_export import XLSX_MIMETYPE, ExportCache, render_team_xlsx, stored_export
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+request_metrics.install(app)  # first, so its timing wraps every other hook
+# ?_profile=1 / X-Profile: 1 on an authenticated request → cProfile capture,
+# listed at /api/profiles (see request_profiler.py)
+PROFILES = request_profiler.ProfileStore(
+    os.environ.get("RG_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "rg_profiles")),
+    keep=int(os.environ.get("RG_PROFILE_KEEP", "50")),
+)
+request_profiler.install(app, PROFILES)
 app.secret_key = os.environ.get("RG_SECRET_KEY", "rategain-revenue-dashboard-FY25-26-secret-key")
 # Password gate. Override at deploy time via env var.
 #   DASHBOARD_PASSWORD=mypassword python3 app.py
 DASHBOARD_PASSWORD = os.environ.get("DASHBOARD_PASSWORD", "rategain2026")
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wfm_data.db")
+# Process-wide result cache for the read-only /api endpoints (see datastore.py).
+RESULT_CACHE = ResultCache(maxsize=int(os.environ.get("RG_CACHE_SIZE", "256")))
+# Reused read-only SQLite handles — at most RG_DB_POOL_SIZE kept idle.
+DB_POOL = ConnectionPool(DB_PATH, maxsize=int(os.environ.get("RG_DB_POOL_SIZE", "8")))
+# .xlsx exports rendered on first download, one per (data version, manager), when
+# the DB has no pre-rendered ones (xlsx_export.stored_export) — in a per-process
+# subdirectory of RG_EXPORT_CACHE_DIR, or in memory if it isn't writable.
+EXPORT_CACHE = ExportCache(
+    os.environ.get("RG_EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rg_xlsx_cache")),
+    max_bytes=int(os.environ.get("RG_EXPORT_CACHE_MB", "64")) * 1024 * 1024,
+)
+# Lets a Prometheus scraper read /api/metrics without a session:
+#   Authorization: Bearer $RG_METRICS_TOKEN   (unset = session only)
+METRICS_TOKEN = os.environ.get("RG_METRICS_TOKEN", "")
+# Opt-in per-statement SQL profile + slow-query log (see sql_profiler.py);
+# `python sql_profiler.py` ranks what it recorded.
+SQL_PROFILER = None
+if os.environ.get("RG_SQL_PROFILE", "0") != "0":
+    SQL_PROFILER = SqlProfiler(os.environ.get("RG_SQL_PROFILE_DIR", SQL_PROFILE_DIR),
+                               slow_ms=float(os.environ.get("RG_SQL_SLOW_MS", "50")))
+    atexit.register(SQL_PROFILER.flush)
 
 
 # ─── Auth decorator ───
@@ -34,6 +78,92 @@ def login_required(f):
     return wrapper
 
 
+def _request_etag(version: str, kwargs: dict) -> str:
+    """Strong ETag for a versioned response: data version + endpoint + params."""
+    raw = "|".join([
+        version,
+        request.endpoint or "",
+        repr(sorted(kwargs.items())),
+        repr(sorted(request.args.items(multi=True))),
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _not_modified(etag: str, last_modified) -> str | None:
+    """The validator a conditional request matched (`etag` or one of its
+    -gzip / -br variants), or None when the full response is needed."""
+    if request.if_none_match:
+        return next((tag for tag in [etag] + [f"{etag}-{c}" for c in CODINGS]
+                     if request.if_none_match.contains(tag)), None)
+    if request.if_modified_since and last_modified is not None:
+        if last_modified.replace(microsecond=0) <= request.if_modified_since:
+            return etag
+    return None
+
+
+def _set_validators(resp, etag: str, last_modified):
+    resp.set_etag(etag)
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    # Authenticated data: only the browser may keep it, and must revalidate.
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+def cached_json(view):
+    """Serve a view's payload from RESULT_CACHE, keyed by endpoint + URL args +
+    query string. The view returns a plain dict/list; anything else (e.g. a
+    404 tuple) is passed through uncached.
+
+    The cache holds the serialized JSON (see responses.py), not the payload:
+    each response is encoded once, and gzip / brotli-compressed once per
+    coding a client accepts, then served as stored bytes.
+
+    Responses carry a strong ETag + Last-Modified tied to the data version, and
+    a matching If-None-Match / If-Modified-Since is answered with 304 before
+    the view (or SQLite) is touched at all. Compressed responses get the
+    coding appended to the ETag, since their bytes differ.
+    """
+    def encode(*args, **kwargs):
+        payload = view(*args, **kwargs)
+        return EncodedJSON(payload) if isinstance(payload, (dict, list)) else payload
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        profiling = request_profiler.capturing()  # profile the real work, not a cache hit
+        version = data_version()
+        if version is not None:
+            etag = _request_etag(version, kwargs)
+            last_modified = data_last_modified()
+            matched = None if profiling else _not_modified(etag, last_modified)
+            if matched:
+                return _set_validators(app.response_class(status=304), matched, last_modified)
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True))),
+        )
+        if profiling:
+            encoded = encode(*args, **kwargs)
+        else:
+            encoded = RESULT_CACHE.get_or_compute(
+                key,
+                lambda: encode(*args, **kwargs),
+                cacheable=lambda v: isinstance(v, EncodedJSON),
+            )
+        if not isinstance(encoded, EncodedJSON):
+            return encoded
+        body, coding = encoded.encoded(negotiate(request.accept_encodings))
+        resp = app.response_class(body, mimetype="application/json")
+        resp.vary.add("Accept-Encoding")
+        if coding:
+            resp.content_encoding = coding
+        if version is not None:
+            _set_validators(resp, f"{etag}-{coding}" if coding else etag, last_modified)
+        return resp
+    return wrapper
+
+
 @app.before_request
 def gate():
     """Require password for everything except the login flow + static assets.
@@ -42,6 +172,9 @@ def gate():
     """
     if request.endpoint in ("login", "logout", "static") or session.get("authed"):
         return
+    if request.endpoint == "api_metrics" and METRICS_TOKEN and hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        return
     if request.path.startswith("/api/"):
         return jsonify({"error": "Not authenticated", "login_url": url_for("login")}), 401
     return redirect(url_for("login", next=request.path))
@@ -70,6 +203,51 @@ def api_health():
     return jsonify(info)
 
 
+@app.route("/api/cache/stats")
+def api_cache_stats():
+    """Hit/miss counters for the version-keyed result cache, DB pool and export cache."""
+    return jsonify({
+        "data_version": data_version(),
+        **RESULT_CACHE.stats(),
+        "db_pool":      DB_POOL.stats(),
+        "exports":      EXPORT_CACHE.stats(),
+    })
+
+
+@app.route("/api/metrics")
+def api_metrics():
+    """Per-endpoint latency histograms and sampled phase timings (see
+    request_metrics.py) — Prometheus text by default, ?format=json for JSON."""
+    if request.args.get("format") == "json":
+        return jsonify(request_metrics.REGISTRY.snapshot())
+    return app.response_class(request_metrics.REGISTRY.prometheus(),
+                              mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/profiles")
+def api_profiles():
+    """Index of captured request profiles, newest first (see request_profiler.py)."""
+    return jsonify({"profiles": PROFILES.index(), "formats": sorted(request_profiler.FORMATS)})
+
+
+@app.route("/api/profiles/<capture_id>.<fmt>")
+def api_profile_file(capture_id: str, fmt: str):
+    """One captured profile as pstats, collapsed stacks (flamegraph) or text."""
+    path = PROFILES.path(capture_id, fmt)
+    if path is None:
+        return jsonify({"error": f"No profile '{capture_id}.{fmt}'"}), 404
+    return send_file(path, mimetype=request_profiler.FORMATS[fmt], as_attachment=fmt == "pstats",
+                     download_name=f"{capture_id}.{fmt}")
+
+
+@app.route("/api/sql/profile")
+def api_sql_profile():
+    """This process's per-statement SQL profile (RG_SQL_PROFILE=1, see sql_profiler.py)."""
+    if SQL_PROFILER is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **SQL_PROFILER.snapshot()})
+
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     error = None
@@ -100,17 +278,61 @@ MANAGER_TABS = [
 
 
 def get_db():
-    """Open SQLite in read-only mode via URI so Vercel's read-only filesystem
-    won't trigger a journal-file write attempt (which silently hangs).
-    Falls back to a normal connection in dev if the URI form isn't supported.
+    """Check out a pooled read-only connection for the current request.
+
+    Opened in read-only mode via URI so Vercel's read-only filesystem won't
+    trigger a journal-file write attempt (which silently hangs). The same
+    handle is returned for repeated calls within one request; handlers may
+    still call conn.close() — the connection goes back to the pool when the
+    app context tears down.
     """
-    try:
-        # Use the URI form so we can pass mode=ro explicitly
-        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=5)
-    except sqlite3.OperationalError:
-        conn = sqlite3.connect(DB_PATH, timeout=5)
-    conn.row_factory = sqlite3.Row
-    return conn
+    if "db" not in g:
+        t0 = time.perf_counter()
+        for _ in range(3):
+            version = data_version()
+            conn = DB_POOL.acquire()
+            if data_version() == version:
+                break
+            DB_POOL.release(conn)  # an import swapped the file mid-checkout: take a fresh handle
+        conn.snapshot_version = version  # the version this handle reads (see snapshot_cached)
+        g.db = conn
+        g.db.metrics = request_metrics.current()  # SQL timing for sampled requests
+        if SQL_PROFILER is not None:
+            SQL_PROFILER.attach(g.db)
+        request_metrics.record("db", t0)
+    return g.db
+
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        DB_POOL.release(conn)
+
+
+# Data version the process last served — see follow_snapshot().
+_snapshot = {"version": None}
+
+
+@app.before_request
+def follow_snapshot():
+    """Hot reload after an import.
+
+    import_data.py publishes a new wfm_data.db with os.replace(), so the first
+    request to see the new data version retires the idle pooled handles on the
+    old file; RESULT_CACHE and EXPORT_CACHE flush themselves on the version
+    change. Requests already in flight keep reading the old file
+    (still open, so still readable) until they release their connection.
+    """
+    version = data_version()
+    previous = _snapshot["version"]
+    if version == previous:
+        return
+    _snapshot["version"] = version
+    if previous is None:
+        return
+    closed = DB_POOL.prune()
+    print(f"✓ Switched to data version {version} (was {previous}; closed {closed} stale connection(s))")
 
 
 @app.route("/")
@@ -118,141 +340,313 @@ def index():
     return render_template("dashboard.html", manager_tabs=MANAGER_TABS)
 
 
+# ─────────────────────────── Paginated lists ───────────────────────────
+def snapshot_cached(conn, key, compute):
+    """RESULT_CACHE lookup for a value computed on the request's `conn`.
+
+    The handle keeps reading the file it was opened on, so the entry is
+    pinned to that file's data version: if an import swapped in a new file
+    mid-request, the value is computed but not cached under the new version.
+    """
+    return RESULT_CACHE.get_or_compute(key, compute, version=conn.snapshot_version)
+
+
+def cached_count(key, conn, sql: str, params: list) -> int:
+    """COUNT(*) for a filter combination, computed once per data version
+    (every page of the same listing shares it)."""
+    return snapshot_cached(conn, ("count",) + key, lambda: conn.execute(sql, params).fetchone()[0])
+
+
+def table_columns(conn, table: str) -> list[str]:
+    return snapshot_cached(
+        conn, ("columns", table), lambda: [r[1] for r in conn.execute(f"PRAGMA table_info({table})")])
+
+
+def select_fields(fields: list[str], table: str, computed: dict) -> str:
+    """SELECT list for projected `fields` (computed ones by their SQL expression)."""
+    return ", ".join(f"{computed[f]} AS {f}" if f in computed else f"{table}.{f}" for f in fields)
+
+
+def keyset_rows(conn, select: str, from_sql: str, where: list, params: list,
+                keys: list, limit: int | None, after: str | None, sort: str,
+                with_sql: str = "", columnar: bool = False) -> dict | list:
+    """Rows of `{with_sql} SELECT {select} {from_sql} WHERE … ORDER BY keys`.
+
+    Without a limit this is the legacy plain list. With one it's a page
+    {rows, limit, sort, next}, where `next` is the `after` token for the
+    following page (None on the last one). `columnar` (format=columns) sends
+    {columns, rows: [[…]]} instead of a list of objects, i.e. the SQLite
+    tuples as they come.
+    """
+    where, params = list(where), list(params)
+    if after:
+        clause, key_params = keyset_clause(keys, decode_cursor(after, sort, len(keys)))
+        where.append(clause)
+        params.extend(key_params)
+    # The sort keys ride along after the output columns only when a `next`
+    # token has to be built from the last row
+    key_cols = "".join(f", {expr} AS _k{i}" for i, (expr, _) in enumerate(keys)) if limit is not None else ""
+    sql = (f"{with_sql} SELECT {select}{key_cols} {from_sql} "
+           f"WHERE {' AND '.join(where)} ORDER BY {order_by(keys)}")
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples
+    rows = cur.execute(sql, params).fetchall()
+    names = [d[0] for d in cur.description]
+    width = len(names) - (len(keys) if key_cols else 0)
+
+    def public(page):
+        columns = names[:width]
+        if key_cols:
+            page = [r[:width] for r in page]
+        return {"columns": columns, "rows": page} if columnar else [dict(zip(columns, r)) for r in page]
+
+    if limit is None:
+        return public(rows)
+    page, more = rows[:limit], len(rows) > limit
+    out = public(page)
+    if not columnar:
+        out = {"rows": out}
+    return {
+        **out,
+        "limit": limit,
+        "sort":  sort,
+        "next":  encode_cursor(sort, list(page[-1][width:])) if more else None,
+    }
+
+
 # ─────────────────────────── Revenue HCR ───────────────────────────
+# sort= whitelist — each has a matching (column, full_name) index (see
+# import_data.INDEXES); ties are broken by name, then row_order
+HCR_SORTS = {"full_name", "employee_id", "doj", "status", "manager_name",
+             "division", "designation", "leader"}
+# Free-text columns left out of the default ("lite") field set
+HCR_REMARKS = ("q4_remarks_hr", "q4_remarks", "q3_remarks_aditi")
+
+
 @app.route("/api/hcr")
+@cached_json
 def api_hcr():
-    conn = get_db()
-    status = request.args.get("status", "")
-    manager = request.args.get("manager", "")
-    division = request.args.get("division", "")
-    leader = request.args.get("leader", "")
+    """Roster rows, filtered by any FACETS parameter (status, manager, …) and ?q=.
+
+    Plain list by default; `?limit=N` (then `&after=<next>`) returns keyset
+    pages with a `total`. `sort=<col>` or `sort=-<col>` picks the order from
+    HCR_SORTS (default: full_name, or relevance when searching). `q` is one
+    phrase matched as a substring ("sales ind" ≠ "sales" and "ind"). `fields=`
+    picks columns (default: all but the remarks, see HCR_REMARKS), and
+    `format=columns` sends {columns, rows: [[…]]} instead of objects.
+    """
+    filters = active_filters(request.args)
     search = request.args.get("q", "")
+    after = request.args.get("after") or None
+    try:
+        limit = parse_limit(request.args.get("limit"), after)
+        sort, desc = parse_sort(request.args.get("sort"), HCR_SORTS | ({"relevance"} if search else set()),
+                                "relevance" if search else "full_name")
+        columnar = parse_format(request.args.get("format"))
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
+    conn = get_db()
+    columns = table_columns(conn, "revenue_hcr")
+    try:
+        fields = parse_fields(request.args.get("fields"), columns,
+                              [c for c in columns if c not in HCR_REMARKS])
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
+
+    where = ["1=1"] + [f"{FACETS[name]} = ?" for name in filters]
+    params: list = list(filters.values())
+
+    # ?q= goes through the FTS5 index when present; hits ranked by relevance
+    from_sql = "FROM revenue_hcr"
+    match_sql, match_params = match_subquery(search, fts=has_hcr_fts(conn))
+    if match_sql:
+        from_sql += f" JOIN ({match_sql}) m ON m.hit_id = revenue_hcr.row_order"
+        params = match_params + params
+
+    if sort == "relevance":
+        keys = [("m.score", False), ("full_name", False), ("revenue_hcr.row_order", False)]
+    else:
+        keys = [(sort, desc)] + ([("full_name", desc)] if sort != "full_name" else []) \
+            + [("revenue_hcr.row_order", desc)]
+    label = f"-{sort}" if desc else sort
+    try:
+        result = keyset_rows(conn, select_fields(fields, "revenue_hcr", {}), from_sql, where, params, keys, limit, after,
+                             label, columnar=columnar)
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit is not None:
+        result["total"] = cached_count(
+            ("hcr", tuple(filters.items()), search), conn, f"SELECT COUNT(*) {from_sql} WHERE {' AND '.join(where)}", params)
+    conn.close()
+    return result
 
-    where = ["1=1"]
-    params: list = []
-    if status:
-        where.append("status = ?")
-        params.append(status)
-    if manager:
-        where.append("manager_name = ?")
-        params.append(manager)
-    if division:
-        where.append("division = ?")
-        params.append(division)
-    if leader:
-        where.append("leader = ?")
-        params.append(leader)
-    if search:
-        where.append(
-            "(LOWER(full_name) LIKE ? OR LOWER(employee_id) LIKE ? OR LOWER(designation) LIKE ?)"
-        )
-        like = f"%{search.lower()}%"
-        params.extend([like, like, like])
 
-    sql = f"SELECT * FROM revenue_hcr WHERE {' AND '.join(where)} ORDER BY full_name"
-    rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+TYPEAHEAD_LIMIT = 25
+
+
+@app.route("/api/hcr/typeahead")
+@cached_json
+def api_hcr_typeahead():
+    """Best roster matches for a partial ?q= (per-keystroke search box).
+
+    Waits for 3 characters — anything shorter can't use the trigram index
+    and would scan the whole roster on every keystroke.
+    """
+    q = request.args.get("q", "")
+    try:
+        limit = min(max(int(request.args.get("limit", 8)), 1), TYPEAHEAD_LIMIT)
+    except ValueError:
+        limit = 8
+    if not indexable(q):
+        return []
+    conn = get_db()
+    match_sql, params = match_subquery(q, fts=has_hcr_fts(conn))
+    rows = conn.execute(
+        f"""SELECT h.employee_id, h.full_name, h.designation, h.department,
+                   h.manager_name, h.status
+            FROM ({match_sql}) m JOIN revenue_hcr h ON h.row_order = m.hit_id
+            ORDER BY m.score, h.full_name
+            LIMIT ?""",
+        params + [limit],
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def cached_facets(conn, filters: dict, q: str = "") -> dict:
+    """facet_counts() for a filter combination, computed once per data version."""
+    key = ("facets", tuple(sorted(filters.items())), q.strip())
+    return snapshot_cached(conn, key, lambda: facet_counts(conn, filters, q, fts=has_hcr_fts(conn)))
+
+
+@app.route("/api/hcr/facets")
+@cached_json
+def api_hcr_facets():
+    """Every HCR filter's values with live counts, for the dropdowns.
+
+    Each facet is counted under all the other selected filters (and ?q=), but
+    not its own, so a dropdown keeps showing the alternatives to its choice.
+    `total` is the number of rows matching everything.
+    """
+    filters = active_filters(request.args)
+    conn = get_db()
+    result = cached_facets(conn, filters, request.args.get("q", ""))
     conn.close()
-    return jsonify(rows)
+    return {
+        "total":   result["total"],
+        "filters": filters,
+        "facets":  {name: facet_values(counts) for name, counts in result["facets"].items()},
+    }
 
 
 @app.route("/api/hcr/filters")
+@cached_json
 def api_hcr_filters():
-    """Distinct values for HCR filter dropdowns."""
+    """Distinct values for HCR filter dropdowns (see /api/hcr/facets for counts)."""
     conn = get_db()
+    facets = cached_facets(conn, {})["facets"]
+    conn.close()
 
-    def distinct(col: str) -> list:
-        return [
-            r[0]
-            for r in conn.execute(
-                f"SELECT DISTINCT {col} FROM revenue_hcr WHERE {col} IS NOT NULL AND TRIM({col}) != '' ORDER BY {col}"
-            ).fetchall()
-        ]
+    def distinct(name: str) -> list:
+        return [f["value"] for f in facet_values(facets[name])]
 
-    out = {
+    return {
         "statuses": distinct("status"),
-        "managers": distinct("manager_name"),
+        "managers": distinct("manager"),
         "divisions": distinct("division"),
         "sub_divisions": distinct("sub_division"),
         "leaders": distinct("leader"),
         "departments": distinct("department"),
         "entities": distinct("entity"),
-        "locations": distinct("office_location"),
+        "locations": distinct("location"),
     }
-    conn.close()
-    return jsonify(out)
 
 
 @app.route("/api/hcr/summary")
+@cached_json
 def api_hcr_summary():
-    """High-level KPIs and breakdowns for the HCR overview."""
+    """High-level KPIs and breakdowns for the HCR overview.
+
+    Read off two facet passes (everyone, and Active only) instead of a query
+    per breakdown.
+    """
     conn = get_db()
-    cur = conn.cursor()
+    everyone = cached_facets(conn, {})
+    active = cached_facets(conn, {"status": "Active"})
+    conn.close()
 
-    total = cur.execute("SELECT COUNT(*) FROM revenue_hcr").fetchone()[0]
-    active = cur.execute(
-        "SELECT COUNT(*) FROM revenue_hcr WHERE status = 'Active'"
-    ).fetchone()[0]
-    inactive = cur.execute(
-        "SELECT COUNT(*) FROM revenue_hcr WHERE status = 'Inactive'"
-    ).fetchone()[0]
+    def breakdown(counts, limit=None) -> list:
+        return [{"label": v or "—", "value": n} for v, n in top_values(counts, limit)]
+
+    status = everyone["facets"]["status"]
+    return {
+        "total": everyone["total"],
+        "active": status["Active"],
+        "inactive": status["Inactive"],
+        "by_division": breakdown(everyone["facets"]["division"]),
+        "by_leader": breakdown(active["facets"]["leader"], 12),
+        "by_department": breakdown(everyone["facets"]["department"]),
+        "by_emp_type": breakdown(everyone["facets"]["emp_type"]),
+        "by_location": breakdown(everyone["facets"]["location"], 10),
+    }
 
-    by_division = [
-        {"label": r[0] or "—", "value": r[1]}
-        for r in cur.execute(
-            "SELECT division, COUNT(*) FROM revenue_hcr GROUP BY division ORDER BY 2 DESC"
-        ).fetchall()
-    ]
-    by_leader = [
-        {"label": r[0] or "—", "value": r[1]}
-        for r in cur.execute(
-            "SELECT leader, COUNT(*) FROM revenue_hcr WHERE status='Active' GROUP BY leader ORDER BY 2 DESC LIMIT 12"
-        ).fetchall()
-    ]
-    by_dept = [
-        {"label": r[0] or "—", "value": r[1]}
-        for r in cur.execute(
-            "SELECT department, COUNT(*) FROM revenue_hcr GROUP BY department ORDER BY 2 DESC"
-        ).fetchall()
-    ]
-    by_emp_type = [
-        {"label": r[0] or "—", "value": r[1]}
-        for r in cur.execute(
-            "SELECT emp_type, COUNT(*) FROM revenue_hcr GROUP BY emp_type ORDER BY 2 DESC"
-        ).fetchall()
-    ]
-    by_location = [
-        {"label": r[0] or "—", "value": r[1]}
-        for r in cur.execute(
-            "SELECT office_location, COUNT(*) FROM revenue_hcr GROUP BY office_location ORDER BY 2 DESC LIMIT 10"
-        ).fetchall()
-    ]
 
-    conn.close()
-    return jsonify(
-        {
-            "total": total,
-            "active": active,
-            "inactive": inactive,
-            "by_division": by_division,
-            "by_leader": by_leader,
-            "by_department": by_dept,
-            "by_emp_type": by_emp_type,
-            "by_location": by_location,
-        }
-    )
+# ─────────────────────────── Manager team tabs ───────────────────────────
+# sort= whitelist for a manager tab; "sort_order" is the sheet order
+TEAM_SORTS = {"sort_order", "emp_name", "status", "tenure_ymd", "budget_fy_25_26",
+              "new_sales_25_26", "ach_pct_25_26", "salary_multiple_25_26",
+              "sales_multiple_25_26", "grr", "nrr", "q4_pipe_achievement_pct"}
+# Remarks are fetched per employee when a row is expanded; the default field
+# set only says whether there is one
+TEAM_REMARKS = ("q3_remarks", "q4_remarks")
+TEAM_COMPUTED = {"has_remarks": "(COALESCE(TRIM(q4_remarks), '') <> '')"}
+
+# Number of subtotal/grand-total rows above each row in sheet order: a team's
+# members and its "… Total" row share a group, so sorting inside groups keeps
+# every subtotal right below its team and the grand total last.
+TEAM_GROUP_SQL = """WITH t AS (
+    SELECT revenue_team.*,
+           COALESCE(SUM(is_total > 0) OVER (ORDER BY sort_order
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) AS _grp
+    FROM revenue_team WHERE manager_tab = ?
+)"""
 
 
-# ─────────────────────────── Manager team tabs ───────────────────────────
 @app.route("/api/team/<path:manager>")
+@cached_json
 def api_team(manager: str):
-    """All rows for a given manager tab (in original order)."""
+    """Rows for a given manager tab (in original order by default).
+
+    Plain list by default; `?limit=N` (then `&after=<next>`) returns keyset
+    pages with a `total`. `sort=<col>` / `sort=-<col>` (TEAM_SORTS) orders
+    rows within each team, subtotals still closing their team. `fields=`
+    picks columns (default: all but TEAM_REMARKS, plus `has_remarks`), and
+    `format=columns` sends {columns, rows: [[…]]} instead of objects.
+    """
     manager = unquote(manager)  # Vercel routing may pass the path URL-encoded
     if manager not in MANAGER_TABS:
         return jsonify({"error": f"Unknown manager '{manager}'"}), 404
 
-    conn = get_db()
     status = request.args.get("status", "")
     team = request.args.get("team", "")
+    after = request.args.get("after") or None
+    try:
+        limit = parse_limit(request.args.get("limit"), after)
+        sort, desc = parse_sort(request.args.get("sort"), TEAM_SORTS, "sort_order")
+        columnar = parse_format(request.args.get("format"))
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
+    conn = get_db()
+    columns = table_columns(conn, "revenue_team")
+    try:
+        fields = parse_fields(request.args.get("fields"), columns,
+                              [c for c in columns if c not in TEAM_REMARKS] + list(TEAM_COMPUTED),
+                              TEAM_COMPUTED)
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
 
     where = ["manager_tab = ?"]
     params: list = [manager]
@@ -264,15 +658,51 @@ def api_team(manager: str):
         where.append("(team = ? OR is_total = 2)")  # always include grand total
         params.append(team)
 
-    sql = (
-        f"SELECT * FROM revenue_team WHERE {' AND '.join(where)} ORDER BY sort_order"
-    )
-    rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    label = f"-{sort}" if desc else sort
+    try:
+        if sort == "sort_order":
+            result = keyset_rows(conn, select_fields(fields, "revenue_team", TEAM_COMPUTED),
+                                 "FROM revenue_team", where, params,
+                                 [("sort_order", desc)], limit, after, label, columnar=columnar)
+        else:
+            keys = [("_grp", False), ("is_total", False), (sort, desc), ("sort_order", desc)]
+            result = keyset_rows(conn, select_fields(fields, "t", TEAM_COMPUTED), "FROM t", where, [manager] + params, keys,
+                                 limit, after, label, with_sql=TEAM_GROUP_SQL, columnar=columnar)
+    except PageError as e:
+        return jsonify({"error": str(e)}), 400
+    if limit is not None:
+        result["total"] = cached_count(
+            ("team", manager, status, team), conn,
+            f"SELECT COUNT(*) FROM revenue_team WHERE {' AND '.join(where)}", params)
+    conn.close()
+    return result
+
+
+@app.route("/api/team/<path:manager>/remarks/<emp_id>")
+@cached_json
+def api_team_remarks(manager: str, emp_id: str):
+    """Q3 / Q4 remarks for one employee on a manager tab (read when a row is
+    expanded). An emp_id can sit on several rows of a tab, so every row comes
+    back with its sort_order.
+    """
+    manager = unquote(manager)
+    if manager not in MANAGER_TABS:
+        return jsonify({"error": f"Unknown manager '{manager}'"}), 404
+
+    conn = get_db()
+    rows = conn.execute(
+        f"""SELECT sort_order, {', '.join(TEAM_REMARKS)} FROM revenue_team
+            WHERE manager_tab = ? AND emp_id = ? ORDER BY sort_order""",
+        (manager, emp_id),
+    ).fetchall()
     conn.close()
-    return jsonify(rows)
+    if not rows:
+        return jsonify({"error": f"No employee '{emp_id}' on {manager}'s tab"}), 404
+    return {"emp_id": emp_id, "rows": [dict(r) for r in rows]}
 
 
 @app.route("/api/team/<path:manager>/summary")
+@cached_json
 def api_team_summary(manager: str):
     """KPI summary for a manager tab — pulled directly from the Grand Total row."""
     manager = unquote(manager)
@@ -337,19 +767,31 @@ def api_team_summary(manager: str):
     ]
 
     conn.close()
-    return jsonify(
-        {
-            "manager": manager,
-            "grand_total": grand,
-            "counts": counts,
-            "teams": teams,
-            "teams_list": teams_list,
-            "top_sales": top_sales,
-        }
-    )
+    return {
+        "manager": manager,
+        "grand_total": grand,
+        "counts": counts,
+        "teams": teams,
+        "teams_list": teams_list,
+        "top_sales": top_sales,
+    }
 
 
 # ─────────────────────────── meta ───────────────────────────
+def _render_export(manager: str, out):
+    """Write `manager`'s export, stamped with the data version's load time, to `out`.
+
+    Uses its own pooled connection, outside the request's snapshot.
+    """
+    stamp = data_last_modified()
+    generated_at = stamp.astimezone().replace(tzinfo=None) if stamp else datetime.now()
+    conn = DB_POOL.acquire()
+    try:
+        render_team_xlsx(conn, manager, generated_at, out)
+    finally:
+        DB_POOL.release(conn)
+
+
 @app.route("/api/download/<path:manager>")
 def api_download(manager: str):
     """Generate an .xlsx export of a leader's full team performance + Q4 commentary."""
@@ -357,123 +799,46 @@ def api_download(manager: str):
     if manager not in MANAGER_TABS:
         return jsonify({"error": f"Unknown leader '{manager}'"}), 404
 
-    conn = get_db()
-    rows = conn.execute(
-        """SELECT team, status, emp_id, emp_name, tenure_ymd,
-                  budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
-                  salary_25_26, salary_multiple_25_26, total_expenses_25_26,
-                  sales_multiple_25_26, grr, nrr,
-                  q4_pipe_target, q4_pipe_creation, q4_pipe_achievement_pct,
-                  q3_remarks, q4_remarks, is_total
-           FROM revenue_team
-           WHERE manager_tab = ?
-           ORDER BY sort_order""",
-        (manager,),
-    ).fetchall()
-    conn.close()
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = manager[:31]  # Excel limit on sheet name length
-
-    headers = [
-        "Team", "Status", "Emp ID", "Name", "Tenure",
-        "Budget FY 25-26", "Budget YTD 25-26", "New Sales 25-26", "Ach % (25-26)",
-        "Salary 25-26", "Salary Multiple (25-26)", "Total Expenses 25-26",
-        "Sales Multiple (25-26)", "GRR", "NRR",
-        "Q4 Pipe Target", "Q4 Pipe Creation", "Q4 Pipe Ach %",
-        "Q3 Remarks", "Q4 Remarks (HR-calibrated)",
-    ]
-
-    # Title row
-    ws.cell(row=1, column=1, value=f"{manager} — Team Performance & Q4 Commentary").font = Font(bold=True, size=14, color="FFFFFF")
-    ws.cell(row=1, column=1).fill = PatternFill("solid", fgColor="5C2DB8")
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
-    ws.cell(row=1, column=1).alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.cell(row=2, column=1, value=f"Generated {datetime.now().strftime('%d %b %Y, %H:%M')} · {len(rows)} rows").font = Font(italic=True, size=10, color="6B6B6B")
-    ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=len(headers))
-
-    # Header row
-    HEADER_ROW = 4
-    header_fill = PatternFill("solid", fgColor="2A2C54")
-    header_font = Font(bold=True, color="FFFFFF", size=10)
-    border = Border(left=Side(style="thin", color="DDDDDD"),
-                    right=Side(style="thin", color="DDDDDD"),
-                    top=Side(style="thin", color="DDDDDD"),
-                    bottom=Side(style="thin", color="DDDDDD"))
-    for col_idx, h in enumerate(headers, start=1):
-        c = ws.cell(row=HEADER_ROW, column=col_idx, value=h)
-        c.font = header_font
-        c.fill = header_fill
-        c.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        c.border = border
-
-    # Data rows
-    for r_idx, row in enumerate(rows, start=HEADER_ROW + 1):
-        is_total = row["is_total"] or 0
-        values = [
-            row["team"], row["status"], row["emp_id"], row["emp_name"], row["tenure_ymd"],
-            row["budget_fy_25_26"], row["budget_ytd_25_26"], row["new_sales_25_26"], row["ach_pct_25_26"],
-            row["salary_25_26"], row["salary_multiple_25_26"], row["total_expenses_25_26"],
-            row["sales_multiple_25_26"], row["grr"], row["nrr"],
-            row["q4_pipe_target"], row["q4_pipe_creation"], row["q4_pipe_achievement_pct"],
-            row["q3_remarks"], row["q4_remarks"],
-        ]
-        row_fill = None
-        if is_total == 2:
-            row_fill = PatternFill("solid", fgColor="3A1A6A"); font_color = "FFFFFF"; bold = True
-        elif is_total == 1:
-            row_fill = PatternFill("solid", fgColor="2C1E57"); font_color = "FFFFFF"; bold = True
-        else:
-            font_color = "1A1A1A"; bold = False
-        for c_idx, v in enumerate(values, start=1):
-            c = ws.cell(row=r_idx, column=c_idx, value=v)
-            c.font = Font(color=font_color, bold=bold, size=10)
-            c.alignment = Alignment(vertical="top",
-                                    wrap_text=(c_idx >= 19),  # Q3/Q4 remarks wrap
-                                    horizontal="right" if c_idx >= 6 and c_idx <= 18 else "left")
-            c.border = border
-            if row_fill:
-                c.fill = row_fill
-            # Number / percent / currency formats
-            if c_idx in (6, 7, 8, 10, 12, 16, 17):  # currency-ish
-                c.number_format = "#,##0"
-            elif c_idx in (9, 14, 15, 18):  # percent
-                c.number_format = "0.0%"
-            elif c_idx in (11, 13):  # multiples
-                c.number_format = "0.00\"x\""
-
-    # Column widths
-    widths = [22, 12, 10, 28, 16, 16, 16, 16, 14, 14, 16, 16, 16, 10, 10, 16, 16, 14, 60, 60]
-    for i, w in enumerate(widths, start=1):
-        ws.column_dimensions[get_column_letter(i)].width = w
-    ws.row_dimensions[HEADER_ROW].height = 36
-    ws.freeze_panes = "E5"  # freeze top headers + Team/Status/EmpId/Name columns
-
-    # Stream the file
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
+    # Pre-rendered into the DB by the importer; a DB without them renders on
+    # first download into the export cache. Either way it's rendered at most
+    # once per data version, so the ETag (content hash) is stable between clicks.
+    if request_profiler.capturing():  # profile the render itself
+        buf = io.BytesIO()
+        _render_export(manager, buf)
+        data = buf.getvalue()
+        entry = {"sha": hashlib.sha256(data).hexdigest(), "path": None, "data": data}
+    else:
+        conn = get_db()
+        entry = stored_export(conn, manager)
+        conn.close()
+        if entry is None:
+            entry = EXPORT_CACHE.get_or_render(data_version(), manager, lambda out: _render_export(manager, out))
     safe_name = manager.replace(" ", "_")
     filename = f"{safe_name}_Team_Performance_FY25-26.xlsx"
-    return send_file(
-        buf,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    resp = send_file(
+        entry["path"] or io.BytesIO(entry["data"]),
+        mimetype=XLSX_MIMETYPE,
         as_attachment=True,
         download_name=filename,
+        etag=entry["sha"],
+        last_modified=data_last_modified(),
+        conditional=True,
     )
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
 
 @app.route("/api/meta")
+@cached_json
 def api_meta():
     conn = get_db()
     rows = conn.execute("SELECT key, value FROM revenue_meta").fetchall()
     conn.close()
-    return jsonify({r[0]: r[1] for r in rows})
+    return {r[0]: r[1] for r in rows}
 
 
 @app.route("/api/leaderboard")
+@cached_json
 def api_leaderboard():
     """Cross-leader performance comparison sourced from the
     `leader_perf_pivot` table (Rev_Perf_Leader.xlsx).
@@ -506,13 +871,8 @@ def api_leaderboard():
     ).fetchall()]
 
     # Headcount (Active / Inactive) is still needed for context — pull from revenue_team where possible
-    hc = {r["manager_tab"]: {"active": r["a"], "inactive": r["i"]} for r in cur.execute(
-        """SELECT manager_tab,
-                  SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) AS a,
-                  SUM(CASE WHEN status != 'Active' OR status IS NULL THEN 1 ELSE 0 END) AS i
-           FROM revenue_team WHERE is_total = 0
-           GROUP BY manager_tab"""
-    ).fetchall()}
+    hc = {r["manager_tab"]: {"active": r["active"], "inactive": r["inactive"]}
+          for r in rollup_rows(conn, "agg_manager_headcount")}
 
     for L in leaders:
         h = hc.get(L["leader"], {"active": 0, "inactive": 0})
@@ -587,16 +947,28 @@ def api_leaderboard():
     totals["sales_per_emp"] = (totals["new_sales"] / totals["active_hc"]) if totals["active_hc"] else None
 
     conn.close()
-    return jsonify({
+    return {
         "leaders":         leaders,
         "rankings":        rankings,
         "top_individuals": top_individuals,
         "top_by_sales":    top_by_sales,
         "totals":          totals,
-    })
+    }
+
+
+def account_columns(conn):
+    """account_analysis as NumPy columns (grr_engine), loaded once per data version."""
+    return snapshot_cached(conn, ("account_columns",), lambda: grr_engine.load_accounts(conn))
+
+
+def add_yoy(head: dict) -> dict:
+    head["yoy_delta"] = (head["rev_25_26"] or 0) - (head["rev_24_25"] or 0)
+    head["yoy_pct"]   = head["yoy_delta"] / head["rev_24_25"] if head["rev_24_25"] else 0
+    return head
 
 
 @app.route("/api/grrnrr")
+@cached_json
 def api_grrnrr():
     """Account-level GRR/NRR analysis for the CEO view.
 
@@ -608,89 +980,73 @@ def api_grrnrr():
         product / NULL AM — these must be excluded from all aggregations.
 
     All SUM-of-loss values are flipped to absolute (positive) for display.
+
+    `?product=`, `?am=`, `?min_rev=` narrow it to a slice of the account book
+    and `?group_by=product|am|band` adds that slice's "groups" (see
+    grr_slices.py). The whole book, with or without groups, is read from the
+    rollup tables; each distinct filtered slice is computed once per data
+    version, on the columnar engine when NumPy is installed, else in SQL.
     """
+    try:
+        filters, group_by = parse_slice(request.args)
+    except SliceError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = get_db()
-    cur  = conn.cursor()
+    if filters and grr_engine.available():
+        # Slices: one pass over cached NumPy columns (grr_engine.py). The whole
+        # book, grouped or not, comes from the rollup tables below.
+        cols = account_columns(conn)
+        cols = cols.take(cols.select(filters))
+        out = grr_engine.grrnrr(cols, group_by)
+        add_yoy(out["summary"])
+    else:
+        out = grrnrr_sql(conn, filters, group_by)
+    conn.close()
+    if filters:
+        out["filters"] = filters
+    return out
 
-    # Common filter — exclude Total / filter-info rows that have no product nor AM.
-    BASE = "FROM account_analysis WHERE product IS NOT NULL AND TRIM(product) != ''"
-
-    # --- Headline KPIs ---
-    head = cur.execute(
-        f"""SELECT
-            COUNT(*)                                                            AS total_accounts,
-            COALESCE(SUM(rev_24_25), 0)                                         AS rev_24_25,
-            COALESCE(SUM(rev_25_26), 0)                                         AS rev_25_26,
-            ABS(COALESCE(SUM(CASE WHEN churn    < 0 THEN churn    ELSE 0 END), 0)) AS total_churn,
-            ABS(COALESCE(SUM(CASE WHEN downsell < 0 THEN downsell ELSE 0 END), 0)) AS total_downsell,
-            COALESCE(SUM(CASE WHEN upsell      > 0 THEN upsell      ELSE 0 END), 0) AS total_upsell,
-            COALESCE(SUM(CASE WHEN new_revenue > 0 THEN new_revenue ELSE 0 END), 0) AS total_new_revenue,
-            SUM(CASE WHEN churn    IS NOT NULL AND churn    < 0 THEN 1 ELSE 0 END) AS churned_accounts,
-            SUM(CASE WHEN downsell IS NOT NULL AND downsell < 0 THEN 1 ELSE 0 END) AS downsell_accounts,
-            SUM(CASE WHEN upsell   IS NOT NULL AND upsell   > 0 THEN 1 ELSE 0 END) AS upsell_accounts,
-            SUM(CASE WHEN nrr IS NOT NULL AND nrr > 1.10 THEN 1 ELSE 0 END)        AS growth_accounts,
-            SUM(CASE WHEN nrr IS NOT NULL AND nrr < 0.90 THEN 1 ELSE 0 END)        AS at_risk_accounts,
-            SUM(CASE WHEN grr IS NOT NULL AND grr = 0    THEN 1 ELSE 0 END)        AS fully_lost_accounts,
-            SUM(CASE WHEN new_revenue IS NOT NULL AND new_revenue > 0 THEN 1 ELSE 0 END) AS new_logo_accounts
-           {BASE}"""
-    ).fetchone()
-    head = dict(head)
-
-    # --- Composite (revenue-weighted) GRR / NRR ---
-    weighted = cur.execute(
-        f"""SELECT
-            COALESCE(SUM(grr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), 0) AS composite_grr,
-            COALESCE(SUM(nrr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), 0) AS composite_nrr
-           {BASE} AND rev_24_25 IS NOT NULL AND rev_24_25 > 0"""
-    ).fetchone()
-    head["composite_grr"] = weighted["composite_grr"]
-    head["composite_nrr"] = weighted["composite_nrr"]
-    head["yoy_delta"] = (head["rev_25_26"] or 0) - (head["rev_24_25"] or 0)
-    head["yoy_pct"]   = head["yoy_delta"] / head["rev_24_25"] if head["rev_24_25"] else 0
 
-    # --- Product cohort breakdown ---
-    products = [dict(r) for r in cur.execute(
-        f"""SELECT
-            product                                                                  AS product,
-            COUNT(*)                                                                 AS accounts,
-            COALESCE(SUM(rev_24_25), 0)                                              AS rev_24_25,
-            COALESCE(SUM(rev_25_26), 0)                                              AS rev_25_26,
-            ABS(COALESCE(SUM(CASE WHEN churn < 0 THEN churn ELSE 0 END), 0))         AS churn,
-            COALESCE(SUM(CASE WHEN upsell > 0 THEN upsell ELSE 0 END), 0)            AS upsell,
-            ABS(COALESCE(SUM(CASE WHEN downsell < 0 THEN downsell ELSE 0 END), 0))   AS downsell,
-            COALESCE(SUM(CASE WHEN new_revenue > 0 THEN new_revenue ELSE 0 END), 0)  AS new_revenue,
-            COALESCE(SUM(grr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS grr,
-            COALESCE(SUM(nrr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS nrr
-           {BASE}
-           GROUP BY product
-           ORDER BY rev_25_26 DESC"""
-    ).fetchall()]
+# The whole book's ?group_by= cohorts, materialized at import time (rollups.py)
+GROUP_ROLLUPS = {"product": "agg_account_product", "am": "agg_account_am_groups", "band": "agg_account_band"}
 
-    # --- AM leaderboard (only AMs with revenue book) ---
-    ams = [dict(r) for r in cur.execute(
-        f"""SELECT
-            am                                                                       AS am,
-            COUNT(*)                                                                 AS accounts,
-            COALESCE(SUM(rev_24_25), 0)                                              AS rev_24_25,
-            COALESCE(SUM(rev_25_26), 0)                                              AS rev_25_26,
-            ABS(COALESCE(SUM(CASE WHEN churn < 0 THEN churn ELSE 0 END), 0))         AS churn,
-            COALESCE(SUM(CASE WHEN upsell > 0 THEN upsell ELSE 0 END), 0)            AS upsell,
-            ABS(COALESCE(SUM(CASE WHEN downsell < 0 THEN downsell ELSE 0 END), 0))   AS downsell,
-            COALESCE(SUM(CASE WHEN new_revenue > 0 THEN new_revenue ELSE 0 END), 0)  AS new_revenue,
-            COALESCE(SUM(grr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS grr,
-            COALESCE(SUM(nrr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS nrr
-           {BASE}
-             AND am IS NOT NULL AND TRIM(am) != ''
-           GROUP BY am
-           HAVING rev_24_25 > 0
-           ORDER BY rev_25_26 DESC"""
-    ).fetchall()]
+
+def grrnrr_sql(conn, filters: dict, group_by: str | None) -> dict:
+    """The /api/grrnrr payload from SQL — the rollup tables for the whole book
+    (groups included), narrowed queries for a slice when NumPy isn't installed."""
+    cur  = conn.cursor()
+    where, params = slice_where(filters)
+
+    # Common filter — exclude Total / filter-info rows that have no product nor AM.
+    BASE = f"{ACCOUNT_BASE} {where}"
+    AM_SET = "AND am IS NOT NULL AND TRIM(am) != ''"
+
+    # --- Headline KPIs + composite (revenue-weighted) GRR / NRR ---
+    # Headline, product cohorts and AM books are materialized at import time
+    # (rollups.py); rollup_rows() recomputes them live on older DBs. Slices
+    # run the same queries narrowed by `where`.
+    if filters:
+        head = dict(cur.execute(headline_select(where), params * 2).fetchone())
+        products = [dict(r) for r in cur.execute(cohort_select("product", where), params)]
+        ams = [dict(r) for r in cur.execute(
+            cohort_select("am", f"{where} {AM_SET}", having="SUM(rev_24_25) > 0"), params)]
+    else:
+        head = dict(rollup_rows(conn, "agg_account_headline")[0])
+        # --- Product cohort breakdown ---
+        products = [dict(r) for r in rollup_rows(conn, "agg_account_product")]
+        # --- AM leaderboard (only AMs with revenue book) ---
+        ams = [dict(r) for r in rollup_rows(conn, "agg_account_am")]
+    add_yoy(head)
 
     # --- Top accounts by 25-26 revenue (crown jewels) ---
+    # Every top-N list breaks ties by row_order DESC (grr_engine.top_rows does
+    # the same) — the reverse index scan's order, now spelled out so a slice
+    # that sorts instead of scanning returns the same rows.
     top_revenue = [dict(r) for r in cur.execute(
         f"""SELECT account, product, am, rev_24_25, rev_25_26, grr, nrr
            {BASE} AND rev_25_26 IS NOT NULL
-           ORDER BY rev_25_26 DESC LIMIT 10"""
+           ORDER BY rev_25_26 DESC, row_order DESC LIMIT 10""", params
     ).fetchall()]
 
     # --- Biggest churn losses (red flags). Source values are negative — display as positive losses. ---
@@ -698,14 +1054,14 @@ def api_grrnrr():
         f"""SELECT account, product, am, rev_24_25, rev_25_26,
                   ABS(churn) AS churn, grr, nrr
            {BASE} AND churn IS NOT NULL AND churn < 0
-           ORDER BY ABS(churn) DESC LIMIT 10"""
+           ORDER BY ABS(churn) DESC, row_order DESC LIMIT 10""", params
     ).fetchall()]
 
     # --- Biggest upsell wins ---
     top_upsell = [dict(r) for r in cur.execute(
         f"""SELECT account, product, am, rev_24_25, rev_25_26, upsell, nrr
            {BASE} AND upsell IS NOT NULL AND upsell > 0
-           ORDER BY upsell DESC LIMIT 10"""
+           ORDER BY upsell DESC, row_order DESC LIMIT 10""", params
     ).fetchall()]
 
     # --- At-risk accounts (NRR < 90%, revenue > $50K, not fully churned) ---
@@ -717,11 +1073,10 @@ def api_grrnrr():
            {BASE} AND nrr IS NOT NULL AND nrr < 0.90
              AND rev_24_25 > 50000
              AND (grr IS NULL OR grr > 0)
-           ORDER BY rev_24_25 DESC LIMIT 15"""
+           ORDER BY rev_24_25 DESC, row_order DESC LIMIT 15""", params
     ).fetchall()]
 
-    conn.close()
-    return jsonify({
+    out = {
         "summary":     head,
         "products":    products,
         "ams":         ams,
@@ -729,23 +1084,85 @@ def api_grrnrr():
         "top_churn":   top_churn,
         "top_upsell":  top_upsell,
         "at_risk":     at_risk,
-    })
+    }
+    if group_by is not None:
+        # --- group_by: the slice's cohorts by product / AM (every one) / revenue band ---
+        if not filters:
+            rows = rollup_rows(conn, GROUP_ROLLUPS[group_by])
+        elif group_by == "band":
+            rows = cur.execute(cohort_select("band", where, key_expr=band_sql(), order="band"), params)
+        else:
+            rows = cur.execute(cohort_select(group_by, where + (f" {AM_SET}" if group_by == "am" else "")), params)
+        groups = []
+        for r in rows:
+            row = dict(r)
+            label = row.pop(group_by)
+            groups.append({"group": REVENUE_BANDS[label] if group_by == "band" else label, **row})
+        out["group_by"], out["groups"] = group_by, groups
+    return out
 
 
 @app.route("/api/team_counts")
+@cached_json
 def api_team_counts():
     """Active vs Inactive HC per manager — drives the tab pill badges."""
     conn = get_db()
-    rows = conn.execute(
-        """SELECT manager_tab,
-                  SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) AS active,
-                  SUM(CASE WHEN status != 'Active' OR status IS NULL THEN 1 ELSE 0 END) AS inactive
-           FROM revenue_team
-           WHERE is_total = 0
-           GROUP BY manager_tab"""
-    ).fetchall()
+    rows = rollup_rows(conn, "agg_manager_headcount")
     conn.close()
-    return jsonify({r["manager_tab"]: {"active": r["active"], "inactive": r["inactive"]} for r in rows})
+    return {r["manager_tab"]: {"active": r["active"], "inactive": r["inactive"]} for r in rows}
+
+
+# ─────────────────────────── bootstrap ───────────────────────────
+# Parts the dashboard can ask for in one round trip: name → (view, needs ?manager=)
+BOOTSTRAP_PARTS = {
+    "leaderboard":  (api_leaderboard,  False),
+    "grrnrr":       (api_grrnrr,       False),
+    "team_counts":  (api_team_counts,  False),
+    "meta":         (api_meta,         False),
+    "team":         (api_team,         True),
+    "team_summary": (api_team_summary, True),
+}
+
+
+@app.route("/api/bootstrap")
+@cached_json
+def api_bootstrap():
+    """Several endpoint payloads in one response, e.g.
+
+        /api/bootstrap?parts=leaderboard,grrnrr
+        /api/bootstrap?parts=team,team_summary&manager=Anurag%20Jain
+
+    Every part is read on the same connection inside one read transaction, so
+    they all come from a single consistent snapshot of the DB. A part that
+    rejects its parameters (e.g. min_rev=abc, sort=bogus) fails the whole
+    call with that part's own 4xx response.
+    """
+    names = list(dict.fromkeys(
+        p.strip() for p in request.args.get("parts", "leaderboard").split(",") if p.strip()
+    ))
+    unknown = [p for p in names if p not in BOOTSTRAP_PARTS]
+    if unknown:
+        return jsonify({"error": f"Unknown part(s): {', '.join(unknown)}",
+                        "parts": sorted(BOOTSTRAP_PARTS)}), 400
+    manager = request.args.get("manager", "")
+    if any(BOOTSTRAP_PARTS[p][1] for p in names):
+        if manager not in MANAGER_TABS:
+            return jsonify({"error": f"Unknown manager '{manager}'"}), 404
+
+    conn = get_db()
+    conn.execute("BEGIN")  # pin one snapshot for every part
+    try:
+        out = {}
+        for name in names:
+            view, needs_manager = BOOTSTRAP_PARTS[name]
+            # Call the undecorated view — the bootstrap response is cached as a whole
+            part = view.__wrapped__(manager) if needs_manager else view.__wrapped__()
+            if not isinstance(part, (dict, list)):
+                return part  # the part's own error, e.g. (jsonify(...), 400) for a bad param
+            out[name] = part
+    finally:
+        conn.rollback()
+    return out
 
 
 if __name__ == "__main__":
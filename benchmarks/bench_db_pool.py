@@ -0,0 +1,72 @@
+"""
+Benchmark — pooled vs per-request SQLite connections on /api/team/<manager>.
+
+Drives the Flask app in-process with the test client (authenticated session),
+with the result cache disabled so every request really hits SQLite.
+
+    python benchmarks/bench_db_pool.py [--manager "Anurag Jain"] [--seconds 5] [--threads 4]
+
+"Unpooled" sets the pool size to 0, which reproduces the old behaviour of
+opening and closing a fresh connection on every request.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as dashboard  # noqa: E402
+
+
+def run(url: str, seconds: float, threads: int) -> float:
+    """Hammer `url` from `threads` clients for `seconds`; return requests/sec."""
+    count = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def worker(i):
+        client = dashboard.app.test_client()
+        with client.session_transaction() as s:
+            s["authed"] = True
+        n = 0
+        while time.perf_counter() < stop:
+            r = client.get(url)
+            assert r.status_code == 200, r.status_code
+            n += 1
+        count[i] = n
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return sum(count) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--manager", default=dashboard.MANAGER_TABS[0])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--threads", type=int, default=4)
+    args = ap.parse_args()
+
+    url = f"/api/team/{quote(args.manager)}"
+    dashboard.RESULT_CACHE.maxsize = 0  # measure the DB path, not the cache
+
+    results = {}
+    for label, pool_size in (("unpooled", 0), ("pooled", max(args.threads, 1))):
+        dashboard.DB_POOL.close_all()
+        dashboard.DB_POOL.maxsize = pool_size
+        run(url, min(1.0, args.seconds), args.threads)  # warm-up
+        results[label] = run(url, args.seconds, args.threads)
+        print(f"  {label:<9} {results[label]:>9.1f} req/s   pool={dashboard.DB_POOL.stats()}")
+
+    speedup = results["pooled"] / results["unpooled"] if results["unpooled"] else float("nan")
+    print(f"\n{url}: {speedup:.2f}x requests/sec with pooling ({args.threads} threads)")
+
+
+if __name__ == "__main__":
+    main()
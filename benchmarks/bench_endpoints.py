@@ -0,0 +1,182 @@
+"""
+Benchmark — every dashboard endpoint, latency percentiles and payload size.
+
+Drives the Flask app in-process with the test client (authenticated
+session) over the URL set query_audit.py uses: every endpoint, each
+whitelisted sort, each filter, a search and a bootstrap call. Each URL is
+timed in two modes:
+
+  • cold — RESULT_CACHE cleared before every request, so the view really
+           queries SQLite (the .xlsx export cache is left as it is)
+  • warm — served from the result cache, as repeat visitors get it
+
+and reported as p50 / p95 / p99 latency in ms, plus the response size
+uncompressed and as a browser ("gzip, deflate, br") receives it.
+
+Results are written as JSON (git commit, DB row counts, per-URL stats), and
+`--compare` checks them against an earlier run:
+
+    python benchmarks/bench_endpoints.py --scale 20 --out before.json
+    # … change something …
+    python benchmarks/bench_endpoints.py --scale 20 --compare before.json
+
+`--scale` builds a synthetic DB (see synth_data.py); without it the
+checked-in wfm_data.db is used, read-only. --compare exits non-zero when a
+URL's cold p50 is more than --tolerance times slower.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import datastore  # noqa: E402
+
+BROWSER = {"Accept-Encoding": "gzip, deflate, br"}
+NOISE_MS = 1.0  # --compare ignores p50 differences smaller than this
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def stats(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    return {"n": len(ordered), "min": ordered[0], "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95), "p99": percentile(ordered, 99), "max": ordered[-1],
+            "mean": sum(ordered) / len(ordered)}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return out.stdout.strip() or "unknown"
+
+
+def run(urls: list[str], requests: int) -> dict:
+    import app as dashboard
+    client = dashboard.app.test_client()
+    with client.session_transaction() as s:
+        s["authed"] = True
+
+    results = {}
+    for url in urls:
+        first = client.get(url)
+        packed = client.get(url, headers=BROWSER)
+        entry = {"status": first.status_code, "bytes": len(first.data), "bytes_encoded": len(packed.data),
+                 "encoding": packed.headers.get("Content-Encoding")}
+        for mode in ("cold", "warm"):
+            samples = []
+            for _ in range(requests):
+                if mode == "cold":
+                    dashboard.RESULT_CACHE.clear()
+                t0 = time.perf_counter()
+                client.get(url)
+                samples.append((time.perf_counter() - t0) * 1000)
+            entry[mode] = stats(samples)
+        results[url] = entry
+        print(f"  {url[:64]:<64}{entry['status']:>4}{entry['cold']['p50']:>9.2f}{entry['cold']['p95']:>9.2f}"
+              f"{entry['cold']['p99']:>9.2f}{entry['warm']['p50']:>8.2f}{entry['bytes']:>11,}"
+              f"{entry['bytes_encoded']:>9,}")
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    """Print cold-p50 changes against `baseline`; returns the number of regressions."""
+    print(f"\ncold p50 vs {baseline['meta']['commit']} ({baseline['meta']['when']}):")
+    regressions = 0
+    for url, entry in current["endpoints"].items():
+        old = baseline["endpoints"].get(url)
+        if old is None:
+            print(f"  ·  {url[:64]:<64} new")
+            continue
+        before, after = old["cold"]["p50"], entry["cold"]["p50"]
+        ratio = after / before if before else float("inf")
+        slower = ratio > tolerance and after - before > NOISE_MS
+        regressions += slower
+        mark = "❌" if slower else "✓ "
+        print(f"  {mark} {url[:64]:<64}{before:>9.2f} → {after:>9.2f} ms  ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", default=None, help="DB to benchmark (default: wfm_data.db)")
+    ap.add_argument("--scale", type=float, default=None, help="build a synthetic DB at this scale instead")
+    ap.add_argument("--seed", type=int, default=17)
+    ap.add_argument("--requests", type=int, default=30, help="timed requests per URL and mode")
+    ap.add_argument("--out", default=None, help="results JSON (default: the temp dir)")
+    ap.add_argument("--compare", default=None, metavar="BASELINE.json")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="allowed cold p50 slowdown for --compare")
+    args = ap.parse_args()
+
+    commit = git_commit()
+    tmp = tempfile.TemporaryDirectory()
+    if args.scale is not None:
+        from synth_data import build_db
+        db_path = os.path.join(tmp.name, "wfm_data.db")
+        print(f"Building synthetic wfm_data.db (scale {args.scale:g}) …")
+        build_db(db_path, args.scale, args.seed)
+    else:
+        db_path = os.path.abspath(args.db or datastore.DB_PATH)
+        if not os.path.exists(db_path):
+            sys.exit(f"{db_path} not found")
+
+    datastore.DB_PATH = db_path                       # before app binds it
+    from query_audit import representative_urls
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    urls = representative_urls(conn)
+    counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+              for t in ("revenue_hcr", "revenue_team", "account_analysis", "leader_perf_pivot")}
+    conn.close()
+
+    print(f"{len(urls)} URLs × {args.requests} requests per mode (ms)\n")
+    print(f"  {'':<64}{'':>4}{'cold p50':>9}{'p95':>9}{'p99':>9}{'warm p50':>8}{'bytes':>11}{'encoded':>9}")
+    results = {
+        "meta": {
+            "commit": commit,
+            "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "db": "synthetic" if args.scale is not None else db_path,
+            "scale": args.scale,
+            "seed": args.seed if args.scale is not None else None,
+            "rows": counts,
+            "requests": args.requests,
+        },
+        "endpoints": run(urls, args.requests),
+    }
+    tmp.cleanup()
+
+    suffix = f"x{args.scale:g}" if args.scale is not None else "db"
+    out = args.out or os.path.join(tempfile.gettempdir(), f"bench_endpoints_{commit}_{suffix}.json")
+    with open(out, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"\n✓ results written to {out}")
+
+    failed = [url for url, e in results["endpoints"].items() if e["status"] != 200]
+    if failed:
+        print(f"⚠ non-200 responses: {', '.join(failed)}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} URL(s) more than {args.tolerance:g}x slower (cold p50)")
+            sys.exit(1)
+        print(f"\n✅ no URL more than {args.tolerance:g}x slower (cold p50)")
+
+
+if __name__ == "__main__":
+    main()
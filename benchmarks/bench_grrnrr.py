@@ -0,0 +1,175 @@
+"""
+Benchmark — /api/grrnrr, SQL queries vs the columnar engine (grr_engine.py).
+
+Builds a synthetic account book (default 1M accounts) with the importer's
+schema, indexes, rollups and ANALYZE, then times the endpoint's payload
+three ways:
+
+  • SQL, live      — the rollup SELECTs plus the four top-N queries
+  • SQL, rollups   — rollup tables read back, top-N queries live (production
+                     before grr_engine)
+  • columnar       — one load into NumPy columns per data version, then the
+                     vectorized pass per payload
+
+and checks that every way returns the same payload (floats to
+grr_engine.TOLERANCE). The endpoint serves the whole book — with or without
+?group_by= — from the rollup tables and uses the engine for filtered slices,
+so it then times a few /api/grrnrr slices (?product=, ?am=, ?min_rev=,
+?group_by=, see grr_slices.py) in SQL, on the columnar engine and as the
+endpoint serves them, checking SQL and engine agree.
+
+    python benchmarks/bench_grrnrr.py [--accounts 1000000] [--repeat 3]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qsl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import datastore  # noqa: E402
+from grr_slices import parse_slice  # noqa: E402
+from import_data import DDL_ACCOUNTS, INDEXES, SQL_ACCOUNTS, analyze, bulk_insert  # noqa: E402
+from rollups import ROLLUPS, build_rollups  # noqa: E402
+from synth_data import accounts  # noqa: E402
+
+SLICES = ["product=Product%20C3", "am=AM%200042", "product=Product%20C3&am=AM%200042&group_by=band",
+          "min_rev=250000", "product=Product%20C3&group_by=am", "group_by=band", "group_by=am"]
+
+
+def build(db_path: str, n: int):
+    conn = sqlite3.connect(db_path)
+    conn.execute(DDL_ACCOUNTS)
+    conn.execute("CREATE TABLE revenue_meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT INTO revenue_meta VALUES ('last_loaded_at', '2026-01-01T00:00:00')")
+    bulk_insert(conn.cursor(), SQL_ACCOUNTS, accounts(n))
+    for ddl in INDEXES:
+        if " ON account_analysis(" in ddl:
+            conn.execute(ddl)
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_rollups(conn, tables={"account_analysis"})
+        analyze(conn)
+    conn.commit()
+    conn.close()
+
+
+def best_of(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--accounts", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wfm_data.db")
+        print(f"Building synthetic account book ({args.accounts:,} accounts) …")
+        t0 = time.perf_counter()
+        build(db_path, args.accounts)
+        print(f"  ✓ built in {time.perf_counter() - t0:.1f}s")
+
+        datastore.DB_PATH = db_path                       # before app binds it
+        import app as dashboard
+        import grr_engine
+        if not grr_engine.available():
+            sys.exit("numpy is not installed — nothing to compare against")
+
+        def payload(engine: bool, query: str = ""):
+            dashboard.RESULT_CACHE.clear()
+            dashboard.grr_engine.available = lambda: engine
+            with dashboard.app.test_request_context(f"/api/grrnrr?{query}"):
+                return dashboard.api_grrnrr.__wrapped__()
+
+        results = {}
+        results["SQL, rollups"] = best_of(lambda: payload(False), args.repeat)
+        conn = sqlite3.connect(db_path)
+        for name, spec in ROLLUPS.items():
+            if spec["source"] == "account_analysis":
+                conn.execute(f"DROP TABLE {name}")
+        conn.commit()
+        conn.close()
+        dashboard.DB_POOL.prune()
+        results["SQL, live"] = best_of(lambda: payload(False), args.repeat)
+        conn = sqlite3.connect(db_path)
+
+        def columnar():
+            out = grr_engine.grrnrr(grr_engine.load_accounts(conn))
+            dashboard.add_yoy(out["summary"])
+            return out
+
+        results["columnar (load + pass)"] = best_of(columnar, args.repeat)
+        load_ms, cols = best_of(lambda: grr_engine.load_accounts(conn), 1)
+        pass_ms, _ = best_of(lambda: grr_engine.grrnrr(cols), args.repeat)
+        conn.close()
+
+        print(f"\n/api/grrnrr payload, {args.accounts:,} accounts (ms, best of {args.repeat}):")
+        for label, (ms, _) in results.items():
+            print(f"  {label:<26}{ms:>10.1f}")
+        print(f"    of which load          {load_ms:>10.1f}   (once per data version)")
+        print(f"    of which pass          {pass_ms:>10.1f}")
+        print(f"\ncolumnar pass is {results['SQL, live'][0] / pass_ms:.0f}x faster than the live SQL")
+
+        reference = results["SQL, live"][1]
+        failed = {label: grr_engine.mismatch(reference, out) for label, (_, out) in results.items()}
+        failed = {label: why for label, why in failed.items() if why}
+        if failed:
+            for label, why in failed.items():
+                print(f"❌ {label} differs from the live SQL at {why}")
+            sys.exit(1)
+        print(f"✅ same payloads ({len(json.dumps(reference)):,} bytes of JSON)")
+
+        # Slices, with the rollups back in place: "served" is the endpoint as
+        # deployed — rollups for the whole book, the engine's cached columns
+        # (loaded once per data version, outside the timing) for a filtered slice.
+        conn = sqlite3.connect(db_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_rollups(conn, tables={"account_analysis"})
+        conn.commit()
+        conn.close()
+        dashboard.DB_POOL.prune()
+        dashboard.RESULT_CACHE.clear()
+
+        def served(query: str):
+            dashboard.grr_engine.available = lambda: True
+            with dashboard.app.test_request_context(f"/api/grrnrr?{query}"):
+                return dashboard.api_grrnrr.__wrapped__()
+
+        served("product=-")  # loads the columns
+
+        print(f"\nslices (ms, best of {args.repeat}; columns already loaded):")
+        print(f"  {'':<52}{'accounts':>9}{'SQL':>9}{'columnar':>10}{'served':>9}")
+        differing = 0
+        for query in SLICES:
+            served_ms, _ = best_of(lambda: served(query), args.repeat)
+            sql_ms, expected = best_of(lambda: payload(False, query), args.repeat)
+            filters, group_by = parse_slice(dict(parse_qsl(query)))
+            engine_ms, out = best_of(
+                lambda: grr_engine.grrnrr(cols.take(cols.select(filters)) if filters else cols, group_by),
+                args.repeat)
+            dashboard.add_yoy(out["summary"])
+            if filters:
+                out["filters"] = filters
+            why = grr_engine.mismatch(expected, out)
+            differing += why is not None
+            print(f"  {query:<52}{out['summary']['total_accounts']:>9,}{sql_ms:>9.1f}{engine_ms:>10.1f}{served_ms:>9.1f}"
+                  + (f"   ❌ {why}" if why else ""))
+        if differing:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark — per-keystroke HCR search latency, FTS5 trigram index vs LIKE scan.
+
+Builds a synthetic roster (default 200k rows) with the importer's schema and
+search index, then "types" a few queries one character at a time and times
+the typeahead query (top 8, from the third character on — as the endpoint
+does) and the full /api/hcr match set at every keystroke, with and without
+hcr_fts.
+
+    python benchmarks/bench_hcr_search.py [--rows 200000] [--repeat 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hcr_search import build_hcr_fts, indexable, match_subquery  # noqa: E402
+from import_data import DDL_HCR, HCR_COLUMNS, SQL_HCR, bulk_insert  # noqa: E402
+
+# ~1k distinct first and last names each, so name searches are as selective
+# as on a real roster (locations / departments stay deliberately coarse)
+_SYLLABLES = ["an", "ar", "ka", "ri", "sha", "ma", "vi", "ne", "lo", "de", "ra", "su",
+              "ta", "mi", "jo", "el", "ya", "ho", "pa", "ge", "lu", "ni", "or", "be",
+              "sa", "di", "ve", "ko", "ul", "fe", "zo", "ch"]
+FIRST = random.Random(1).sample(
+    sorted({(a + b + c).capitalize() for a in _SYLLABLES for b in _SYLLABLES for c in ("a", "n", "")}), 1000)
+LAST = random.Random(2).sample(
+    sorted({(a + b + c).capitalize() for a in _SYLLABLES for b in _SYLLABLES for c in ("ma", "rty", "ez")}), 1000)
+DESIGNATIONS = ["Account Manager", "Sales Manager", "Key Account Director", "Inside Sales Executive",
+                "Business Development Manager", "Customer Success Lead", "Pre-Sales Consultant"]
+DEPARTMENTS = ["Enterprise Sales", "Mid Market", "Partnerships", "Customer Success", "Pre-Sales"]
+LOCATIONS = ["Noida", "Bangalore", "Mumbai", "London", "Madrid", "Dallas", "Singapore", "Dubai"]
+
+QUERIES = [f"{FIRST[0]} {LAST[0][:4]}".lower(), "E104233", "key account", "singapore"]
+TYPEAHEAD_SQL = """SELECT h.employee_id, h.full_name, h.designation, h.department,
+                          h.manager_name, h.status
+                   FROM ({match}) m JOIN revenue_hcr h ON h.row_order = m.hit_id
+                   ORDER BY m.score, h.full_name LIMIT 8"""
+SEARCH_SQL = """SELECT revenue_hcr.* FROM revenue_hcr
+                JOIN ({match}) m ON m.hit_id = revenue_hcr.row_order
+                ORDER BY m.score, full_name"""
+
+
+def roster(rows: int):
+    """revenue_hcr tuples for a synthetic roster."""
+    rnd = random.Random(7)
+    for i in range(rows):
+        first, last = rnd.choice(FIRST), rnd.choice(LAST)
+        values = [None] * HCR_COLUMNS
+        values[0] = f"E{100000 + i}"                                   # employee_id
+        values[1] = f"{first} {last}"                                  # full_name
+        values[4] = f"{first}.{last}{i}@example.com".lower()           # official_email
+        values[6] = rnd.choice(["Active", "Active", "Inactive"])       # status
+        values[10] = rnd.choice(LAST) + " " + rnd.choice(FIRST)        # manager_name
+        values[14] = rnd.choice(DEPARTMENTS)                           # department
+        values[16] = rnd.choice(DESIGNATIONS)                          # designation
+        values[17] = rnd.choice(LOCATIONS)                             # office_location
+        yield (i + 2, *values)
+
+
+def keystroke_latency(conn, sql_template: str, fts: bool, repeat: int,
+                      indexable_only: bool = False, queries=QUERIES) -> list[float]:
+    """Best-of-`repeat` milliseconds for every prefix of every query.
+
+    `indexable_only` skips prefixes the typeahead endpoint doesn't query
+    (no 3-character term yet).
+    """
+    out = []
+    for q in queries:
+        for n in range(1, len(q) + 1):
+            match, params = match_subquery(q[:n], fts)
+            if match is None or (indexable_only and not indexable(q[:n])):
+                continue
+            sql = sql_template.format(match=match)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.execute(sql, params).fetchall()
+                best = min(best, time.perf_counter() - t0)
+            out.append(best * 1000)
+    return out
+
+
+def pct(values: list[float], p: float) -> float:
+    return statistics.quantiles(values, n=100)[int(p) - 1] if len(values) > 1 else values[0]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.execute(DDL_HCR)
+        print(f"Building synthetic roster ({args.rows:,} rows) …")
+        bulk_insert(conn.cursor(), SQL_HCR, roster(args.rows))
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not build_hcr_fts(conn):
+                sys.exit("FTS5 trigram tokenizer not available in this SQLite build")
+        conn.commit()
+        print(f"  ✓ hcr_fts built in {time.perf_counter() - t0:.2f}s")
+
+        keystrokes = sum(len(q) for q in QUERIES)
+        print(f"\n{keystrokes} keystrokes over {len(QUERIES)} queries (ms, best of {args.repeat}):")
+        print(f"  {'':<22}{'p50':>9}{'p95':>9}{'max':>9}")
+        medians = {}
+        for label, template in (("typeahead", TYPEAHEAD_SQL), ("/api/hcr", SEARCH_SQL)):
+            for mode, fts in (("LIKE", False), ("FTS5", True)):
+                ms = keystroke_latency(conn, template, fts, args.repeat,
+                                       indexable_only=label == "typeahead")
+                medians[label, mode] = statistics.median(ms)
+                print(f"  {label + ' ' + mode:<22}{statistics.median(ms):>9.2f}"
+                      f"{pct(ms, 95):>9.2f}{max(ms):>9.2f}")
+
+        print("\ntypeahead p50 per query (ms):")
+        for q in QUERIES:
+            like, fts = (statistics.median(keystroke_latency(conn, TYPEAHEAD_SQL, f, args.repeat,
+                                                             indexable_only=True, queries=[q]))
+                         for f in (False, True))
+            print(f"  {q!r:<22}{like:>9.2f}{fts:>9.2f}   ({like / fts:.0f}x)")
+        conn.close()
+
+    for label in ("typeahead", "/api/hcr"):
+        print(f"\n{label}: FTS5 p50 is {medians[label, 'LIKE'] / medians[label, 'FTS5']:.1f}x faster than LIKE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Benchmark — import_data.py, step by step, on synthetic source workbooks.
+
+Writes the three source workbooks with synth_data.py at the requested size,
+then runs the importer's pieces one at a time against a scratch DB:
+
+  • read   — load_sources() per workbook (openpyxl parse into row tuples)
+  • hash   — fingerprint() of every sheet
+  • import — import_hcr, import_manager per tab, import_account_analysis,
+             import_leader_perf (row generators + bulk_insert)
+  • post   — INDEXES, build_hcr_fts, build_rollups, ANALYZE, verify_snapshot
+
+and optionally the whole import_data.main() (--end-to-end, serial and with
+each --jobs count). Every step is reported as wall time (best of --repeat
+passes), rows/sec and the peak Python heap it allocated on top of what was
+already live. Peak heap comes from a separate pass under tracemalloc so it
+doesn't skew the timings; SQLite's own page cache isn't counted there (the
+process's peak RSS is printed at the end).
+
+Results are written as JSON, and `--compare` checks them against an earlier
+run, flagging steps whose rows/sec dropped or whose peak heap grew by more
+than --tolerance:
+
+    python benchmarks/bench_import.py --scale 20 --out before.json
+    # … change something …
+    python benchmarks/bench_import.py --scale 20 --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import import_data  # noqa: E402
+from bench_endpoints import git_commit  # noqa: E402
+from hcr_search import build_hcr_fts  # noqa: E402
+from import_data import (DDL_ACCOUNTS, DDL_HCR, DDL_LEADER_PERF, DDL_META, DDL_TEAM,  # noqa: E402
+                         IMPORT_PRAGMAS, INDEXES, MANAGER_TABS, TEAM_UNIT, analyze, fingerprint,
+                         import_unit, load_sources, verify_snapshot)
+from rollups import build_rollups  # noqa: E402
+from synth_data import add_size_args, size_args, sources, write_workbooks  # noqa: E402
+
+NOISE_MS = 5.0          # --compare ignores steps that moved by less than this
+NOISE_BYTES = 1 << 20   # … and peak heap changes under 1 MiB
+
+WORKBOOK_UNITS = {
+    "Final_Revenue_Mapping_Cursor.xlsx": ["revenue_hcr"] + [TEAM_UNIT + tab for tab in MANAGER_TABS],
+    "GRR_NRR_Account_Analysis.xlsx": ["account_analysis"],
+    "Rev_Perf_Leader.xlsx": ["leader_perf_pivot"],
+}
+TABLES = ["revenue_hcr", "revenue_team", "account_analysis", "leader_perf_pivot"]
+
+
+class Steps:
+    """Runs named steps with the importer's prints silenced, keeping each one's fastest ms / rows / peak heap."""
+
+    def __init__(self, trace: bool):
+        self.trace = trace
+        self.results: dict[str, dict] = {}
+
+    def run(self, name: str, fn, rows=None):
+        """fn() → its result; `rows` is a count or a callable on that result."""
+        if self.trace:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = fn()
+        ms = (time.perf_counter() - t0) * 1000
+        entry = {"ms": ms, "rows": rows(out) if callable(rows) else rows}
+        if self.trace:
+            entry["peak_bytes"] = tracemalloc.get_traced_memory()[1] - start  # on top of what was live
+        best = self.results.get(name)
+        if best is None or entry["ms"] < best["ms"]:
+            self.results[name] = entry
+        return out
+
+
+def sheet_rows(loaded: dict) -> int:
+    return sum(len(rows) for rows in loaded.values() if rows is not None)
+
+
+def pipeline(steps: Steps, paths: tuple, db_path: str):
+    """The importer's work in load order, each piece as its own step."""
+    loaded = {}
+    for name, units in WORKBOOK_UNITS.items():
+        loaded.update(steps.run(f"read {name}", lambda: load_sources(units, paths), sheet_rows))
+    total = sheet_rows(loaded)
+    steps.run("fingerprint (all sheets)", lambda: [fingerprint(r) for r in loaded.values() if r], total)
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    for pragma in IMPORT_PRAGMAS:
+        conn.execute(pragma)
+    conn.execute("BEGIN")
+    for ddl in (DDL_HCR, DDL_TEAM, DDL_META, DDL_ACCOUNTS, DDL_LEADER_PERF):
+        conn.execute(ddl)
+
+    def load(unit):
+        before = conn.total_changes
+        import_unit(unit, loaded[unit], conn)
+        return conn.total_changes - before
+
+    for unit in loaded:
+        steps.run(f"import {unit}", lambda: load(unit), lambda n: n)
+    stored = sum(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in TABLES)
+
+    steps.run("indexes", lambda: [conn.execute(ddl) for ddl in INDEXES], stored)
+    steps.run("build_hcr_fts", lambda: build_hcr_fts(conn),
+              conn.execute("SELECT COUNT(*) FROM revenue_hcr").fetchone()[0])
+    steps.run("build_rollups", lambda: build_rollups(conn), stored)
+    steps.run("analyze", lambda: analyze(conn), stored)
+    conn.commit()
+    problems = steps.run("verify_snapshot", lambda: verify_snapshot(conn), stored)
+    conn.close()
+    return total, problems
+
+
+def end_to_end(steps: Steps, paths: tuple, workdir: str, jobs: list[int], total: int):
+    """import_data.main() against `paths`, publishing into `workdir` instead of DB_PATH."""
+    saved = (import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX, import_data.DB_PATH)
+    import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX = paths
+    import_data.DB_PATH = os.path.join(workdir, "wfm_data.db")
+    try:
+        for n in jobs:
+            if os.path.exists(import_data.DB_PATH):
+                os.remove(import_data.DB_PATH)
+            steps.run(f"import_data.main(jobs={n})", lambda: import_data.main(jobs=n), total)
+    finally:
+        import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX, import_data.DB_PATH = saved
+
+
+def rate(entry: dict) -> float | None:
+    return entry["rows"] / entry["ms"] * 1000 if entry["rows"] and entry["ms"] > 0 else None
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    """Print rows/sec and peak-heap changes against `baseline`; returns the number of regressions."""
+    print(f"\nvs {baseline['meta']['commit']} ({baseline['meta']['when']}):")
+    regressions = 0
+    for name, entry in current["steps"].items():
+        old = baseline["steps"].get(name)
+        if old is None:
+            print(f"  ·  {name:<44} new")
+            continue
+        slower = (entry["ms"] > old["ms"] * tolerance and entry["ms"] - old["ms"] > NOISE_MS)
+        before_peak, after_peak = old.get("peak_bytes"), entry.get("peak_bytes")
+        heavier = (before_peak is not None and after_peak is not None
+                   and after_peak > before_peak * tolerance and after_peak - before_peak > NOISE_BYTES)
+        regressions += slower or heavier
+        old_rate, new_rate = rate(old), rate(entry)
+        line = (f"{old_rate:>12,.0f} → {new_rate:>12,.0f} rows/s" if old_rate and new_rate
+                else f"{old['ms']:>9.1f} → {entry['ms']:>9.1f} ms")
+        if before_peak is not None and after_peak is not None:
+            line += f"   peak {before_peak / 1e6:>7.1f} → {after_peak / 1e6:>7.1f} MB"
+        print(f"  {'❌' if slower or heavier else '✓ '} {name:<44}{line}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_args(ap)
+    ap.add_argument("--end-to-end", action="store_true", help="also time the whole import_data.main()")
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1], metavar="N",
+                    help="--jobs values for --end-to-end (default: 1)")
+    ap.add_argument("--repeat", type=int, default=3, help="timed passes; each step keeps its best")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", default=None, help="results JSON (default: the temp dir)")
+    ap.add_argument("--compare", default=None, metavar="BASELINE.json")
+    ap.add_argument("--tolerance", type=float, default=1.5,
+                    help="allowed slowdown / peak-heap growth factor for --compare")
+    args = ap.parse_args()
+
+    commit = git_commit()
+    with tempfile.TemporaryDirectory(prefix="bench_import_") as tmp:
+        print(f"Writing synthetic workbooks (scale {args.scale:g}) …")
+        t0 = time.perf_counter()
+        paths = write_workbooks(tmp, sources(args.scale, args.seed, **size_args(args)))
+        for path in paths:
+            print(f"  ✓ {os.path.basename(path):<36}{os.path.getsize(path) / 1e6:>8.1f} MB")
+        print(f"  in {time.perf_counter() - t0:.1f}s\n")
+        db_path = os.path.join(tmp, "bench.db")
+
+        timed = Steps(trace=False)
+        for _ in range(args.repeat):
+            total, problems = pipeline(timed, paths, db_path)
+            if args.end_to_end:
+                end_to_end(timed, paths, tmp, args.jobs, total)
+        results = timed.results
+        if not args.no_memory:
+            traced = Steps(trace=True)
+            tracemalloc.start()
+            pipeline(traced, paths, db_path)
+            if args.end_to_end:
+                end_to_end(traced, paths, tmp, args.jobs, total)
+            tracemalloc.stop()
+            for name, entry in traced.results.items():
+                results[name]["peak_bytes"] = entry["peak_bytes"]
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+    print(f"{total:,} sheet rows  (ms: best of {args.repeat}; peak heap from a separate tracemalloc pass,"
+          f" workers not included)\n")
+    print(f"  {'':<44}{'ms':>10}{'rows':>11}{'rows/s':>13}{'peak heap':>12}")
+    for name, entry in results.items():
+        r = rate(entry)
+        peak = entry.get("peak_bytes")
+        print(f"  {name:<44}{entry['ms']:>10.1f}{entry['rows'] or 0:>11,}"
+              f"{f'{r:,.0f}' if r else '—':>13}{f'{peak / 1e6:.1f} MB' if peak is not None else '—':>12}")
+    print(f"\n  peak RSS {peak_rss / 1e6:.0f} MB")
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "scale": args.scale,
+            "seed": args.seed,
+            "sizes": size_args(args),
+            "sheet_rows": total,
+            "repeat": args.repeat,
+            "peak_rss": peak_rss,
+        },
+        "steps": results,
+    }
+    out = args.out or os.path.join(tempfile.gettempdir(), f"bench_import_{commit}_x{args.scale:g}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\n✓ results written to {out}")
+
+    if problems:
+        print(f"⚠ verify_snapshot: {'; '.join(problems)}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {regressions} step(s) more than {args.tolerance:g}x slower or heavier")
+            sys.exit(1)
+        print(f"\n✅ no step more than {args.tolerance:g}x slower or heavier")
+
+
+if __name__ == "__main__":
+    main()
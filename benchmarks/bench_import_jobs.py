@@ -0,0 +1,96 @@
+"""
+Benchmark — serial vs `--jobs N` import of the source workbooks.
+
+Imports the same sources into two scratch DBs, once serially and once with a
+process pool + staging DBs, reports the wall-clock time of each and checks
+that both DBs hold exactly the same rows (revenue_meta.last_loaded_at and the
+exports stamped with it aside).
+
+    python benchmarks/bench_import_jobs.py [--source DIR] [--jobs 4]
+
+`--source` is the directory holding Final_Revenue_Mapping_Cursor.xlsx,
+GRR_NRR_Account_Analysis.xlsx and Rev_Perf_Leader.xlsx (default: repo root).
+Exits non-zero if the two DBs differ.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import import_data  # noqa: E402
+
+
+def dump(path: str) -> dict:
+    """{table: [rows…]} for every table, skipping the import timestamp and
+    the exports stamped with it.
+
+    Virtual tables (the FTS5 index) are compared by their rows; their shadow
+    tables are skipped — they hold the same data as index pages, some are
+    WITHOUT ROWID, and their layout isn't part of what an import promises.
+    sqlite_stat1 is compared by (table, index): ANALYZE writes it in schema
+    order, which moves when a reload recreates a rollup table.
+    """
+    conn = sqlite3.connect(path)
+    schema = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+    virtual = [name for name, sql in schema if sql.upper().startswith("CREATE VIRTUAL TABLE")]
+    tables = [name for name, sql in schema
+              if not any(name.startswith(f"{v}_") for v in virtual) and "WITHOUT ROWID" not in sql.upper()
+              and name != "export_xlsx"]
+    out = {}
+    for t in tables:
+        order = "tbl, idx" if t == "sqlite_stat1" else "rowid"
+        rows = conn.execute(f"SELECT * FROM {t} ORDER BY {order}").fetchall()
+        if t == "revenue_meta":
+            rows = [r for r in rows if r[0] != "last_loaded_at"]
+        out[t] = rows
+    conn.close()
+    return out
+
+
+def timed_import(db_path: str, jobs: int) -> float:
+    import_data.DB_PATH = db_path
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import_data.main(jobs=jobs)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--source", default=ROOT)
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 2)
+    args = ap.parse_args()
+
+    import_data.XLSX_PATH = os.path.join(args.source, "Final_Revenue_Mapping_Cursor.xlsx")
+    import_data.GRR_NRR_XLSX = os.path.join(args.source, "GRR_NRR_Account_Analysis.xlsx")
+    import_data.LEADER_PERF_XLSX = os.path.join(args.source, "Rev_Perf_Leader.xlsx")
+    if not os.path.exists(import_data.XLSX_PATH):
+        sys.exit(f"{import_data.XLSX_PATH} not found")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_db = os.path.join(tmp, "serial.db")
+        parallel_db = os.path.join(tmp, "parallel.db")
+        serial = timed_import(serial_db, 1)
+        print(f"  serial      {serial:>8.2f}s")
+        parallel = timed_import(parallel_db, args.jobs)
+        print(f"  --jobs {args.jobs:<4} {parallel:>8.2f}s")
+
+        a, b = dump(serial_db), dump(parallel_db)
+        diffs = [t for t in sorted(set(a) | set(b)) if a.get(t) != b.get(t)]
+
+    print(f"\n--jobs {args.jobs}: {serial / parallel:.2f}x vs serial ({os.cpu_count()} CPUs)")
+    if diffs:
+        print(f"❌ DBs differ in: {', '.join(diffs)}")
+        sys.exit(1)
+    print(f"✅ Identical DBs ({len(a)} tables)")
+
+
+if __name__ == "__main__":
+    main()
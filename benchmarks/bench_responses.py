@@ -0,0 +1,104 @@
+"""
+Benchmark — JSON response encoding (responses.py) vs stock jsonify().
+
+For each endpoint, computes the payload once from wfm_data.db and reports:
+
+  • bytes and serialization time with Flask's stock JSON provider (before)
+  • bytes and serialization time with dumps() (orjson when installed)
+  • gzip / brotli sizes and the one-off time to compress them
+  • the time to serve the endpoint from the cache, compressed, as a browser
+    asking for "gzip, deflate, br" gets it
+
+and checks that the new body decodes to exactly the same JSON. The list
+endpoints are also measured with format=columns, against their default
+objects-per-row body.
+
+    python benchmarks/bench_responses.py [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as dashboard  # noqa: E402
+import responses  # noqa: E402
+from flask import request  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+BROWSER = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def best_ms(fn, repeat: int) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, out
+
+
+def endpoint_urls() -> list[str]:
+    m = quote(dashboard.MANAGER_TABS[0])
+    return ["/api/hcr", "/api/hcr?format=columns", "/api/hcr?limit=100", "/api/hcr?limit=100&format=columns",
+            "/api/hcr/filters", "/api/hcr/facets", "/api/hcr/summary",
+            "/api/grrnrr", "/api/leaderboard", "/api/team_counts", "/api/meta",
+            f"/api/team/{m}", f"/api/team/{m}?format=columns", f"/api/team/{m}/summary",
+            "/api/bootstrap?parts=leaderboard,grrnrr,team_counts,meta"]
+
+
+def payload(url: str):
+    with dashboard.app.test_request_context(url):
+        view = dashboard.app.view_functions[request.endpoint]
+        return view.__wrapped__(**request.view_args)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    stock = DefaultJSONProvider(dashboard.app)
+    client = dashboard.app.test_client()
+    with client.session_transaction() as s:
+        s["authed"] = True
+
+    print(f"encoder: {'orjson' if responses.orjson else 'stdlib json'}, codings offered: "
+          f"{', '.join(responses.CODINGS)}  (ms: best of {args.repeat})\n")
+    print(f"  {'':<40}{'jsonify':>17}{'dumps()':>17}{'gzip':>15}{'brotli':>15}{'cached hit':>12}")
+    print(f"  {'':<40}{'bytes':>9}{'ms':>8}{'bytes':>9}{'ms':>8}{'bytes':>9}{'ms':>6}{'bytes':>9}{'ms':>6}{'ms':>12}")
+    totals = [0, 0, 0, 0]
+    failed = []
+    for url in endpoint_urls():
+        data = payload(url)
+        old_ms, old = best_ms(lambda: stock.response(data).get_data(), args.repeat)
+        new_ms, new = best_ms(lambda: responses.dumps(data), args.repeat)
+        if json.loads(old) != json.loads(new):
+            failed.append(url)
+        gz_ms, gz = best_ms(lambda: responses.compress(new, "gzip"), max(args.repeat // 4, 1))
+        row = f"  {url[:40]:<40}{len(old):>9,}{old_ms:>8.2f}{len(new):>9,}{new_ms:>8.2f}{len(gz):>9,}{gz_ms:>6.1f}"
+        br = b""
+        if "br" in responses.CODINGS:
+            br_ms, br = best_ms(lambda: responses.compress(new, "br"), max(args.repeat // 4, 1))
+            row += f"{len(br):>9,}{br_ms:>6.1f}"
+        else:
+            row += f"{'—':>15}"
+        client.get(url, headers=BROWSER)  # fill the cache (and the compressed variant)
+        hit_ms, resp = best_ms(lambda: client.get(url, headers=BROWSER), args.repeat)
+        assert resp.status_code == 200, (url, resp.status_code)
+        print(f"{row}{hit_ms:>12.2f}")
+        totals = [a + b for a, b in zip(totals, (len(old), len(new), len(gz), len(br)))]
+
+    print(f"\n  {'total':<40}{totals[0]:>9,}{'':>8}{totals[1]:>9,}{'':>8}{totals[2]:>9,}{'':>6}"
+          + (f"{totals[3]:>9,}" if totals[3] else ""))
+    if failed:
+        print(f"\n❌ body differs from jsonify(): {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ every body decodes to the same JSON as jsonify()")
+
+
+if __name__ == "__main__":
+    main()
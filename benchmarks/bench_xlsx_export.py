@@ -0,0 +1,190 @@
+"""
+Benchmark — Excel export of a synthetic manager tab (default 50k rows).
+
+Compares the original in-memory export (per-cell Font/Alignment/PatternFill,
+fetchall(), openpyxl.Workbook()) with the streaming write-only engine in
+xlsx_export.py. Each variant runs in its own subprocess so peak RSS is
+measured independently.
+
+    python benchmarks/bench_xlsx_export.py [--rows 50000]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from import_data import DDL_TEAM  # noqa: E402
+
+MANAGER = "Benchmark Manager"
+
+
+def build_db(path: str, rows: int):
+    """A revenue_team table with one manager tab of `rows` rows (≈5% subtotals)."""
+    rnd = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.execute(DDL_TEAM)
+    batch = []
+    team_no = 0
+    for i in range(1, rows + 1):
+        if i == rows:
+            team, is_total = "Grand Total", 2
+        elif i % 20 == 0:
+            team, is_total = f"Team {team_no} Total", 1
+            team_no += 1
+        else:
+            team, is_total = f"Team {team_no}", 0
+        batch.append((
+            MANAGER, team, rnd.choice(["Active", "Inactive"]), f"E{i:06d}", f"Employee {i}",
+            "2 Years 3 Months", rnd.uniform(1e4, 1e6), rnd.uniform(1e4, 5e5), rnd.uniform(0, 1e6),
+            rnd.random(), rnd.uniform(3e4, 2e5), rnd.uniform(0, 6), rnd.uniform(4e4, 3e5),
+            rnd.uniform(0, 5), rnd.random(), rnd.uniform(0.5, 1.5), rnd.uniform(1e4, 2e5),
+            rnd.uniform(1e4, 2e5), rnd.random(), "Q3 remark " * 8, "Q4 remark " * 12,
+            is_total, i,
+        ))
+    conn.executemany(
+        """INSERT INTO revenue_team (
+            manager_tab, team, status, emp_id, emp_name, tenure_ymd,
+            budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
+            salary_25_26, salary_multiple_25_26, total_expenses_25_26, sales_multiple_25_26,
+            grr, nrr, q4_pipe_target, q4_pipe_creation, q4_pipe_achievement_pct,
+            q3_remarks, q4_remarks, is_total, sort_order
+        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+        batch,
+    )
+    conn.execute("CREATE INDEX idx_team_manager ON revenue_team(manager_tab)")
+    conn.commit()
+    conn.close()
+
+
+def export_legacy(conn, manager: str, out):
+    """The original /api/download implementation, kept here as the baseline."""
+    import openpyxl
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        """SELECT team, status, emp_id, emp_name, tenure_ymd,
+                  budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
+                  salary_25_26, salary_multiple_25_26, total_expenses_25_26,
+                  sales_multiple_25_26, grr, nrr,
+                  q4_pipe_target, q4_pipe_creation, q4_pipe_achievement_pct,
+                  q3_remarks, q4_remarks, is_total
+           FROM revenue_team WHERE manager_tab = ? ORDER BY sort_order""",
+        (manager,),
+    ).fetchall()
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = manager[:31]
+    headers = [f"h{i}" for i in range(20)]
+    ws.cell(row=1, column=1, value=f"{manager} — Team Performance").font = Font(bold=True, size=14, color="FFFFFF")
+    ws.cell(row=1, column=1).fill = PatternFill("solid", fgColor="5C2DB8")
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
+    ws.cell(row=2, column=1, value=f"Generated {datetime.now():%d %b %Y, %H:%M} · {len(rows)} rows").font = Font(italic=True, size=10, color="6B6B6B")
+    ws.merge_cells(start_row=2, start_column=1, end_row=2, end_column=len(headers))
+    side = Side(style="thin", color="DDDDDD")
+    border = Border(left=side, right=side, top=side, bottom=side)
+    for col_idx, h in enumerate(headers, start=1):
+        c = ws.cell(row=4, column=col_idx, value=h)
+        c.font = Font(bold=True, color="FFFFFF", size=10)
+        c.fill = PatternFill("solid", fgColor="2A2C54")
+        c.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        c.border = border
+    for r_idx, row in enumerate(rows, start=5):
+        is_total = row["is_total"] or 0
+        row_fill = None
+        if is_total == 2:
+            row_fill = PatternFill("solid", fgColor="3A1A6A"); font_color = "FFFFFF"; bold = True
+        elif is_total == 1:
+            row_fill = PatternFill("solid", fgColor="2C1E57"); font_color = "FFFFFF"; bold = True
+        else:
+            font_color = "1A1A1A"; bold = False
+        for c_idx, v in enumerate(list(row)[:20], start=1):
+            c = ws.cell(row=r_idx, column=c_idx, value=v)
+            c.font = Font(color=font_color, bold=bold, size=10)
+            c.alignment = Alignment(vertical="top", wrap_text=(c_idx >= 19),
+                                    horizontal="right" if 6 <= c_idx <= 18 else "left")
+            c.border = border
+            if row_fill:
+                c.fill = row_fill
+            if c_idx in (6, 7, 8, 10, 12, 16, 17):
+                c.number_format = "#,##0"
+            elif c_idx in (9, 14, 15, 18):
+                c.number_format = "0.0%"
+            elif c_idx in (11, 13):
+                c.number_format = "0.00\"x\""
+    for i in range(1, 21):
+        ws.column_dimensions[get_column_letter(i)].width = 16
+    ws.freeze_panes = "E5"
+    wb.save(out)
+
+
+def export_streaming(conn, manager: str, out):
+    from xlsx_export import write_team_workbook
+    write_team_workbook(conn, manager, out)
+
+
+VARIANTS = {"legacy": export_legacy, "streaming": export_streaming}
+
+
+def run_variant(name: str, db_path: str):
+    """Child process: export once, print a JSON result line."""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn = sqlite3.connect(db_path)
+    buf = io.BytesIO()
+    t0 = time.perf_counter()
+    VARIANTS[name](conn, MANAGER, buf)
+    elapsed = time.perf_counter() - t0
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(json.dumps({
+        "variant": name,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(rss_after / 1024, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        "xlsx_bytes": buf.getbuffer().nbytes,
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--variant", choices=sorted(VARIANTS), help=argparse.SUPPRESS)
+    ap.add_argument("--db", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.db)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        print(f"Building synthetic manager tab ({args.rows:,} rows) …")
+        build_db(db_path, args.rows)
+        results = {}
+        for name in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--variant", name, "--db", db_path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[name] = json.loads(out.strip().splitlines()[-1])
+            r = results[name]
+            print(f"  {name:<10} {r['seconds']:>8.2f}s   peak RSS {r['peak_rss_mb']:>7.1f} MB"
+                  f"   (+{r['rss_growth_mb']:.1f} MB)   {r['xlsx_bytes'] / 1e6:.1f} MB xlsx")
+    speedup = results["legacy"]["seconds"] / results["streaming"]["seconds"]
+    print(f"\nstreaming export: {speedup:.2f}x faster, "
+          f"{results['legacy']['rss_growth_mb'] - results['streaming']['rss_growth_mb']:.0f} MB less RSS growth")
+
+
+if __name__ == "__main__":
+    main()
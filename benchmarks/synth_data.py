@@ -0,0 +1,420 @@
+"""
+Synthetic source data for benchmarks — a wfm_data.db at any scale.
+
+Generates the source sheets the importer reads, as the rows openpyxl would
+yield (header row first), and loads them through import_data.rebuild(). The
+result has the real schema, indexes, rollups, search index and planner
+statistics, and passes the importer's pre-publish checks:
+
+  • Revenue HCR        roster with skewed facets (status, leader, division,
+                       location, …), long remarks on most rows
+  • 7 manager tabs     teams of sellers, each closed by a "<team> Total"
+                       subtotal row, then a "Grand Total" row; sort_order is
+                       the sheet order
+  • GRR/NRR Export     churned, shrinking, growing and new-logo accounts,
+                       plus the sheet's Total / "Applied filters:" rows
+  • Rev_Perf_Leader    per-leader team rows, "<leader> Total" rows and a
+                       Grand Total, under the raw leader names the source uses
+
+The same rows can instead be saved as the three source workbooks
+(Final_Revenue_Mapping_Cursor.xlsx with the Revenue HCR sheet and the seven
+manager tabs, GRR_NRR_Account_Analysis.xlsx, Rev_Perf_Leader.xlsx), with the
+multi-line headers find_col() has to match, for timing the importer itself
+(see bench_import.py).
+
+Scale 1 is roughly the checked-in wfm_data.db (210 roster rows, ~240 team
+rows, ~1,300 accounts, ~40 pivot rows); every table grows linearly with it,
+and --hcr / --members / --accounts / --pivot-teams set a sheet's row count
+directly. The same seed always gives the same data.
+
+    python benchmarks/synth_data.py --scale 50 [--out /tmp/wfm_data_x50.db] [--seed 17]
+    python benchmarks/synth_data.py --scale 50 --workbooks /tmp/wfm_sources
+"""
+import argparse
+import contextlib
+import datetime as dt
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import openpyxl  # noqa: E402
+
+from import_data import (DB_PATH, GRR_NRR_XLSX, IMPORT_PRAGMAS, LEADER_PERF_XLSX, MANAGER_TABS,  # noqa: E402
+                         TEAM_UNIT, XLSX_PATH, analyze, fingerprint, import_unit, rebuild, source_units,
+                         verify_snapshot)
+
+# Roster sizes at scale 1, from the checked-in DB
+HCR_ROWS = 210
+TEAM_MEMBERS = {"Anurag Jain": 79, "Carla Shaw": 11, "Ashish Sikka": 34, "Humberto Bifani": 11,
+                "Sanchit Garg": 20, "Toby March": 35, "Vinay Verma": 13}
+ACCOUNTS = 1286
+TEAMS_PER_LEADER = 4
+
+FIRST = ["Aarav", "Aditi", "Akash", "Ana", "Ananya", "Anubhav", "Barkha", "Camila", "Carlos", "Chloe",
+         "Daniel", "Deepak", "Diego", "Elena", "Emma", "Farhan", "Gaurav", "Hannah", "Isabel", "Ishaan",
+         "Jessica", "Jonas", "Kavya", "Keith", "Laura", "Lucas", "Madhuri", "Maria", "Mateo", "Meera",
+         "Neha", "Nikhil", "Olivia", "Pablo", "Priya", "Rahul", "Riya", "Rohan", "Sara", "Sofia",
+         "Tanvi", "Thomas", "Valentina", "Vikram", "Yash", "Zoe"]
+LAST = ["Agrawal", "Bhasin", "Chopra", "Costa", "Das", "Fernandez", "Garcia", "Gupta", "Hoffmann",
+        "Iyer", "Jain", "Kaushik", "Khan", "Kumar", "Lopez", "Martin", "Mehta", "Muller", "Nair",
+        "Ospina", "Patel", "Rao", "Reddy", "Rossi", "Sharma", "Singh", "Smith", "Tiwari", "Verma",
+        "Wagner", "Yadav"]
+
+# (value, weight) — skewed like the real roster
+STATUS = [("Active", 68), ("Inactive", 32)]
+GENDER = [("Male", 58), ("Female", 42)]
+EMP_TYPE = [("Full time", 100), ("International FTE", 70), ("International Contract", 33),
+            ("RainMaker", 2), ("Contractor - Direct", 2), ("Apprentice", 2), ("Intern", 1)]
+ENTITY = [("RateGain Travel Technologies Ltd (RG India)", 101), ("RateGain Technologies Ltd (RG UK)", 46),
+          ("RateGain Technologies Spain S.L. (RG Spain)", 20), ("RateGain Technologies Inc (RG US)", 14),
+          ("RateGain Technologies LLC (RG UAE)", 10), ("RateGain Germany GmbH (RG Germany)", 7),
+          ("RateGain Technologies Pte Ltd (RG Singapore)", 5), ("RateGain Japan KK (RG Japan)", 3)]
+DIVISION = [(("Shared Business", "Shared Business"), 152), (("DaaS", "Travel DaaS"), 32),
+            (("MarTech", "Demand Booster"), 12), (("MarTech", "SoHo"), 7),
+            (("Distribution", "Distribution"), 4), (("DaaS", "UNO"), 1), (("Business Enablement", "BCV"), 1)]
+DEPARTMENT = [("Revenue", 198), ("Business Growth & Strategy", 11), ("Sales Enablement", 1)]
+SUB_DEPARTMENT = ["Sales", "Account Management", "Customer Success", "Inside Sales", "SDR",
+                  "Pre-Sales", "Partnerships", "General Management"]
+DESIGNATION = ["Sales Manager", "Senior Sales Manager", "Account Manager", "Key Account Manager",
+               "Business Development Executive", "Sales Development Representative", "Director - Sales",
+               "Associate Director - Sales", "Vice President - Sales", "Customer Success Manager",
+               "Inside Sales Executive", "Regional Sales Director"]
+LOCATION = [("Noida, Uttar Pradesh, India, (HQ-Noida)", 101), ("Barcelona, Catalonia, Spain, (BAR-Barcelona)", 14),
+            ("Sharjah, Sharjah, United Arab Emirates, (SHJ-Sharjah)", 7), ("Leipzig, Leipzig, Germany, (LE1-Leipzig)", 5),
+            ("Bangkok, Bangkok, Thailand", 5), ("London, London, United Kingdom, (Europe-Remote)", 4)] + \
+           [(f"{city}, (Remote)", 1) for city in ("Austin, Texas, United States", "Singapore, Singapore",
+                                                  "Sydney, New South Wales, Australia", "Paris, France",
+                                                  "Mexico City, Mexico", "Tokyo, Japan", "Dubai, UAE",
+                                                  "Bengaluru, Karnataka, India", "Madrid, Spain", "Lisbon, Portugal")]
+# Source-file spellings, as in Rev_Perf_Leader.xlsx / the roster
+LEADERS = [("Anurag Vinod Jain", 94), ("Parijat Tiwari", 26), ("Sanchit Garg", 21), ("Vinay Varma", 12),
+           ("Ashish Sikka", 11), ("Bhanu Chopra", 10), ("Keith Christopher Toby March", 10),
+           ("Carla Sue Shaw", 9), ("Humberto L Bifani", 8), ("Yogeesh Chandra", 5), ("Toby March", 4)]
+HRBP = ["Sonali Srivastava", "Harsh Jeewani", "Candler Foster", "Maria Jose Viciano Martin", "Aditi Bajpai",
+        "Ashu Sharma", "Neha Kapoor", "Ritika Arora", "Ines Moreno"]
+BAND = ["M3", "J2", "L1", "M2", "M1", "L3", "L2", "J1", "G3", "G2", "C1", "E1", "E2", "S1", "S2"]
+
+REGIONS = ["APAC", "APMEA", "MEA", "NORAM", "LATAM", "EUROPE", "Travel Air", "Rev.AI + Car", "SoHo", "BCV",
+           "Demand Booster", "UNO", "DaaS", "Enterprise", "Retail"]
+FUNCTIONS = ["Sales", "AM", "SDR", "Inside Sales", "Client Services", "OTA & SD", "Partnerships"]
+PRODUCTS = [f"Product {c}{n}" for c in "ABCDEFGH" for n in range(1, 6)]
+
+REMARKS = [
+    "Operates as {designation} with a people-management charter under {manager}; therefore not measured on "
+    "an individual sales / revenue target for Q4. Performance is read through aggregated team output — Ach% "
+    "and pipeline health for sellers, GRR/NRR and renewal quality for the AM book — alongside deal coaching.",
+    "Exit completed; last working day was {exit}. Knowledge transfer and account / territory re-allocation "
+    "were closed out by {manager}, and the backfill plan is being managed in line with the FY'26–27 design.",
+    "Pacing ahead of plan — ${sales:,.0f} of new sales delivered, {mult:.2f}x salary multiple. Anchored on "
+    "two enterprise logos; current quarter trajectory continues over-achievement.",
+    "Ramp is on track, but outbound consistency is below expectations. Delivered {mult:.2f}x salary multiple. "
+    "If Q1 targets are not met, a decision will be taken. HRBP has communicated the performance.",
+    "No revenue targets, as the employee is in the client service team. Annual rating & appraisal "
+    "discussion done with {manager} and the HRBP.",
+]
+
+HCR_HEADER = ("Employee ID", "Full Name", "DOJ", "Tenure", "Official Email", "HRBP Name", "Status", "Gender",
+              "Leader", "Employee Type", "Manager Name", "Entity", "Division", "Sub Division", "Department",
+              "Sub Department", "Designation", "Office Location", "Direct Manager Email",
+              "Contribution Level", "Date of Exit", "Employee Subtype", "Band", "Q4 Remarks (HR)",
+              "Q4 Remarks", "Q3 Remarks (Aditi)")
+TEAM_HEADER = ("Team", "Status", "Emp Id", "Name", "Tenure\n(Y/M/D)", "Budget FY\n25-26", "Budget YTD\n25-26",
+               "New Sales\n25-26", "Ach % (25-26)", "Salary\nFY 25-26", "Salary Multiple (25-26)",
+               "Total Expenses\n25-26", "Sales Multiple (25-26)", "GRR", "NRR", "Q4 Pipe Target",
+               "Q4 Pipe Creation", "Q4 Pipe Achievement %", "Q3 Remarks", "Q4 Remarks (HR-calibrated)")
+TEAM_HEADER_ALT = TEAM_HEADER[:8] + ("Ach% (25-26)",) + TEAM_HEADER[9:-1] + ("Q4 Remarks",)
+ACCOUNT_HEADER = ("Account", "Product", "AM", "Rev FY 24-25", "Churn", "GRR", "Downsell", "Upsell", "NRR",
+                  "New Revenue", "Rev FY 25-26")
+LEADER_HEADER = ("Leader", "Team", "Budget FY 25-26", "Budget YTD 25-26", "New Sales 25-26", "Ach % 25-26",
+                 "Salary 25-26", "Salary Mult 25-26", "Commission 25-26", "Travel Exp 25-26",
+                 "Total Expenses 25-26", "Sales Mult 25-26", "Ach % 24-25", "Salary Mult 24-25",
+                 "Sales Mult 24-25")
+# Rev_Perf_Leader.xlsx leader names → manager tab they roll up to
+PIVOT_LEADERS = ["Anurag Jain", "Sanchit Garg", "Toby March", "Vinay Varma", "Carla Shaw", "Yogeesh Chandra",
+                 "EUROPE", "Humberto L Bifani"]
+
+
+def pick(rnd: random.Random, weighted: list[tuple]):
+    values, weights = zip(*weighted)
+    return rnd.choices(values, weights)[0]
+
+
+def ratio(a, b):
+    return a / b if b else 0.0
+
+
+# ─────────────────────────── sheets ───────────────────────────
+def hcr_sheet(n: int, seed: int = 17) -> list[tuple]:
+    """'Revenue HCR' sheet: header + `n` employees."""
+    rnd = random.Random(seed)
+    names = [f"{rnd.choice(FIRST)} {rnd.choice(LAST)}" for _ in range(n)]
+    managers = names[:max(5, n // 4)]
+    today = dt.datetime(2026, 5, 1)
+    rows = [HCR_HEADER]
+    for i, name in enumerate(names):
+        doj = today - dt.timedelta(days=int(rnd.expovariate(1 / 1500)) + 30)
+        days = (today - doj).days
+        status = pick(rnd, STATUS)
+        manager = rnd.choice(managers)
+        division, sub_division = pick(rnd, DIVISION)
+        designation = rnd.choice(DESIGNATION)
+        exit_date = (today - dt.timedelta(days=rnd.randint(1, 200))) if status == "Inactive" else None
+        level = "PM" if rnd.random() < 0.25 else "IC"
+        context = {"designation": designation, "manager": manager, "mult": rnd.uniform(0.1, 4),
+                   "sales": rnd.lognormvariate(11, 1), "exit": f"{exit_date.month}/{exit_date.day}/{exit_date.year}" if exit_date else ""}
+        remark = rnd.choice(REMARKS[1:2] if exit_date else REMARKS[:1] if level == "PM" else REMARKS[2:])
+        email = f"{name.lower().replace(' ', '.')}{i}@rategain.com"
+        rows.append((
+            str(1000 + i), name, doj, f"{days // 365} years {days % 365 // 30} months  {days % 30} days",
+            email, rnd.choice(HRBP) if rnd.random() > 0.05 else None, status, pick(rnd, GENDER),
+            pick(rnd, LEADERS), pick(rnd, EMP_TYPE), manager, pick(rnd, ENTITY), division, sub_division,
+            pick(rnd, DEPARTMENT), rnd.choice(SUB_DEPARTMENT), designation, pick(rnd, LOCATION),
+            f"{manager.lower().replace(' ', '.')}@rategain.com", level, exit_date,
+            f"Weekly Hours {rnd.choice((20, 25))}" if rnd.random() < 0.015 else None, rnd.choice(BAND),
+            remark.format(**context) if rnd.random() < 0.9 else None,
+            rnd.choice(["Team Manager, no individual target for Q4", "On track", "Below plan",
+                        "Exit completed", None]),
+            remark.format(**context)[:160] if rnd.random() < 0.1 else None,
+        ))
+    return rows
+
+
+def manager_sheet(tab: str, members: int, seed: int = 17) -> list[tuple]:
+    """One manager tab: teams of `members` people in all, a "<team> Total" row
+    after each team, "Grand Total" last."""
+    rnd = random.Random(f"{seed}:{tab}")
+    # Header wording differs between the real tabs; find_col() matches either
+    rows = [TEAM_HEADER if MANAGER_TABS.index(tab) % 2 == 0 else TEAM_HEADER_ALT]
+    grand = [0.0] * 5
+    team_no, used = 0, set()
+    while members > 0:
+        size = min(members, rnd.randint(2, 12))
+        members -= size
+        team_no += 1
+        team = f"{rnd.choice(REGIONS)} - {rnd.choice(FUNCTIONS)}"
+        if team in used:
+            team = f"{team} {team_no}"
+        used.add(team)
+        sums = [0.0] * 5
+        for _ in range(size):
+            status = pick(rnd, [("Active", 80), ("Inactive", 8), ("Terminated", 12)])
+            budget = rnd.choice([0.0, 0.0, round(rnd.lognormvariate(13, 0.8), -3)])
+            sales = round(rnd.lognormvariate(11, 1.2), 2) if rnd.random() > 0.1 else 0.0
+            salary = round(rnd.uniform(30_000, 150_000), 2)
+            expenses = round(salary * rnd.uniform(1.0, 1.2), 2)
+            pipe_target = round(budget / 4, 2) if budget and rnd.random() < 0.4 else None
+            pipe_creation = round(pipe_target * rnd.uniform(0, 2), 2) if pipe_target else None
+            am_team = "AM" in team
+            values = [budget, budget, sales, salary, expenses]
+            sums = [a + b for a, b in zip(sums, values)]
+            named = status != "Terminated"
+            name = f"{rnd.choice(FIRST)} {rnd.choice(LAST)}" if named else None
+            months = rnd.randint(1, 240)
+            remark = rnd.choice(REMARKS[2:]).format(manager=tab, mult=ratio(sales, salary), sales=sales,
+                                                    designation="", exit="")
+            rows.append((
+                team, status, str(rnd.randint(1000, 9999)) if named else None, name,
+                f"{months // 12} Years {months % 12} Months" if named else None,
+                budget, budget, sales, ratio(sales, budget), salary, ratio(sales, salary), expenses,
+                ratio(sales, expenses),
+                round(rnd.uniform(0.7, 1.0), 4) if am_team else None,
+                round(rnd.uniform(0.8, 1.4), 4) if am_team else None,
+                pipe_target, pipe_creation, ratio(pipe_creation or 0, pipe_target) if pipe_target else None,
+                remark if named and rnd.random() < 0.3 else None,
+                remark if named and rnd.random() < 0.8 else None,
+            ))
+        grand = [a + b for a, b in zip(grand, sums)]
+        rows.append(total_row(f"{team} Total", sums))
+    rows.append(total_row("Grand Total", grand))
+    return rows
+
+
+def total_row(label: str, sums: list) -> tuple:
+    budget, ytd, sales, salary, expenses = sums
+    return (label, None, None, None, None, budget, ytd, sales, ratio(sales, budget), salary,
+            ratio(sales, salary), expenses, ratio(sales, expenses)) + (None,) * 7
+
+
+def accounts(n: int, seed: int = 17):
+    """account_analysis tuples: churned, shrinking, growing and new-logo
+    accounts, revenue rounded to $100 so the top-N lists have ties, plus the
+    sheet's Total / "Applied filters:" rows and some blank AMs."""
+    rnd = random.Random(seed)
+    ams = [f"AM {i:04d}" for i in range(max(n // 500, 1))]
+    for i in range(n):
+        product = rnd.choice(PRODUCTS)
+        am = rnd.choice(ams) if rnd.random() > 0.02 else rnd.choice([None, "", "  "])
+        kind = rnd.random()
+        prev = round(rnd.lognormvariate(10, 1.5), -2)
+        churn = downsell = upsell = new = None
+        if kind < 0.08:                       # new logo
+            prev, new = None, round(rnd.lognormvariate(9, 1.2), -2)
+        elif kind < 0.20:                     # fully churned
+            churn = -prev
+        elif kind < 0.45:                     # shrinking
+            downsell = -round(prev * rnd.uniform(0.05, 0.6), -2)
+        elif kind < 0.75:                     # growing
+            upsell = round(prev * rnd.uniform(0.05, 0.8), -2)
+        cur = (prev or 0) + (churn or 0) + (downsell or 0) + (upsell or 0) + (new or 0)
+        grr = (prev + (churn or 0) + (downsell or 0)) / prev if prev else None
+        nrr = cur / prev if prev else None
+        yield (f"Account {i:07d}", product, am, prev, churn, grr, downsell, upsell, nrr, new,
+               cur if cur or prev else None)
+    yield ("Total", None, None, 1e12, -1e10, 0.9, -1e9, 1e10, 1.05, 1e8, 1.1e12)
+    yield ("Applied filters:\nConsider Accounts is 1", None, None, None, None, None, None, None, None, None, None)
+
+
+def account_sheet(n: int, seed: int = 17) -> list[tuple]:
+    """GRR/NRR 'Export' sheet with `n` accounts (same column order as account_analysis)."""
+    return [ACCOUNT_HEADER] + list(accounts(n, seed))
+
+
+def leader_perf_sheet(teams_per_leader: int, seed: int = 17) -> list[tuple]:
+    """Rev_Perf_Leader pivot: team rows per leader, "<leader> Total" rows, "Grand Total"."""
+    rnd = random.Random(f"{seed}:leaders")
+    rows = [LEADER_HEADER]
+    grand = [0.0] * 6
+    for leader in PIVOT_LEADERS:
+        sums = [0.0] * 6
+        for t in range(teams_per_leader):
+            budget = rnd.choice([0.0, round(rnd.lognormvariate(13.5, 0.8), 2)])
+            sales = round(rnd.lognormvariate(13, 1), 2) if rnd.random() > 0.15 else 0.0
+            salary = round(rnd.lognormvariate(12.5, 0.6), 2)
+            commission = round(sales * rnd.uniform(0, 0.05), 2)
+            travel = round(rnd.uniform(0, 0.1) * salary, 2)
+            values = [budget, budget, sales, salary, commission, travel]
+            sums = [a + b for a, b in zip(sums, values)]
+            rows.append(pivot_row(leader, f"{rnd.choice(REGIONS)} - {rnd.choice(FUNCTIONS)} {t + 1}", values,
+                                  rnd))
+        grand = [a + b for a, b in zip(grand, sums)]
+        rows.append(pivot_row(f"{leader} Total", None, sums, rnd))
+    rows.append(pivot_row("Grand Total", None, grand, rnd))
+    return rows
+
+
+def pivot_row(leader: str, team: str | None, values: list, rnd: random.Random) -> tuple:
+    budget, ytd, sales, salary, commission, travel = values
+    expenses = salary + commission + travel
+    return (leader, team, budget, ytd, sales, ratio(sales, budget), salary, ratio(sales, salary), commission,
+            travel, expenses, ratio(sales, expenses), rnd.uniform(0, 1), rnd.uniform(0, 3), rnd.uniform(0, 2))
+
+
+def sizes(scale: float = 1.0, **counts) -> dict:
+    """Row counts per sheet at `scale`: {"hcr", "members", "accounts",
+    "pivot_teams"}, any of them overridden by `counts`. "members" (team rows
+    over all tabs) is split across the tabs like the real workbook's."""
+    out = {"hcr": HCR_ROWS * scale, "members": sum(TEAM_MEMBERS.values()) * scale,
+           "accounts": ACCOUNTS * scale, "pivot_teams": TEAMS_PER_LEADER * scale}
+    out.update((k, v) for k, v in counts.items() if v is not None)
+    return {k: max(1, round(v)) for k, v in out.items()}
+
+
+def sources(scale: float = 1.0, seed: int = 17, **counts) -> dict:
+    """{import unit: sheet rows}, the shape import_data.load_sources() returns."""
+    n = sizes(scale, **counts)
+    weight = sum(TEAM_MEMBERS.values())
+    out = {"revenue_hcr": hcr_sheet(n["hcr"], seed)}
+    for tab in MANAGER_TABS:
+        out[TEAM_UNIT + tab] = manager_sheet(tab, max(1, round(n["members"] * TEAM_MEMBERS[tab] / weight)), seed)
+    out["account_analysis"] = account_sheet(n["accounts"], seed)
+    out["leader_perf_pivot"] = leader_perf_sheet(n["pivot_teams"], seed)
+    return out
+
+
+def write_workbooks(directory: str, data: dict) -> tuple[str, str, str]:
+    """Save `data` (see sources()) as the three source workbooks → paths in
+    import_data.load_sources() order."""
+    paths = (os.path.join(directory, os.path.basename(XLSX_PATH)),
+             os.path.join(directory, os.path.basename(GRR_NRR_XLSX)),
+             os.path.join(directory, os.path.basename(LEADER_PERF_XLSX)))
+    sheets = [[("Revenue HCR", data["revenue_hcr"])] + [(tab, data[TEAM_UNIT + tab]) for tab in MANAGER_TABS],
+              [("Export", data["account_analysis"])],
+              [("Rev_Perf_Leader", data["leader_perf_pivot"])]]
+    for path, book in zip(paths, sheets):
+        wb = openpyxl.Workbook(write_only=True)  # streams rows to disk
+        for title, rows in book:
+            ws = wb.create_sheet(title)
+            for row in rows:
+                ws.append(row)
+        wb.save(path)
+    return paths
+
+
+# ─────────────────────────── DB build ───────────────────────────
+def build_db(path: str, scale: float, seed: int = 17, quiet: bool = True, **counts) -> dict:
+    """Write a synthetic wfm_data.db at `path` through the importer → {table: rows}."""
+    if os.path.abspath(path) == os.path.abspath(DB_PATH):
+        raise ValueError(f"refusing to overwrite the real {DB_PATH}")
+    if os.path.exists(path):
+        os.remove(path)
+    data = sources(scale, seed, **counts)
+    conn = sqlite3.connect(path)
+    try:
+        for pragma in IMPORT_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("BEGIN")
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            rebuild(lambda unit, c: import_unit(unit, data[unit], c), conn)
+        conn.executemany("INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
+                         [(f"fingerprint:{unit}", fingerprint(data[unit])) for unit in source_units()]
+                         + [("last_loaded_at", "2026-05-01T00:00:00"),
+                            ("source_file", f"synthetic scale={scale:g} seed={seed}")])
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            analyze(conn)  # as publish() does — rebuild() leaves sqlite_stat1 to its caller
+        conn.commit()
+        problems = verify_snapshot(conn)
+        if problems:
+            raise RuntimeError("synthetic DB failed the pre-publish checks: " + "; ".join(problems))
+        return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("revenue_hcr", "revenue_team", "account_analysis", "leader_perf_pivot")}
+    finally:
+        conn.close()
+
+
+def add_size_args(ap: argparse.ArgumentParser):
+    ap.add_argument("--scale", type=float, default=10.0)
+    ap.add_argument("--seed", type=int, default=17)
+    ap.add_argument("--hcr", type=int, default=None, help="roster rows (default: 210 × scale)")
+    ap.add_argument("--members", type=int, default=None, help="team rows over all 7 tabs (default: 203 × scale)")
+    ap.add_argument("--accounts", type=int, default=None, help="GRR/NRR accounts (default: 1,286 × scale)")
+    ap.add_argument("--pivot-teams", type=int, default=None, help="pivot teams per leader (default: 4 × scale)")
+
+
+def size_args(args) -> dict:
+    return {"hcr": args.hcr, "members": args.members, "accounts": args.accounts, "pivot_teams": args.pivot_teams}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_args(ap)
+    ap.add_argument("--out", default=None, help="DB to write (default: wfm_data_x<scale>.db in the temp dir)")
+    ap.add_argument("--workbooks", default=None, metavar="DIR",
+                    help="write the three source .xlsx workbooks to DIR instead of a DB")
+    args = ap.parse_args()
+    t0 = time.perf_counter()
+    if args.workbooks:
+        os.makedirs(args.workbooks, exist_ok=True)
+        data = sources(args.scale, args.seed, **size_args(args))
+        for path in write_workbooks(args.workbooks, data):
+            print(f"  ✓ {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+        print(f"✅ workbooks (scale {args.scale:g}) in {time.perf_counter() - t0:.1f}s")
+        return
+    out = args.out or os.path.join(tempfile.gettempdir(), f"wfm_data_x{args.scale:g}.db")
+    try:
+        counts = build_db(out, args.scale, args.seed, **size_args(args))
+    except (ValueError, RuntimeError) as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ {out} (scale {args.scale:g}) in {time.perf_counter() - t0:.1f}s")
+    for table, n in counts.items():
+        print(f"  {table:<20}{n:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Revenue Report — data-access helpers shared by the dashboard routes.
+
+  • data_version()  — cheap fingerprint of the wfm_data.db snapshot currently
+                      on disk (revenue_meta.last_loaded_at + file mtime/size)
+  • ResultCache     — process-wide, version-keyed LRU for endpoint payloads
+  • ConnectionPool  — reusable read-only SQLite connections
+
+`wfm_data.db` only changes when `import_data.py` runs, so every aggregate the
+API serves can be computed once per data version and shared by all requests.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wfm_data.db")
+
+
+# ─────────────────────────── data version ───────────────────────────
+_version_lock = threading.Lock()
+_version_state = {"stat": None, "version": None, "loaded_at": None, "modified": None}
+
+
+def _read_loaded_at() -> str | None:
+    """Read revenue_meta.last_loaded_at with a short-lived read-only connection."""
+    try:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, timeout=5)
+    except sqlite3.OperationalError:
+        return None
+    try:
+        row = conn.execute(
+            "SELECT value FROM revenue_meta WHERE key = 'last_loaded_at'"
+        ).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def _loaded_at_utc(loaded_at: str | None, mtime: float) -> datetime:
+    """last_loaded_at is written in the importer's local time; fall back to the
+    file mtime when it's missing or unparsable."""
+    try:
+        return datetime.fromisoformat(loaded_at).astimezone(timezone.utc)
+    except (TypeError, ValueError):
+        return datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+
+
+def data_version() -> str | None:
+    """Fingerprint of the current DB snapshot, or None if the DB is missing.
+
+    Only an os.stat() per call — SQLite is touched again only when the file's
+    inode/mtime/size change (i.e. after an import swapped in a new file).
+    """
+    try:
+        st = os.stat(DB_PATH)
+    except OSError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    state = _version_state
+    if state["stat"] == key:
+        return state["version"]
+    with _version_lock:
+        if state["stat"] != key:
+            loaded_at = _read_loaded_at()
+            raw = f"{loaded_at}|{st.st_ino}|{st.st_mtime_ns}|{st.st_size}"
+            state["loaded_at"] = loaded_at
+            state["modified"] = _loaded_at_utc(loaded_at, st.st_mtime)
+            state["version"] = hashlib.sha1(raw.encode()).hexdigest()[:16]
+            state["stat"] = key
+    return state["version"]
+
+
+def data_loaded_at() -> str | None:
+    """revenue_meta.last_loaded_at for the current data version."""
+    data_version()
+    return _version_state["loaded_at"]
+
+
+def data_last_modified() -> datetime | None:
+    """UTC timestamp of the current data version (for Last-Modified)."""
+    if data_version() is None:
+        return None
+    return _version_state["modified"]
+
+
+# ─────────────────────────── result cache ───────────────────────────
+_CURRENT = object()  # get_or_compute(): compute against whatever data_version() is now
+
+
+class ResultCache:
+    """Bounded LRU of computed payloads, flushed whenever data_version() moves.
+
+    Concurrent misses on the same key are collapsed: the first caller computes,
+    the rest wait for its result instead of re-running the same queries.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._key_locks: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version):
+        # Caller holds self._lock.
+        if version != self._version:
+            if self._data:
+                self.invalidations += 1
+            self._data.clear()
+            self._key_locks.clear()
+            self._version = version
+
+    def get_or_compute(self, key, compute, cacheable=lambda v: True, version=_CURRENT):
+        """Cached value for `key`, computing it on a miss.
+
+        `version` pins the data version `compute` reads (the snapshot of the
+        connection it runs on, see PooledConnection.snapshot_version). If an
+        import has swapped the file since, the value is computed but neither
+        served from nor stored in the cache, so an old snapshot's result is
+        never filed under the new version.
+        """
+        current = data_version()
+        if version is not _CURRENT and version != current:
+            return compute()
+        version = current
+        with self._lock:
+            self._sync_version(version)
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if self._version == version and key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return self._data[key]
+                self.misses += 1
+            ok = False
+            try:
+                value = compute()
+                ok = cacheable(value)
+            finally:
+                with self._lock:
+                    if ok and self._version == version:
+                        self._data[key] = value
+                        self._data.move_to_end(key)
+                        while len(self._data) > self.maxsize:
+                            self._data.popitem(last=False)
+                            self.evictions += 1
+                    self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._key_locks.clear()
+            self._version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version":       self._version,
+                "size":          len(self._data),
+                "maxsize":       self.maxsize,
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_rate":      (self.hits / lookups) if lookups else None,
+                "evictions":     self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# ─────────────────────────── connection pool ───────────────────────────
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times every call into SQLite (execute and each fetch).
+
+    Reports to its connection's `metrics` (request totals, see
+    request_metrics.py) and `profiler` (per statement, see sql_profiler.py):
+    profiler.begin() on execute, spent() after every call, with the rows it
+    returned and whether the statement is exhausted, and end() when the
+    cursor is closed or dropped early.
+    """
+
+    def _mark(self) -> tuple:
+        profiler = self.connection.profiler
+        return time.perf_counter(), profiler.steps(self.connection) if profiler is not None else 0
+
+    def _spent(self, mark: tuple, queries: int = 0, rows: int = 0, done: bool = False):
+        t0, steps = mark
+        elapsed = time.perf_counter() - t0
+        conn = self.connection
+        if conn.metrics is not None:
+            conn.metrics.add_sql(elapsed, queries)
+        if conn.profiler is not None:
+            conn.profiler.spent(self, elapsed, rows, steps, done)
+
+    def execute(self, sql, parameters=(), /):
+        if self.connection.profiler is not None:
+            self.connection.profiler.begin(self, sql)
+        mark = self._mark()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._spent(mark, queries=1)
+
+    def fetchone(self):
+        mark, row = self._mark(), None
+        try:
+            row = super().fetchone()
+            return row
+        finally:
+            self._spent(mark, rows=row is not None, done=row is None)
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        mark, rows = self._mark(), None
+        try:
+            rows = super().fetchmany(size)
+            return rows
+        finally:
+            n = len(rows) if rows is not None else 0
+            self._spent(mark, rows=n, done=n < size)
+
+    def fetchall(self):
+        mark, rows = self._mark(), None
+        try:
+            rows = super().fetchall()
+            return rows
+        finally:
+            self._spent(mark, rows=len(rows) if rows is not None else 0, done=True)
+
+    def __next__(self):
+        mark, row = self._mark(), None
+        try:
+            row = super().__next__()
+            return row
+        finally:
+            self._spent(mark, rows=row is not None, done=row is None)
+
+    def close(self):
+        if self.connection.profiler is not None:
+            self.connection.profiler.end(self)
+        super().close()
+
+    def __del__(self):
+        profiler = self.connection.profiler
+        if profiler is not None:
+            profiler.end(self)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() is a no-op so existing handler code
+    can keep calling it; the pool decides when the handle is really closed.
+
+    While `metrics` (a sampled request holds the handle) or `profiler` (the
+    SQL profiler is on) is set, cursors are TimedCursors; otherwise they are
+    the stock C ones, at no cost.
+    """
+
+    metrics = None
+    profiler = None
+    snapshot_version = None  # data_version() of the file this handle reads (set by the app's get_db)
+
+    def cursor(self, factory=sqlite3.Cursor):
+        if (self.metrics is not None or self.profiler is not None) and factory is sqlite3.Cursor:
+            factory = TimedCursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=(), /):
+        if self.metrics is None and self.profiler is None:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def close(self):
+        pass
+
+    def really_close(self):
+        super().close()
+
+
+def _file_identity(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of read-only connections to DB_PATH.
+
+    A connection is checked out per request and returned afterwards, so the
+    file open, schema parse and page cache are paid once per pooled handle
+    instead of once per request. Handles are reopened when the DB file is
+    replaced (new inode) and health-checked after sitting idle.
+    """
+
+    HEALTH_CHECK_AFTER = 30.0  # seconds idle before a `SELECT 1` probe
+
+    def __init__(self, path: str = DB_PATH, maxsize: int = 8):
+        self.path = path
+        self.maxsize = maxsize
+        self._idle: list = []  # [(conn, identity, returned_at)]
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _open(self):
+        try:
+            # URI form so we can pass mode=ro — Vercel's filesystem is read-only
+            conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, timeout=5,
+                check_same_thread=False, factory=PooledConnection,
+            )
+        except sqlite3.OperationalError:
+            conn = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False, factory=PooledConnection,
+            )
+        conn.row_factory = sqlite3.Row
+        self.opened += 1
+        return conn
+
+    def _healthy(self, conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        identity = _file_identity(self.path)
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, conn_identity, returned_at = self._idle.pop()
+            if conn_identity != identity or (
+                time.monotonic() - returned_at > self.HEALTH_CHECK_AFTER
+                and not self._healthy(conn)
+            ):
+                conn.really_close()
+                self.discarded += 1
+                continue
+            self.reused += 1
+            conn._pool_identity = conn_identity
+            return conn
+        conn = self._open()
+        conn._pool_identity = identity
+        return conn
+
+    def release(self, conn):
+        conn.metrics = None
+        if conn.in_transaction:
+            conn.rollback()
+        identity = getattr(conn, "_pool_identity", None)
+        with self._lock:
+            if len(self._idle) < self.maxsize and identity == _file_identity(self.path):
+                self._idle.append((conn, identity, time.monotonic()))
+                return
+        conn.really_close()
+        self.discarded += 1
+
+    def prune(self) -> int:
+        """Close idle handles that point at a superseded DB file; returns how many."""
+        identity = _file_identity(self.path)
+        with self._lock:
+            stale = [entry for entry in self._idle if entry[1] != identity]
+            self._idle = [entry for entry in self._idle if entry[1] == identity]
+        for conn, _, _ in stale:
+            conn.really_close()
+        self.discarded += len(stale)
+        return len(stale)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            conn.really_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "maxsize":   self.maxsize,
+            "idle":      idle,
+            "opened":    self.opened,
+            "reused":    self.reused,
+            "discarded": self.discarded,
+        }
@@ -0,0 +1,350 @@
+"""
+Revenue Report — columnar GRR/NRR engine.
+
+`/api/grrnrr` used to answer from eight queries over account_analysis, each
+re-evaluating the ACCOUNT_BASE filter and the same CASE expressions. Here the
+table is read once per data version into NumPy columns, with product and AM
+dictionary-encoded as integer codes, and the whole payload is computed from
+those arrays: headline KPIs, product cohorts, AM books and the top-N lists.
+
+The output has the SQL's shape, value types and ordering:
+  • SUM() over CASE … ELSE 0 is a float when any row took the THEN branch
+    and the integer 0 otherwise; COALESCE(…, 0) of an empty SUM() is int 0;
+  • cohorts order by rev_25_26 DESC then label, top-N lists by value DESC
+    then row_order DESC, the SQL's explicit tie-breaks.
+Sums agree with SQLite's to floating-point tolerance, not bit for bit: the
+order SQLite adds rows in depends on the query plan, and the engine doesn't
+try to follow it.
+
+app.py only uses it for filtered slices (?product=, ?am=, ?min_rev=, with or
+without ?group_by=); the whole book, grouped or not, is served from the
+import-time rollup tables.
+
+NumPy is optional: without it `available()` is False and app.py keeps
+using the SQL queries.
+"""
+try:
+    import numpy as np
+except ImportError:  # optional — app.py falls back to SQL
+    np = None
+
+from bisect import bisect_left
+
+from grr_slices import BAND_EDGES, REVENUE_BANDS
+from rollups import ACCOUNT_BASE
+
+NUMERIC = ["rev_24_25", "churn", "grr", "downsell", "upsell", "nrr", "new_revenue", "rev_25_26"]
+TEXT = ["account", "product", "am"]
+
+TOP_N = 10
+AT_RISK_N = 15
+
+
+def available() -> bool:
+    return np is not None
+
+
+# ─────────────────────────── columns ───────────────────────────
+def _encode(values: list, keep) -> tuple:
+    """(codes, labels): labels are the kept distinct values in sorted (BINARY
+    collation) order; rows whose value fails `keep` get code len(labels)."""
+    labels = sorted(v for v in set(values) if keep(v))
+    index = {v: i for i, v in enumerate(labels)}
+    other = len(labels)
+    codes = np.fromiter((index.get(v, other) for v in values), dtype=np.int32, count=len(values))
+    return codes, labels
+
+
+def _not_blank(v) -> bool:
+    return v is not None and v.strip(" ") != ""
+
+
+class AccountColumns:
+    """account_analysis rows inside ACCOUNT_BASE, in row_order, as arrays.
+
+    Numeric columns are float64 with NaN for NULL; `account`/`product`/`am`
+    are object arrays of the raw values. `product_code` / `am_code` index
+    `products` / `ams` (AMs that are blank get code len(ams)), `band_code`
+    indexes grr_slices.REVENUE_BANDS.
+
+    `terms` holds each SUM() argument of the rollup SQL, evaluated once:
+    name → (value, taken), value being 0.0 where the row doesn't take the
+    THEN branch (or the column is NULL).
+
+    select() / take() cut out a slice (see grr_slices.py) as its own
+    AccountColumns.
+    """
+
+    def __init__(self, rows: list):
+        table = np.array(rows, dtype=object) if rows else np.empty((0, len(TEXT) + len(NUMERIC)), dtype=object)
+        for i, name in enumerate(TEXT):
+            setattr(self, name, table[:, i])
+        numeric = table[:, len(TEXT):]
+        numeric[np.equal(numeric, None)] = np.nan
+        for i, name in enumerate(NUMERIC):
+            setattr(self, name, numeric[:, i].astype(np.float64))
+        self.product_code, self.products = _encode(self.product, lambda v: True)
+        self.am_code, self.ams = _encode(self.am, _not_blank)
+        self._derive()
+
+        # Row positions per product / AM, and by rev_24_25 (NULLs last), for select()
+        self.product_rows = _grouped(self.product_code, len(self.products))
+        self.am_rows = _grouped(self.am_code, len(self.ams))
+        self.by_rev = np.argsort(self.rev_24_25, kind="stable")
+        self.rev_sorted = self.rev_24_25[self.by_rev][:np.count_nonzero(~np.isnan(self.rev_24_25))]
+
+    def _derive(self):
+        """Per-row terms and orders computed from the columns."""
+        self.n = len(self.account)
+        rev = self.rev_24_25
+        has_rev = ~np.isnan(rev)
+        terms = {
+            "rev_24_25":   (rev, has_rev),
+            "rev_25_26":   (self.rev_25_26, ~np.isnan(self.rev_25_26)),
+            "churn":       (self.churn, self.churn < 0),
+            "upsell":      (self.upsell, self.upsell > 0),
+            "downsell":    (self.downsell, self.downsell < 0),
+            "new_revenue": (self.new_revenue, self.new_revenue > 0),
+            "grr_weight":  (self.grr * rev, has_rev & ~np.isnan(self.grr)),
+            "nrr_weight":  (self.nrr * rev, has_rev & ~np.isnan(self.nrr)),
+        }
+        self.terms = {name: (np.where(taken, value, 0.0), taken) for name, (value, taken) in terms.items()}
+        self.band_code = np.where(rev > 0, np.searchsorted(BAND_EDGES, rev, side="right") + 1, 0)
+
+    def select(self, filters: dict):
+        """Row positions (ascending) matching grr_slices filters {product, am, min_rev}."""
+        idx = None
+        for name, labels, grouped in (("product", self.products, self.product_rows),
+                                      ("am", self.ams, self.am_rows)):
+            if name in filters:
+                rows = _group_rows(labels, grouped, filters[name])
+                idx = rows if idx is None else np.intersect1d(idx, rows, assume_unique=True)
+        if "min_rev" in filters:
+            if idx is None:
+                start = np.searchsorted(self.rev_sorted, filters["min_rev"], side="left")
+                idx = np.sort(self.by_rev[start:len(self.rev_sorted)])
+            else:
+                idx = idx[self.rev_24_25[idx] >= filters["min_rev"]]
+        return np.arange(self.n) if idx is None else idx
+
+    def take(self, idx) -> "AccountColumns":
+        """The rows at positions `idx` (ascending) as an AccountColumns of their own."""
+        part = object.__new__(AccountColumns)
+        for name in TEXT + NUMERIC + ["product_code", "am_code"]:
+            setattr(part, name, getattr(self, name)[idx])
+        part.products, part.ams = self.products, self.ams
+        part._derive()
+        return part
+
+
+def _grouped(codes, groups: int) -> tuple:
+    """(row positions ordered by code, then row_order; start offset of each code)."""
+    order = np.argsort(codes, kind="stable")
+    return order, np.searchsorted(codes[order], np.arange(groups + 1))
+
+
+def _group_rows(labels: list, grouped: tuple, value):
+    """Row positions (ascending) of the group labelled `value` — none if unknown."""
+    i = bisect_left(labels, value)
+    if i == len(labels) or labels[i] != value:
+        return np.empty(0, dtype=np.intp)
+    order, starts = grouped
+    return order[starts[i]:starts[i + 1]]
+
+
+def load_accounts(conn) -> "AccountColumns":
+    """Read account_analysis into an AccountColumns (one query)."""
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples
+    rows = cur.execute(
+        f"SELECT {', '.join(TEXT + NUMERIC)} {ACCOUNT_BASE} ORDER BY row_order").fetchall()
+    return AccountColumns(rows)
+
+
+# ─────────────────────────── SQL-shaped aggregates ───────────────────────────
+def _group_sums(cols: "AccountColumns", codes, groups: int) -> dict:
+    """name → (per-group SUM of the term, rows taken per group), for every term."""
+    out = {}
+    for name, (value, taken) in cols.terms.items():
+        out[name] = (np.bincount(codes, value, minlength=groups)[:groups],
+                     np.bincount(codes[taken], minlength=groups)[:groups])
+    return out
+
+
+def _coalesced(sums) -> list:
+    """COALESCE(SUM(…), 0): a float where any row was taken, else the int 0."""
+    total, taken = sums
+    return [float(s) if t else 0 for s, t in zip(total, taken)]
+
+
+def _weighted(num, den) -> list:
+    """SUM(ratio * weight) / NULLIF(SUM(weight), 0) — None where SQL gives NULL."""
+    return [float(n) / float(d) if n_t and d_t and d != 0 else None
+            for n, n_t, d, d_t in zip(num[0], num[1], den[0], den[1])]
+
+
+def cohorts(cols: "AccountColumns", codes, labels: list, key: str, by_revenue: bool = True) -> list[dict]:
+    """_COHORT_COLUMNS per `labels` group that has rows — largest rev_25_26
+    first, ties by label (cohort_select's `ORDER BY rev_25_26 DESC, key`),
+    or in label order when not `by_revenue`."""
+    g = len(labels)
+    sums = _group_sums(cols, codes, g)
+    measures = {
+        "accounts":    [int(c) for c in np.bincount(codes, minlength=g)[:g]],
+        "rev_24_25":   _coalesced(sums["rev_24_25"]),
+        "rev_25_26":   _coalesced(sums["rev_25_26"]),
+        "churn":       [abs(v) for v in _coalesced(sums["churn"])],
+        "upsell":      _coalesced(sums["upsell"]),
+        "downsell":    [abs(v) for v in _coalesced(sums["downsell"])],
+        "new_revenue": _coalesced(sums["new_revenue"]),
+        "grr":         _weighted(sums["grr_weight"], sums["rev_24_25"]),
+        "nrr":         _weighted(sums["nrr_weight"], sums["rev_24_25"]),
+    }
+    out = [{key: label} for label in labels]
+    for name, values in measures.items():
+        for row, v in zip(out, values):
+            row[name] = v
+    out = [row for row in out if row["accounts"]]
+    if by_revenue:
+        out.sort(key=lambda r: -r["rev_25_26"])  # stable: ties keep label order
+    return out
+
+
+def headline(cols: "AccountColumns") -> dict:
+    """agg_account_headline's row (before yoy_delta / yoy_pct)."""
+    sums = _group_sums(cols, np.zeros(cols.n, dtype=np.intp), 1)
+
+    def total(name):
+        return _coalesced(sums[name])[0]
+
+    def count(flag):
+        # SUM(CASE … THEN 1 ELSE 0) over no rows is NULL
+        return int(np.count_nonzero(flag)) if cols.n else None
+
+    # Composite GRR / NRR: rows with rev_24_25 > 0 only
+    weighted = cols.rev_24_25 > 0
+    part = {name: ([cols.terms[name][0][weighted].sum()], [np.count_nonzero(cols.terms[name][1][weighted])])
+            for name in ("rev_24_25", "grr_weight", "nrr_weight")}
+    grr = _weighted(part["grr_weight"], part["rev_24_25"])[0]
+    nrr = _weighted(part["nrr_weight"], part["rev_24_25"])[0]
+
+    return {
+        "total_accounts":      cols.n,
+        "rev_24_25":           total("rev_24_25"),
+        "rev_25_26":           total("rev_25_26"),
+        "total_churn":         abs(total("churn")),
+        "total_downsell":      abs(total("downsell")),
+        "total_upsell":        total("upsell"),
+        "total_new_revenue":   total("new_revenue"),
+        "churned_accounts":    count(cols.terms["churn"][1]),
+        "downsell_accounts":   count(cols.terms["downsell"][1]),
+        "upsell_accounts":     count(cols.terms["upsell"][1]),
+        "growth_accounts":     count(cols.nrr > 1.10),
+        "at_risk_accounts":    count(cols.nrr < 0.90),
+        "fully_lost_accounts": count(cols.grr == 0),
+        "new_logo_accounts":   count(cols.terms["new_revenue"][1]),
+        "composite_grr":       0 if grr is None else grr,
+        "composite_nrr":       0 if nrr is None else nrr,
+    }
+
+
+# ─────────────────────────── top-N ───────────────────────────
+def top_rows(key, mask, k: int):
+    """Row positions of the `k` largest `key` values among `mask` rows,
+    largest first, ties by descending position (= row_order).
+
+    argpartition finds the k-th largest value; only rows at or above it
+    (ties included) are then sorted.
+    """
+    idx = np.flatnonzero(mask)
+    if idx.size > k:
+        vals = key[idx]
+        threshold = vals[np.argpartition(vals, idx.size - k)[idx.size - k]]
+        idx = idx[vals >= threshold]
+    return idx[np.lexsort((-idx, -key[idx]))][:k]
+
+
+def _num(v):
+    return None if v != v else float(v)  # NaN is NULL
+
+
+def _records(cols: "AccountColumns", idx, fields: list[str], **computed) -> list[dict]:
+    """Output rows for positions `idx`, with `fields` in order — straight from
+    the columns, or from computed[field](position) when given."""
+    out = []
+    for i in idx.tolist():
+        row = {}
+        for f in fields:
+            if f in computed:
+                row[f] = computed[f](i)
+            else:
+                v = getattr(cols, f)[i]
+                row[f] = v if f in TEXT else _num(v)
+        out.append(row)
+    return out
+
+
+def _abs_or_zero(column):
+    """ABS(COALESCE(column, 0)) of row i."""
+    return lambda i: 0 if np.isnan(column[i]) else abs(float(column[i]))
+
+
+def grrnrr(cols: "AccountColumns", group_by: str | None = None) -> dict:
+    """The /api/grrnrr payload (summary without the yoy fields app.py adds).
+
+    `group_by` (product / am / band) adds the "groups" cohorts, keyed "group":
+    every AM with a name rather than only the AM books, and revenue bands in
+    band order.
+    """
+    head = headline(cols)
+    products = cohorts(cols, cols.product_code, cols.products, "product")
+    ams = [r for r in cohorts(cols, cols.am_code, cols.ams, "am") if r["rev_24_25"] > 0]
+
+    base = ["account", "product", "am", "rev_24_25", "rev_25_26"]
+    top_revenue = _records(cols, top_rows(cols.rev_25_26, ~np.isnan(cols.rev_25_26), TOP_N),
+                           base + ["grr", "nrr"])
+    top_churn = _records(cols, top_rows(np.abs(cols.churn), cols.terms["churn"][1], TOP_N),
+                         base + ["churn", "grr", "nrr"], churn=_abs_or_zero(cols.churn))
+    top_upsell = _records(cols, top_rows(cols.upsell, cols.terms["upsell"][1], TOP_N),
+                          base + ["upsell", "nrr"])
+    risky = (cols.nrr < 0.90) & (cols.rev_24_25 > 50000) & (np.isnan(cols.grr) | (cols.grr > 0))
+    at_risk = _records(cols, top_rows(cols.rev_24_25, risky, AT_RISK_N),
+                       base + ["churn", "downsell", "grr", "nrr"],
+                       churn=_abs_or_zero(cols.churn), downsell=_abs_or_zero(cols.downsell))
+
+    out = {
+        "summary":     head,
+        "products":    products,
+        "ams":         ams,
+        "top_revenue": top_revenue,
+        "top_churn":   top_churn,
+        "top_upsell":  top_upsell,
+        "at_risk":     at_risk,
+    }
+    if group_by is not None:
+        codes, labels = {"product": (cols.product_code, cols.products),
+                         "am":      (cols.am_code, cols.ams),
+                         "band":    (cols.band_code, REVENUE_BANDS)}[group_by]
+        out["group_by"] = group_by
+        out["groups"] = cohorts(cols, codes, labels, "group", by_revenue=group_by != "band")
+    return out
+
+
+# ─────────────────────────── comparison ───────────────────────────
+TOLERANCE = 1e-9  # relative; sums may be added in a different order than SQLite's
+
+
+def mismatch(a, b, path: str = "") -> str | None:
+    """First difference between two payloads ("path: a vs b"), or None when
+    they agree — same keys, order and types, floats within TOLERANCE."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        if list(a) != list(b):
+            return f"{path or '.'}: keys {list(a)} vs {list(b)}"
+        return next(filter(None, (mismatch(a[k], b[k], f"{path}.{k}") for k in a)), None)
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return f"{path}: {len(a)} vs {len(b)} items"
+        return next(filter(None, (mismatch(x, y, f"{path}[{i}]") for i, (x, y) in enumerate(zip(a, b)))), None)
+    if isinstance(a, float) and isinstance(b, float):
+        return None if abs(a - b) <= TOLERANCE * max(1.0, abs(a), abs(b)) else f"{path}: {a!r} vs {b!r}"
+    return None if type(a) is type(b) and a == b else f"{path}: {a!r} vs {b!r}"
@@ -0,0 +1,67 @@
+"""
+Revenue Report — GRR/NRR slices.
+
+/api/grrnrr can be narrowed to part of the account book and broken down by
+one dimension:
+
+    ?product=<name>    accounts of one product (exact match)
+    ?am=<name>         accounts of one account manager (exact match)
+    ?min_rev=<number>  accounts with rev_24_25 ≥ number (FY24-25 book)
+    ?group_by=product|am|band
+                       adds "groups": the slice's cohorts by that dimension
+
+Every figure of a slice — headline, composite GRR/NRR, cohorts, top-N —
+is computed exactly as for the whole book, just over fewer rows, so the
+revenue weighting of composite GRR/NRR does not change.
+
+Revenue bands bucket accounts by their FY24-25 revenue; accounts without
+one (new logos, blank rows) fall in band 0.
+"""
+
+GROUP_BY = ("product", "am", "band")
+
+REVENUE_BANDS = ["No FY24-25 revenue", "< $10K", "$10K–50K", "$50K–250K", "$250K–1M", "$1M+"]
+BAND_EDGES = [10_000, 50_000, 250_000, 1_000_000]  # lower bounds of bands 2…5
+
+
+class SliceError(ValueError):
+    """Bad slice parameter — reported to the client as a 400."""
+
+
+def parse_slice(args) -> tuple[dict, str | None]:
+    """({product, am, min_rev} actually set, group_by) from request.args."""
+    filters: dict = {}
+    for name in ("product", "am"):
+        if (args.get(name) or "").strip():
+            filters[name] = args[name]
+    raw = (args.get("min_rev") or "").strip()
+    if raw:
+        try:
+            filters["min_rev"] = float(raw)
+        except ValueError:
+            raise SliceError(f"min_rev must be a number, got {raw!r}")
+        if filters["min_rev"] != filters["min_rev"]:
+            raise SliceError("min_rev must be a number, got 'nan'")
+    group_by = (args.get("group_by") or "").strip() or None
+    if group_by is not None and group_by not in GROUP_BY:
+        raise SliceError(f"Unsupported group_by '{group_by}' — use one of: {', '.join(GROUP_BY)}")
+    return filters, group_by
+
+
+def slice_where(filters: dict) -> tuple[str, list]:
+    """("AND …", params) to append to ACCOUNT_BASE for `filters`."""
+    terms, params = [], []
+    for name in ("product", "am"):
+        if name in filters:
+            terms.append(f"AND {name} = ?")
+            params.append(filters[name])
+    if "min_rev" in filters:
+        terms.append("AND rev_24_25 >= ?")
+        params.append(filters["min_rev"])
+    return " ".join(terms), params
+
+
+def band_sql(column: str = "rev_24_25") -> str:
+    """SQL expression giving the REVENUE_BANDS index of `column`."""
+    whens = " ".join(f"WHEN {column} < {edge} THEN {i + 1}" for i, edge in enumerate(BAND_EDGES))
+    return f"CASE WHEN {column} > 0 THEN CASE {whens} ELSE {len(BAND_EDGES) + 1} END ELSE 0 END"
@@ -0,0 +1,98 @@
+"""
+Revenue Report — HCR facet counts.
+
+`facet_counts()` works out, for every roster filter (status, manager,
+division, …), how many rows carry each value, conditioned on the filters
+already selected. It follows the usual faceted-search rule: a facet ignores
+its own selection, so the alternatives stay visible with their counts, and
+applies every other selection.
+
+All facets come from one read of the table. The WHERE clause keeps only rows
+that miss at most one active filter. A row that matches every filter counts
+towards all facets. A row that misses exactly one counts only towards that
+filter's facet.
+"""
+from collections import Counter
+
+from hcr_search import match_subquery
+
+# ?param= name → revenue_hcr column
+FACETS = {
+    "status":       "status",
+    "manager":      "manager_name",
+    "division":     "division",
+    "sub_division": "sub_division",
+    "leader":       "leader",
+    "department":   "department",
+    "entity":       "entity",
+    "location":     "office_location",
+    "emp_type":     "emp_type",
+}
+
+
+def active_filters(args) -> dict:
+    """{facet: value} for the facet parameters set in `args` (a request.args-like mapping)."""
+    return {name: args.get(name) for name in FACETS if args.get(name)}
+
+
+def is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip(" "))
+
+
+def facet_counts(conn, filters: dict, q: str = "", fts: bool = False) -> dict:
+    """{"total": rows matching every filter, "facets": {facet: Counter(value → rows)}}.
+
+    `filters` is {facet: value} (see active_filters()); `q` is an /api/hcr
+    search string that every counted row must match (`fts`: use hcr_fts).
+    Blank values are counted too, under their raw value (None / "").
+    """
+    names = list(FACETS)
+    active = [(n, filters[n]) for n in names if filters.get(n)]
+    cols = ", ".join(f"revenue_hcr.{FACETS[n]}" for n in names)
+
+    # _miss: which single active filter a combination fails (NULL when none)
+    params: list = []
+    if active:
+        miss = "CASE " + " ".join(f"WHEN revenue_hcr.{FACETS[n]} IS NOT ? THEN {names.index(n)}"
+                                  for n, _ in active) + " END"
+        params += [v for _, v in active]
+    else:
+        miss = "NULL"
+    sql = f"SELECT {cols}, {miss} AS _miss, COUNT(*) FROM revenue_hcr"
+
+    match_sql, match_params = match_subquery(q, fts)
+    if match_sql:
+        sql += f" JOIN ({match_sql}) m ON m.hit_id = revenue_hcr.row_order"
+        params += match_params
+    if len(active) > 1:
+        sql += " WHERE " + " + ".join(f"(revenue_hcr.{FACETS[n]} IS NOT ?)" for n, _ in active) + " <= 1"
+        params += [v for _, v in active]
+    sql += f" GROUP BY {cols}"
+
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples
+    facets = {n: Counter() for n in names}
+    total = 0
+    for *values, missed, n in cur.execute(sql, params):
+        if missed is None:
+            total += n
+            for name, v in zip(names, values):
+                facets[name][v] += n
+        else:
+            facets[names[missed]][values[missed]] += n
+    return {"total": total, "facets": facets}
+
+
+def facet_values(counts: Counter) -> list[dict]:
+    """[{value, count}] for one facet in dropdown (value) order, blanks left out."""
+    return [{"value": v, "count": counts[v]} for v in sorted(v for v in counts if not is_blank(v))]
+
+
+def top_values(counts: Counter, limit: int | None = None) -> list[tuple]:
+    """(value, count) pairs, largest count first.
+
+    Ties come in descending value order with blanks last, the order the
+    GROUP BY … ORDER BY COUNT(*) DESC queries this replaced returned them in.
+    """
+    ranked = sorted(counts.items(), key=lambda kv: (kv[1], not is_blank(kv[0]), kv[0] or ""), reverse=True)
+    return ranked[:limit] if limit else ranked
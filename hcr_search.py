@@ -0,0 +1,99 @@
+"""
+Revenue Report — HCR full-text search.
+
+`import_data.py` builds `hcr_fts`, an FTS5 trigram index over the roster's
+searchable columns (external content on revenue_hcr, rowid = row_order), so a
+substring search is an index lookup instead of a LIKE scan per keystroke.
+
+`match_subquery()` turns a `?q=` string into a sub-select yielding
+(hit_id, score) — hit_id is revenue_hcr.row_order, lower score = better match.
+Both /api/hcr and /api/hcr/typeahead join against it. Without the index
+(older DB, or a SQLite without the trigram tokenizer) the same sub-select is
+answered with LIKE, just slower.
+
+The query is one phrase, as before the index existed: "sales ind" matches
+rows with that substring (case-insensitive) in some column, not rows holding
+"sales" and "ind" apart. Trigrams need 3+ characters, so shorter queries are
+answered with LIKE.
+"""
+import sqlite3
+
+FTS_TABLE = "hcr_fts"
+TRIGRAM = 3  # shortest term the trigram index can answer
+FTS_COLUMNS = ["full_name", "employee_id", "designation",
+               "official_email", "department", "office_location"]
+
+DDL_FTS = f"""
+CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+    {', '.join(FTS_COLUMNS)},
+    content='revenue_hcr', content_rowid='row_order', tokenize='trigram'
+)
+"""
+
+
+def build_hcr_fts(conn: sqlite3.Connection) -> bool:
+    """(Re)build hcr_fts from revenue_hcr; False if FTS5 trigram is unavailable."""
+    conn.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    try:
+        conn.execute(DDL_FTS)
+    except sqlite3.OperationalError as e:
+        print(f"  ⚠ FTS5 trigram index unavailable ({e}) — HCR search will use LIKE")
+        return False
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    n = conn.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+    print(f"  ✓ {FTS_TABLE}: {n} rows indexed")
+    return True
+
+
+def has_hcr_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone() is not None
+
+
+def check_hcr_fts(conn: sqlite3.Connection) -> list[str]:
+    """FTS5 integrity-check against revenue_hcr (empty list when OK or absent)."""
+    if not has_hcr_fts(conn):
+        return []
+    try:
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')")
+    except sqlite3.DatabaseError as e:
+        return [f"{FTS_TABLE}: {e}"]
+    return []
+
+
+def search_phrase(q: str) -> str:
+    return q.strip()
+
+
+def indexable(q: str) -> bool:
+    """True when the phrase is long enough for the trigram index."""
+    return len(search_phrase(q)) >= TRIGRAM
+
+
+def _like(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _any_column_like() -> str:
+    return "(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in FTS_COLUMNS) + ")"
+
+
+def match_subquery(q: str, fts: bool) -> tuple[str | None, list]:
+    """(sql, params) selecting (hit_id, score) for every roster row matching `q`.
+
+    Returns (None, []) for a blank query. `fts` says whether hcr_fts can be
+    used (see has_hcr_fts()).
+    """
+    phrase = search_phrase(q)
+    if not phrase:
+        return None, []
+    if fts and indexable(phrase):
+        # One quoted FTS5 string: a trigram phrase = the substring, spaces
+        # included; no query syntax leaks
+        match = '"' + phrase.replace('"', '""') + '"'
+        return (f"SELECT rowid AS hit_id, bm25({FTS_TABLE}) AS score "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"), [match]
+    return (f"SELECT row_order AS hit_id, 0 AS score FROM revenue_hcr WHERE {_any_column_like()}",
+            [_like(phrase)] * len(FTS_COLUMNS))
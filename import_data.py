@@ -6,18 +6,53 @@ Tables created:
   • revenue_hcr   — full headcount roster (Revenue HCR sheet)
   • revenue_team  — unified per-manager team performance (7 manager tabs)
   • revenue_meta  — small KV store (e.g. last_loaded_at)
+  • agg_*         — materialized rollups served by the API (see rollups.py)
+  • hcr_fts       — FTS5 trigram index for HCR search (see hcr_search.py)
+
+plus the composite indexes every API query is planned against (INDEXES,
+audited by `query_audit.py`) and fresh planner statistics (ANALYZE).
+
+Every import builds a copy of the DB next to it (base tables and rollups in
+one transaction), runs `PRAGMA integrity_check` plus the rollup check on it,
+and only then swaps it in atomically with os.replace() — a running dashboard
+never reads a half-built DB.
+`python import_data.py --check` verifies the stored rollups against a live
+recomputation without re-importing anything.
+
+`python import_data.py --incremental` fingerprints every source sheet and
+reloads only the tables whose cell values changed since the last import (plus
+the rollups derived from them), leaving a DB identical to a full rebuild; when
+nothing changed the DB isn't written at all, so the dashboard's data version
+stays put.
+
+`python import_data.py --jobs N` parses the workbooks and the individual
+manager sheets in N worker processes, each writing a staging DB that is then
+merged in with ATTACH + INSERT … SELECT. The result is identical to a serial
+import.
 
 Drops the old WFM tables (cost_summary, dadk_*, productivity_*, adara_*,
 devops_*, it_helpdesk*, soho_*, customer_experience*) so the DB reflects
 only the new structure.
 """
+import argparse
+import hashlib
 import os
+import shutil
 import sqlite3
+import sys
+import tempfile
+import time
 import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from typing import Any
 
 import openpyxl
 
+from hcr_search import build_hcr_fts, check_hcr_fts
+from rollups import build_rollups, check_rollups
+from xlsx_export import EXPORTS_TABLE, store_exports
+
 HERE = os.path.dirname(os.path.abspath(__file__))
 XLSX_PATH = os.path.join(HERE, "Final_Revenue_Mapping_Cursor.xlsx")
 GRR_NRR_XLSX = os.path.join(HERE, "GRR_NRR_Account_Analysis.xlsx")
@@ -220,60 +255,126 @@ CREATE TABLE leader_perf_pivot (
 """
 
 
-# ─────────────────────────── importers ───────────────────────────
-def import_hcr(ws, conn):
-    """Import the 'Revenue HCR' sheet."""
-    cur = conn.cursor()
-    inserted = 0
+# ─────────────────────────── bulk loading ───────────────────────────
+BATCH_SIZE = 5000
 
-    def cell(row, i):
-        return row[i] if i < len(row) else None
+# Connection settings for the duration of an import. The rebuild runs in one
+# transaction, so a crash still rolls back (the journal is kept in memory).
+IMPORT_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -65536",   # 64 MiB page cache
+    "PRAGMA temp_store = MEMORY",
+]
 
-    for idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        # Skip fully empty rows
-        if not any(c is not None and str(c).strip() != "" for c in row):
-            continue
-        cur.execute(
-            """INSERT INTO revenue_hcr (
+# Created once all rows are in — building an index in one pass is much
+# cheaper than maintaining it row by row during the load. Every query app.py
+# runs is served by one of these without a full scan or a temp sort — see
+# `query_audit.py`, which fails when a new query needs one that's missing.
+# The revenue_hcr (column, full_name) indexes back the whitelisted /api/hcr
+# `sort=` keys and the filtered lists (each entry is implicitly followed by
+# rowid, i.e. the keyset order).
+INDEXES = [
+    # manager tabs: rows in sheet order, per-tab summary (status counts,
+    # top sellers, team list) and the org-wide leaderboard top 10s
+    "CREATE INDEX IF NOT EXISTS idx_team_manager ON revenue_team(manager_tab, sort_order)",
+    "CREATE INDEX IF NOT EXISTS idx_team_tab_status ON revenue_team(manager_tab, is_total, status)",
+    "CREATE INDEX IF NOT EXISTS idx_team_tab_sales ON revenue_team(manager_tab, is_total, new_sales_25_26)",
+    "CREATE INDEX IF NOT EXISTS idx_team_tab_team ON revenue_team(manager_tab, is_total, team)",
+    "CREATE INDEX IF NOT EXISTS idx_team_status_ach ON revenue_team(is_total, status, ach_pct_25_26)",
+    "CREATE INDEX IF NOT EXISTS idx_team_status_sales ON revenue_team(is_total, status, new_sales_25_26)",
+    # roster: sort= and facet filter columns (hcr_facets.FACETS), plus one
+    # covering index in FACETS column order for the facet-count pass
+    "CREATE INDEX IF NOT EXISTS idx_hcr_name ON revenue_hcr(full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_emp_id_name ON revenue_hcr(employee_id, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_doj_name ON revenue_hcr(doj, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_status_name ON revenue_hcr(status, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_manager_name ON revenue_hcr(manager_name, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_division_name ON revenue_hcr(division, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_designation_name ON revenue_hcr(designation, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_leader_name ON revenue_hcr(leader, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_sub_division_name ON revenue_hcr(sub_division, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_department_name ON revenue_hcr(department, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_entity_name ON revenue_hcr(entity, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_location_name ON revenue_hcr(office_location, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_emp_type_name ON revenue_hcr(emp_type, full_name)",
+    "CREATE INDEX IF NOT EXISTS idx_hcr_facets ON revenue_hcr(status, manager_name, division, sub_division,"
+    " leader, department, entity, office_location, emp_type)",
+    # GRR/NRR: top-N account lists walk these in ORDER BY order
+    "CREATE INDEX IF NOT EXISTS idx_acc_am ON account_analysis(am)",
+    "CREATE INDEX IF NOT EXISTS idx_acc_product ON account_analysis(product)",
+    "CREATE INDEX IF NOT EXISTS idx_acc_rev ON account_analysis(rev_25_26)",
+    "CREATE INDEX IF NOT EXISTS idx_acc_prev_rev ON account_analysis(rev_24_25)",
+    "CREATE INDEX IF NOT EXISTS idx_acc_churn ON account_analysis(ABS(churn))",
+    "CREATE INDEX IF NOT EXISTS idx_acc_upsell ON account_analysis(upsell)",
+    # leaderboard: leader-total rows by new sales, grand-total row
+    "CREATE INDEX IF NOT EXISTS idx_lp_leader ON leader_perf_pivot(leader)",
+    "CREATE INDEX IF NOT EXISTS idx_lp_total_sales ON leader_perf_pivot(is_leader_total, new_sales_25_26)",
+    "CREATE INDEX IF NOT EXISTS idx_lp_grand ON leader_perf_pivot(is_grand_total)",
+]
+# Superseded by the composites above; dropped when an incremental import
+# refreshes an older DB in place
+OBSOLETE_INDEXES = ["idx_team_status", "idx_hcr_status", "idx_hcr_manager", "idx_hcr_emp_id",
+                    "idx_hcr_doj", "idx_hcr_division", "idx_hcr_designation", "idx_hcr_leader",
+                    "idx_lp_total", "idx_hcr_status_leader", "idx_hcr_department", "idx_hcr_emp_type",
+                    "idx_hcr_location", "idx_hcr_sub_division", "idx_hcr_entity"]
+
+
+def bulk_insert(cur, sql: str, rows) -> int:
+    """executemany() `rows` (any iterable) in BATCH_SIZE chunks; returns the row count."""
+    it = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(it, BATCH_SIZE))
+        if not batch:
+            return total
+        cur.executemany(sql, batch)
+        total += len(batch)
+
+
+def rate(n: int, t0: float) -> str:
+    """' (12,345 rows/s)' for n rows since perf_counter() t0."""
+    elapsed = time.perf_counter() - t0
+    return f" ({n / elapsed:,.0f} rows/s)" if elapsed > 0 else ""
+
+
+def is_blank_row(row) -> bool:
+    return not any(c is not None and str(c).strip() != "" for c in row)
+
+
+def padded(row, width: int) -> tuple:
+    """Read-only worksheets can yield short rows — pad them with None."""
+    return row if len(row) >= width else tuple(row) + (None,) * (width - len(row))
+
+
+# ─────────────────────────── importers ───────────────────────────
+SQL_HCR = """INSERT INTO revenue_hcr (
                 row_order, employee_id, full_name, doj, tenure, official_email,
                 hrbp_name, status, gender, leader, emp_type, manager_name,
                 entity, division, sub_division, department, sub_department,
                 designation, office_location, direct_manager_email, contribution_level,
                 date_of_exit, employee_subtype, band, q4_remarks_hr, q4_remarks,
                 q3_remarks_aditi
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (
-                idx,
-                to_str(cell(row, 0)),
-                to_str(cell(row, 1)),
-                to_str(cell(row, 2)),
-                to_str(cell(row, 3)),
-                to_str(cell(row, 4)),
-                to_str(cell(row, 5)),
-                to_str(cell(row, 6)),
-                to_str(cell(row, 7)),
-                to_str(cell(row, 8)),
-                to_str(cell(row, 9)),
-                to_str(cell(row, 10)),
-                to_str(cell(row, 11)),
-                to_str(cell(row, 12)),
-                to_str(cell(row, 13)),
-                to_str(cell(row, 14)),
-                to_str(cell(row, 15)),
-                to_str(cell(row, 16)),
-                to_str(cell(row, 17)),
-                to_str(cell(row, 18)),
-                to_str(cell(row, 19)),
-                to_str(cell(row, 20)),
-                to_str(cell(row, 21)),
-                to_str(cell(row, 22)),
-                to_str(cell(row, 23)),
-                to_str(cell(row, 24)),
-                to_str(cell(row, 25)),
-            ),
-        )
-        inserted += 1
-    print(f"  ✓ revenue_hcr: {inserted} rows")
+            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+HCR_COLUMNS = 26  # source columns A..Z → employee_id … q3_remarks_aditi
+
+
+def hcr_rows(rows):
+    """revenue_hcr tuples for the 'Revenue HCR' sheet (row_order = sheet row)."""
+    for idx, row in enumerate(islice(rows, 1, None), start=2):
+        # Skip fully empty rows
+        if is_blank_row(row):
+            continue
+        row = padded(row, HCR_COLUMNS)
+        yield (idx,) + tuple(to_str(row[i]) for i in range(HCR_COLUMNS))
+
+
+def import_hcr(rows, conn):
+    """Import the 'Revenue HCR' sheet."""
+    t0 = time.perf_counter()
+    inserted = bulk_insert(conn.cursor(), SQL_HCR, hcr_rows(rows))
+    print(f"  ✓ revenue_hcr: {inserted} rows{rate(inserted, t0)}")
 
 
 def find_col(headers: list[str], *needles: str) -> int | None:
@@ -288,18 +389,21 @@ def find_col(headers: list[str], *needles: str) -> int | None:
     return None
 
 
-def import_leader_perf(conn):
-    """Import the per-leader pivot (Rev_Perf_Leader.xlsx) — drives the Leaderboard view."""
-    if not os.path.exists(LEADER_PERF_XLSX):
-        print(f"  ⚠ {LEADER_PERF_XLSX} not found, skipping leader_perf_pivot import")
-        return
-    wb = openpyxl.load_workbook(LEADER_PERF_XLSX, data_only=True)
-    ws = wb.active
-    cur = conn.cursor()
-    inserted = 0
-    for row in ws.iter_rows(min_row=2, values_only=True):
+SQL_LEADER_PERF = """INSERT INTO leader_perf_pivot (
+                leader_raw, leader, team, is_leader_total, is_grand_total,
+                budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
+                salary_25_26, salary_mult_25_26, commission_25_26, travel_exp_25_26,
+                total_expenses_25_26, sales_mult_25_26,
+                ach_pct_24_25, salary_mult_24_25, sales_mult_24_25
+            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
+
+def leader_perf_rows(rows):
+    """leader_perf_pivot tuples for the Rev_Perf_Leader pivot sheet."""
+    for row in islice(rows, 1, None):
         if not row or not row[0]:
             continue
+        row = padded(row, 15)
         leader_raw = to_str(row[0])
         is_grand  = leader_raw and leader_raw.lower() == "grand total"
         is_total  = bool(leader_raw and leader_raw.endswith(" Total") and not is_grand)
@@ -311,62 +415,65 @@ def import_leader_perf(conn):
         else:
             leader_name_only = leader_raw
         leader_canonical = LEADER_NAME_MAP.get(leader_name_only, leader_name_only) if leader_name_only else None
-        cur.execute(
-            """INSERT INTO leader_perf_pivot (
-                leader_raw, leader, team, is_leader_total, is_grand_total,
-                budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
-                salary_25_26, salary_mult_25_26, commission_25_26, travel_exp_25_26,
-                total_expenses_25_26, sales_mult_25_26,
-                ach_pct_24_25, salary_mult_24_25, sales_mult_24_25
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (
-                leader_raw, leader_canonical, to_str(row[1]),
-                1 if is_total else 0, 1 if is_grand else 0,
-                to_num(row[2]),  to_num(row[3]),  to_num(row[4]),  to_num(row[5]),
-                to_num(row[6]),  to_num(row[7]),  to_num(row[8]),  to_num(row[9]),
-                to_num(row[10]), to_num(row[11]),
-                to_num(row[12]), to_num(row[13]), to_num(row[14]),
-            ),
+        yield (
+            leader_raw, leader_canonical, to_str(row[1]),
+            1 if is_total else 0, 1 if is_grand else 0,
+            to_num(row[2]),  to_num(row[3]),  to_num(row[4]),  to_num(row[5]),
+            to_num(row[6]),  to_num(row[7]),  to_num(row[8]),  to_num(row[9]),
+            to_num(row[10]), to_num(row[11]),
+            to_num(row[12]), to_num(row[13]), to_num(row[14]),
         )
-        inserted += 1
-    print(f"  ✓ leader_perf_pivot: {inserted} rows")
 
 
-def import_account_analysis(conn):
-    """Import the GRR/NRR account-level analysis Excel."""
-    if not os.path.exists(GRR_NRR_XLSX):
-        print(f"  ⚠ {GRR_NRR_XLSX} not found, skipping account_analysis import")
-        return
-    wb = openpyxl.load_workbook(GRR_NRR_XLSX, data_only=True)
-    sheet = "Export" if "Export" in wb.sheetnames else wb.sheetnames[0]
-    ws = wb[sheet]
-    cur = conn.cursor()
-    inserted = 0
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if not any(c is not None and str(c).strip() != "" for c in row):
-            continue
-        cur.execute(
-            """INSERT INTO account_analysis (
+def import_leader_perf(rows, conn):
+    """Import the per-leader pivot (Rev_Perf_Leader.xlsx) — drives the Leaderboard view."""
+    t0 = time.perf_counter()
+    inserted = bulk_insert(conn.cursor(), SQL_LEADER_PERF, leader_perf_rows(rows))
+    print(f"  ✓ leader_perf_pivot: {inserted} rows{rate(inserted, t0)}")
+
+
+SQL_ACCOUNTS = """INSERT INTO account_analysis (
                 account, product, am, rev_24_25, churn, grr,
                 downsell, upsell, nrr, new_revenue, rev_25_26
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
-            (
-                to_str(row[0]),  to_str(row[1]),  to_str(row[2]),
-                to_num(row[3]),  to_num(row[4]),  to_num(row[5]),
-                to_num(row[6]),  to_num(row[7]),  to_num(row[8]),
-                to_num(row[9]),  to_num(row[10]),
-            ),
+            ) VALUES (?,?,?,?,?,?,?,?,?,?,?)"""
+
+
+def account_rows(rows):
+    """account_analysis tuples for the GRR/NRR export sheet."""
+    for row in islice(rows, 1, None):
+        if is_blank_row(row):
+            continue
+        row = padded(row, 11)
+        yield (
+            to_str(row[0]),  to_str(row[1]),  to_str(row[2]),
+            to_num(row[3]),  to_num(row[4]),  to_num(row[5]),
+            to_num(row[6]),  to_num(row[7]),  to_num(row[8]),
+            to_num(row[9]),  to_num(row[10]),
         )
-        inserted += 1
-    print(f"  ✓ account_analysis: {inserted} accounts")
 
 
-def import_manager(ws, manager_tab: str, conn):
-    """Import a manager tab into revenue_team."""
-    cur = conn.cursor()
+def import_account_analysis(rows, conn):
+    """Import the GRR/NRR account-level analysis Excel."""
+    t0 = time.perf_counter()
+    inserted = bulk_insert(conn.cursor(), SQL_ACCOUNTS, account_rows(rows))
+    print(f"  ✓ account_analysis: {inserted} accounts{rate(inserted, t0)}")
+
+
+SQL_TEAM = """INSERT INTO revenue_team (
+                manager_tab, team, status, emp_id, emp_name, tenure_ymd,
+                budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
+                salary_25_26, salary_multiple_25_26, total_expenses_25_26, sales_multiple_25_26,
+                grr, nrr, q4_pipe_target, q4_pipe_creation, q4_pipe_achievement_pct,
+                q3_remarks, q4_remarks,
+                is_total, sort_order
+            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"""
+
 
+def manager_rows(rows, manager_tab: str):
+    """revenue_team tuples for one manager tab, in sheet order."""
+    rows = iter(rows)
     # Read the (multi-line) header row
-    raw_headers = [c.value for c in ws[1]]
+    raw_headers = list(next(rows, ()))
 
     # Map column positions — header text varies slightly across sheets
     col = {
@@ -398,16 +505,13 @@ def import_manager(ws, manager_tab: str, conn):
             return None
         return row[i]
 
-    inserted = 0
     sort_order = 0
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if not any(c is not None and str(c).strip() != "" for c in row):
+    for row in rows:
+        if is_blank_row(row):
             continue
         sort_order += 1
 
-        team_val = cell(row, "team")
-        team_str = to_str(team_val)
-        emp_id_val = cell(row, "empid")
+        team_str = to_str(cell(row, "team"))
         is_total = 0
         if team_str:
             tl = team_str.lower()
@@ -416,61 +520,247 @@ def import_manager(ws, manager_tab: str, conn):
             elif tl.endswith("total"):
                 is_total = 1
 
-        cur.execute(
-            """INSERT INTO revenue_team (
-                manager_tab, team, status, emp_id, emp_name, tenure_ymd,
-                budget_fy_25_26, budget_ytd_25_26, new_sales_25_26, ach_pct_25_26,
-                salary_25_26, salary_multiple_25_26, total_expenses_25_26, sales_multiple_25_26,
-                grr, nrr, q4_pipe_target, q4_pipe_creation, q4_pipe_achievement_pct,
-                q3_remarks, q4_remarks,
-                is_total, sort_order
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-            (
-                manager_tab,
-                team_str,
-                to_str(cell(row, "status")),
-                to_str(emp_id_val),
-                to_str(cell(row, "name")),
-                to_str(cell(row, "tenure")),
-                to_num(cell(row, "budget_fy")),
-                to_num(cell(row, "budget_ytd")),
-                to_num(cell(row, "new_sales")),
-                to_num(cell(row, "ach_25")),
-                to_num(cell(row, "salary_25")),
-                to_num(cell(row, "sal_mult_25")),
-                to_num(cell(row, "expenses")),
-                to_num(cell(row, "sales_mult_25")),
-                to_num(cell(row, "grr")),
-                to_num(cell(row, "nrr")),
-                to_num(cell(row, "q4_target")),
-                to_num(cell(row, "q4_creation")),
-                to_num(cell(row, "q4_pipe_ach")),
-                to_str(cell(row, "q3_remarks")),
-                to_str(cell(row, "q4_remarks")),
-                is_total,
-                sort_order,
-            ),
+        yield (
+            manager_tab,
+            team_str,
+            to_str(cell(row, "status")),
+            to_str(cell(row, "empid")),
+            to_str(cell(row, "name")),
+            to_str(cell(row, "tenure")),
+            to_num(cell(row, "budget_fy")),
+            to_num(cell(row, "budget_ytd")),
+            to_num(cell(row, "new_sales")),
+            to_num(cell(row, "ach_25")),
+            to_num(cell(row, "salary_25")),
+            to_num(cell(row, "sal_mult_25")),
+            to_num(cell(row, "expenses")),
+            to_num(cell(row, "sales_mult_25")),
+            to_num(cell(row, "grr")),
+            to_num(cell(row, "nrr")),
+            to_num(cell(row, "q4_target")),
+            to_num(cell(row, "q4_creation")),
+            to_num(cell(row, "q4_pipe_ach")),
+            to_str(cell(row, "q3_remarks")),
+            to_str(cell(row, "q4_remarks")),
+            is_total,
+            sort_order,
         )
-        inserted += 1
-    print(f"  ✓ revenue_team [{manager_tab}]: {inserted} rows")
 
 
-# ─────────────────────────── main ───────────────────────────
-def main():
-    print(f"Reading {XLSX_PATH} …")
-    wb = openpyxl.load_workbook(XLSX_PATH, data_only=True)
+def import_manager(rows, manager_tab: str, conn):
+    """Import a manager tab into revenue_team."""
+    t0 = time.perf_counter()
+    inserted = bulk_insert(conn.cursor(), SQL_TEAM, manager_rows(rows, manager_tab))
+    print(f"  ✓ revenue_team [{manager_tab}]: {inserted} rows{rate(inserted, t0)}")
 
-    print(f"Connecting to {DB_PATH} …")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
 
+# ─────────────────────────── change detection ───────────────────────────
+# Every source sheet is an import "unit" that maps onto one table (or one
+# manager_tab slice of revenue_team). Its fingerprint — a hash of the cell
+# values — is stored in revenue_meta as `fingerprint:<unit>` so an
+# incremental run can reload only the units whose content moved.
+TEAM_UNIT = "revenue_team:"
+MISSING = "missing"  # fingerprint of a sheet/workbook that isn't there
+
+
+def sheet_values(ws) -> list[tuple]:
+    """All rows of a worksheet as value tuples, header row included."""
+    return list(ws.iter_rows(values_only=True))
+
+
+def fingerprint(rows) -> str:
+    """Content hash of a sheet's cell values.
+
+    Trailing empty cells are ignored so a re-save that only changes the
+    sheet's used range doesn't count as a change.
+    """
+    h = hashlib.sha1()
+    for row in rows:
+        row = list(row)
+        while row and row[-1] is None:
+            row.pop()
+        h.update(repr(row).encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def source_units() -> list[str]:
+    """Every import unit, in load order."""
+    return (["revenue_hcr"] + [TEAM_UNIT + tab for tab in MANAGER_TABS]
+            + ["account_analysis", "leader_perf_pivot"])
+
+
+def load_sources(units=None, paths=None) -> dict:
+    """Read source sheets → {unit: rows}, with None for a missing sheet/workbook.
+
+    `units` defaults to all of them; `paths` overrides the
+    (XLSX_PATH, GRR_NRR_XLSX, LEADER_PERF_XLSX) triple. Each workbook is
+    opened at most once.
+    """
+    units = source_units() if units is None else units
+    xlsx_path, grr_nrr_xlsx, leader_perf_xlsx = paths or (XLSX_PATH, GRR_NRR_XLSX, LEADER_PERF_XLSX)
+    sources = {}
+
+    main_units = [u for u in units if u == "revenue_hcr" or u.startswith(TEAM_UNIT)]
+    if main_units:
+        print(f"Reading {xlsx_path} …")
+        # read_only: rows are parsed lazily as they're iterated instead of
+        # materializing every cell object up front
+        wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+        try:
+            for unit in main_units:
+                sheet = "Revenue HCR" if unit == "revenue_hcr" else unit[len(TEAM_UNIT):]
+                if sheet in wb.sheetnames:
+                    sources[unit] = sheet_values(wb[sheet])
+                elif unit == "revenue_hcr":
+                    raise RuntimeError("Sheet 'Revenue HCR' not found")
+                else:
+                    print(f"  ⚠ Sheet '{sheet}' not found, skipping.")
+                    sources[unit] = None
+        finally:
+            wb.close()
+
+    if "account_analysis" in units:
+        sources["account_analysis"] = None
+        if os.path.exists(grr_nrr_xlsx):
+            wb = openpyxl.load_workbook(grr_nrr_xlsx, data_only=True, read_only=True)
+            sheet = "Export" if "Export" in wb.sheetnames else wb.sheetnames[0]
+            sources["account_analysis"] = sheet_values(wb[sheet])
+            wb.close()
+        else:
+            print(f"  ⚠ {grr_nrr_xlsx} not found, skipping account_analysis import")
+
+    if "leader_perf_pivot" in units:
+        sources["leader_perf_pivot"] = None
+        if os.path.exists(leader_perf_xlsx):
+            wb = openpyxl.load_workbook(leader_perf_xlsx, data_only=True, read_only=True)
+            sources["leader_perf_pivot"] = sheet_values(wb.active)
+            wb.close()
+        else:
+            print(f"  ⚠ {leader_perf_xlsx} not found, skipping leader_perf_pivot import")
+    return sources
+
+
+def unit_table(unit: str) -> str:
+    return unit.split(":", 1)[0]
+
+
+def import_unit(unit: str, rows, conn):
+    """Load one unit's rows into its table (no-op for a missing source)."""
+    if rows is None:
+        return
+    if unit == "revenue_hcr":
+        import_hcr(rows, conn)
+    elif unit.startswith(TEAM_UNIT):
+        import_manager(rows, unit[len(TEAM_UNIT):], conn)
+    elif unit == "account_analysis":
+        import_account_analysis(rows, conn)
+    elif unit == "leader_perf_pivot":
+        import_leader_perf(rows, conn)
+
+
+def stored_fingerprints(conn) -> dict:
+    """{unit: fingerprint} recorded by the last import ({} if there is none)."""
+    try:
+        rows = conn.execute(
+            "SELECT key, value FROM revenue_meta WHERE key LIKE 'fingerprint:%'"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {k[len("fingerprint:"):]: v for k, v in rows}
+
+
+def has_tables(conn, names) -> bool:
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return set(names) <= existing
+
+
+# ─────────────────────────── parallel staging ───────────────────────────
+# With --jobs N the units are split across N worker processes. Each worker
+# parses its sheets and bulk-loads them into a private staging DB; the parent
+# then ATTACHes every staging file and copies the rows over in load order, in
+# the same single transaction as a serial import.
+MAX_STAGES = 10  # SQLite's default SQLITE_MAX_ATTACHED
+
+STAGE_DDL = {
+    "revenue_hcr":       DDL_HCR,
+    "revenue_team":      DDL_TEAM,
+    "account_analysis":  DDL_ACCOUNTS,
+    "leader_perf_pivot": DDL_LEADER_PERF,
+}
+
+# revenue_hcr.row_order is the sheet row; elsewhere it's an AUTOINCREMENT id
+# that the final DB assigns as rows are merged (matching a serial load).
+KEEP_ROW_ORDER = {"revenue_hcr"}
+
+
+def stage_units(units: list[str], paths: tuple, stage_path: str) -> dict:
+    """Worker: parse `units` and load them into a fresh staging DB → {unit: fingerprint}."""
+    sources = load_sources(units, paths)
+    conn = sqlite3.connect(stage_path)
+    for pragma in IMPORT_PRAGMAS:
+        conn.execute(pragma)
+    for table in dict.fromkeys(unit_table(u) for u in units):
+        conn.execute(STAGE_DDL[table])
+    for unit in units:
+        import_unit(unit, sources[unit], conn)
+    conn.commit()
+    conn.close()
+    return {unit: MISSING if rows is None else fingerprint(rows) for unit, rows in sources.items()}
+
+
+def stage_parallel(jobs: int, stage_dir: str) -> tuple[dict, dict]:
+    """Parse every unit in a process pool → ({unit: fingerprint}, {unit: staging DB path})."""
+    units = source_units()
+    n = max(1, min(jobs, len(units), MAX_STAGES))
+    groups = [units[i::n] for i in range(n)]
+    paths = (XLSX_PATH, GRR_NRR_XLSX, LEADER_PERF_XLSX)
+    stage_paths = [os.path.join(stage_dir, f"stage{i}.db") for i in range(n)]
+    print(f"Parsing {len(units)} sheets with {n} worker process(es) …")
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        results = list(pool.map(stage_units, groups, [paths] * n, stage_paths))
+    found = {}
+    for result in results:
+        found.update(result)
+    fingerprints = {unit: found[unit] for unit in units}
+    stages = {unit: stage_paths[i] for i, group in enumerate(groups) for unit in group}
+    return fingerprints, stages
+
+
+def merge_unit(unit: str, schema: str, conn):
+    """Copy one unit's rows from the attached staging DB `schema`."""
+    t0 = time.perf_counter()
+    table = unit_table(unit)
+    cols = [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+    if table not in KEEP_ROW_ORDER:
+        cols.remove("row_order")
+    where, params = "", ()
+    if unit.startswith(TEAM_UNIT):
+        where, params = "WHERE manager_tab = ?", (unit[len(TEAM_UNIT):],)
+    col_list = ", ".join(cols)
+    cur = conn.execute(
+        f"INSERT INTO main.{table} ({col_list}) "
+        f"SELECT {col_list} FROM {schema}.{table} {where} ORDER BY row_order",
+        params,
+    )
+    print(f"  ✓ {unit}: merged {cur.rowcount} rows{rate(cur.rowcount, t0)}")
+
+
+# ─────────────────────────── rebuild ───────────────────────────
+BASE_TABLES = ["revenue_hcr", "revenue_team", "revenue_meta",
+               "account_analysis", "leader_perf_pivot"]
+
+
+def rebuild(load, conn):
+    """Drop everything and load every unit from scratch via `load(unit, conn)`."""
+    cur = conn.cursor()
     # Drop old WFM tables + drop any prior revenue tables so we start clean
+    # (schema-qualified so attached staging DBs are never touched)
     print("Dropping old tables …")
-    for t in OLD_TABLES + ["revenue_hcr", "revenue_team", "revenue_meta",
-                           "account_analysis", "leader_perf_pivot"]:
-        cur.execute(f"DROP TABLE IF EXISTS {t}")
+    for t in OLD_TABLES + BASE_TABLES:
+        cur.execute(f"DROP TABLE IF EXISTS main.{t}")
 
-    # Create fresh schema
+    # Create fresh schema (indexes come after the load)
     print("Creating new schema …")
     cur.execute(DDL_HCR)
     cur.execute(DDL_TEAM)
@@ -478,52 +768,285 @@ def main():
     cur.execute(DDL_ACCOUNTS)
     cur.execute(DDL_LEADER_PERF)
 
-    # Index helpers
-    cur.execute("CREATE INDEX idx_team_manager ON revenue_team(manager_tab)")
-    cur.execute("CREATE INDEX idx_team_status ON revenue_team(status)")
-    cur.execute("CREATE INDEX idx_hcr_status ON revenue_hcr(status)")
-    cur.execute("CREATE INDEX idx_hcr_manager ON revenue_hcr(manager_name)")
-
-    # Import HCR
     print("\nImporting Revenue HCR …")
-    if "Revenue HCR" not in wb.sheetnames:
-        raise RuntimeError("Sheet 'Revenue HCR' not found")
-    import_hcr(wb["Revenue HCR"], conn)
+    load("revenue_hcr", conn)
 
-    # Import each manager tab
     print("\nImporting manager tabs …")
     for tab in MANAGER_TABS:
-        if tab not in wb.sheetnames:
-            print(f"  ⚠ Sheet '{tab}' not found, skipping.")
-            continue
-        import_manager(wb[tab], tab, conn)
+        load(TEAM_UNIT + tab, conn)
 
     # Import GRR/NRR account-level analysis
     print("\nImporting account-level GRR/NRR analysis …")
-    import_account_analysis(conn)
-
-    cur.execute("CREATE INDEX idx_acc_am ON account_analysis(am)")
-    cur.execute("CREATE INDEX idx_acc_product ON account_analysis(product)")
+    load("account_analysis", conn)
 
     # Import leader-pivot (drives Leaderboard view)
     print("\nImporting leader performance pivot …")
-    import_leader_perf(conn)
-    cur.execute("CREATE INDEX idx_lp_leader ON leader_perf_pivot(leader)")
-    cur.execute("CREATE INDEX idx_lp_total ON leader_perf_pivot(is_leader_total)")
+    load("leader_perf_pivot", conn)
 
-    cur.execute(
-        "INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
-        ("last_loaded_at", dt.datetime.now().isoformat(timespec="seconds")),
-    )
-    cur.execute(
-        "INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
-        ("source_file", os.path.basename(XLSX_PATH)),
-    )
+    # Index helpers — built in one pass now that the data is loaded
+    print("\nCreating indexes …")
+    t0 = time.perf_counter()
+    for ddl in INDEXES:
+        cur.execute(ddl)
+    print(f"  ✓ {len(INDEXES)} indexes in {time.perf_counter() - t0:.2f}s")
 
-    conn.commit()
+    # Full-text index behind /api/hcr?q= and /api/hcr/typeahead
+    print("\nBuilding HCR search index …")
+    build_hcr_fts(conn)
+
+    # Rollups are derived from the tables above — rebuild them before commit
+    print("\nBuilding rollups …")
+    build_rollups(conn)
+
+
+def reload_changed(load, changed: list[str], fingerprints: dict, conn):
+    """Replace only the changed units' rows, then the rollups derived from them.
+
+    A changed manager tab deletes and reloads just that tab's revenue_team
+    rows; its new rows take fresh row_order ids after the others. Tabs are
+    listed by sort_order, so the ids only show in how the org-wide top-N
+    lists order exact ties between two tabs.
+
+    Every other table is one unit: it is emptied, its AUTOINCREMENT sequence
+    reset and reloaded, so its row_order comes out as a full rebuild numbers it.
+    """
+    tables = {unit_table(u) for u in changed}
+    print(f"Reloading {len(changed)} changed sheet(s) …")
+    for unit in changed:
+        table = unit_table(unit)
+        if unit.startswith(TEAM_UNIT):
+            conn.execute(f"DELETE FROM main.{table} WHERE manager_tab = ?", (unit[len(TEAM_UNIT):],))
+        else:
+            conn.execute(f"DELETE FROM main.{table}")
+            # Reset in place rather than delete, so sqlite_sequence keeps its row order too
+            conn.execute("UPDATE main.sqlite_sequence SET seq = 0 WHERE name = ?", (table,))
+    for unit in [u for u in source_units() if u in changed]:
+        if fingerprints[unit] == MISSING:
+            print(f"  ✓ {unit}: source removed, rows cleared")
+        load(unit, conn)
+    conn.execute("DELETE FROM main.sqlite_sequence WHERE seq = 0")  # tables left empty
+
+    # DBs from older importers may predate some of INDEXES
+    for name in OBSOLETE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS main.{name}")
+    for ddl in INDEXES:
+        conn.execute(ddl)
+
+    if "revenue_hcr" in changed:
+        print("\nRebuilding HCR search index …")
+        build_hcr_fts(conn)
+
+    print("\nRefreshing rollups …")
+    build_rollups(conn, tables=tables)
+
+
+def prerender_exports(conn, generated_at: dt.datetime):
+    """Store every manager's .xlsx export in the DB being published (see
+    xlsx_export.store_exports). Best-effort: without them app.py renders
+    each export on its first download instead."""
+    print("\nPre-rendering exports …")
+    t0 = time.perf_counter()
+    try:
+        size = store_exports(conn, MANAGER_TABS, generated_at)
+    except Exception as e:
+        conn.execute(f"DROP TABLE IF EXISTS main.{EXPORTS_TABLE}")
+        print(f"  ⚠ export pre-rendering failed ({e}) — downloads will render on demand")
+        return
+    print(f"  ✓ {len(MANAGER_TABS)} exports, {size / 1024:,.0f} KB in {time.perf_counter() - t0:.2f}s")
+
+
+def analyze(conn):
+    """Refresh the planner statistics (sqlite_stat1) for the freshly loaded tables."""
+    t0 = time.perf_counter()
+    conn.execute("ANALYZE main")
+    print(f"\n  ✓ ANALYZE in {time.perf_counter() - t0:.2f}s")
+
+
+# ─────────────────────────── publish ───────────────────────────
+# Imports never write the live wfm_data.db. They build a copy next to it,
+# verify the copy, and os.replace() it over the original. A running app.py
+# keeps reading the old inode until its handles are recycled, so it never
+# sees missing tables, half-loaded data or writer locks.
+def changed_units(fingerprints: dict) -> list[str] | None:
+    """Units whose fingerprint differs from the live DB's, or None when the
+    live DB has no fingerprints to compare against."""
+    try:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return None
+    try:
+        stored = stored_fingerprints(conn) if has_tables(conn, BASE_TABLES) else {}
+    finally:
+        conn.close()
+    if not stored:
+        return None
+    return [u for u, fp in fingerprints.items() if stored.get(u) != fp]
+
+
+def copy_live_db(dest: str):
+    """Seed `dest` with the live DB (so tables the importer doesn't own survive)."""
+    if not os.path.exists(DB_PATH):
+        return
+    src = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def verify_snapshot(conn) -> list[str]:
+    """Pre-publish checks on a freshly built DB → list of problems (empty = OK)."""
+    problems = [f"integrity_check: {r[0]}"
+                for r in conn.execute("PRAGMA integrity_check").fetchall() if r[0] != "ok"]
+    problems += [f"{t}: table missing" for t in BASE_TABLES if not has_tables(conn, [t])]
+    return problems + check_rollups(conn) + check_hcr_fts(conn)
+
+
+def swap_into_place(path: str):
+    """Durably replace DB_PATH with the finished build at `path`."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    if os.path.exists(DB_PATH):
+        shutil.copymode(DB_PATH, path)
+    else:
+        os.chmod(path, 0o644)
+    os.replace(path, DB_PATH)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(DB_PATH)), os.O_RDONLY)
+    except OSError:
+        return  # directories can't be opened on every platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def publish(load, fingerprints: dict, schemas: dict, incremental: bool) -> bool:
+    """Write the loaded units (all of them, or only the changed ones) into a
+    copy of DB_PATH, verify it and swap it in. False if nothing needed writing."""
+    if incremental:
+        changed = changed_units(fingerprints)
+        if changed is None:
+            print("  ⚠ No stored fingerprints — falling back to a full rebuild.")
+            incremental = False
+        elif not changed:
+            print(f"\n✅ No source changes — {DB_PATH} left untouched.")
+            return False
+
+    fd, build_path = tempfile.mkstemp(
+        prefix=".wfm_data.", suffix=".tmp", dir=os.path.dirname(os.path.abspath(DB_PATH)))
+    os.close(fd)
+    try:
+        print(f"Building {build_path} …")
+        copy_live_db(build_path)
+        conn = sqlite3.connect(build_path)
+        try:
+            cur = conn.cursor()
+            for pragma in IMPORT_PRAGMAS:
+                cur.execute(pragma)
+            # Staging DBs can't be attached mid-transaction, so attach them all up front
+            for path, schema in schemas.items():
+                cur.execute("ATTACH DATABASE ? AS " + schema, (path,))
+            cur.execute("BEGIN")
+
+            if incremental:
+                reload_changed(load, changed, fingerprints, conn)
+            else:
+                rebuild(load, conn)
+
+            # Rewritten whole (same rowids as in a fresh table), so an
+            # incremental build's revenue_meta matches a full one
+            cur.execute("DELETE FROM revenue_meta WHERE key LIKE 'fingerprint:%' "
+                        "OR key IN ('last_loaded_at', 'source_file')")
+            cur.executemany(
+                "INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
+                [(f"fingerprint:{unit}", fp) for unit, fp in fingerprints.items()],
+            )
+            loaded_at = dt.datetime.now().replace(microsecond=0)
+            cur.execute(
+                "INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
+                ("last_loaded_at", loaded_at.isoformat()),
+            )
+            cur.execute(
+                "INSERT OR REPLACE INTO revenue_meta(key, value) VALUES (?, ?)",
+                ("source_file", os.path.basename(XLSX_PATH)),
+            )
+            # Stamped with last_loaded_at, the time app.py renders them with too
+            prerender_exports(conn, loaded_at)
+            analyze(conn)  # last, so revenue_meta's statistics count its rows too
+            conn.commit()
+
+            print("\nVerifying build …")
+            problems = verify_snapshot(conn)
+        finally:
+            conn.close()
+        if problems:
+            for p in problems:
+                print(f"  ✗ {p}")
+            raise RuntimeError(f"{len(problems)} pre-publish check(s) failed — {DB_PATH} left unchanged")
+        print("  ✓ integrity_check, rollup and search-index checks passed")
+
+        swap_into_place(build_path)
+        print(f"  ✓ Published {DB_PATH}")
+        return True
+    finally:
+        if os.path.exists(build_path):
+            os.remove(build_path)
+
+
+# ─────────────────────────── main ───────────────────────────
+def main(incremental: bool = False, jobs: int = 1):
+    t_start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="rg_import_") as stage_dir:
+        if jobs > 1:
+            fingerprints, stages = stage_parallel(jobs, stage_dir)
+            schemas = {path: f"stage{i}" for i, path in enumerate(dict.fromkeys(stages.values()))}
+
+            def load(unit, conn):
+                if fingerprints[unit] != MISSING:
+                    merge_unit(unit, schemas[stages[unit]], conn)
+        else:
+            sources = load_sources()
+            fingerprints = {unit: MISSING if rows is None else fingerprint(rows)
+                            for unit, rows in sources.items()}
+            schemas = {}
+
+            def load(unit, conn):
+                import_unit(unit, sources[unit], conn)
+
+        published = publish(load, fingerprints, schemas, incremental)
+    if published:
+        print(f"\n✅ Import complete in {time.perf_counter() - t_start:.2f}s.")
+
+
+def check():
+    """Verify the materialized rollups still match a live recomputation."""
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    problems = check_rollups(conn)
     conn.close()
-    print("\n✅ Import complete.")
+    if problems:
+        for p in problems:
+            print(f"  ✗ {p}")
+        print(f"\n❌ {len(problems)} rollup mismatch(es) in {DB_PATH}")
+        return 1
+    print(f"✅ All rollups in {DB_PATH} match a live recomputation.")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Rebuild wfm_data.db from the source workbooks.")
+    parser.add_argument("--check", action="store_true",
+                        help="verify the materialized rollups instead of importing")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-import only the sheets whose content changed since the last import")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="parse sheets in N worker processes (default: 1, serial)")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(check())
+    main(incremental=args.incremental, jobs=args.jobs)
@@ -0,0 +1,142 @@
+"""
+Revenue Report — keyset pagination helpers for the list endpoints.
+
+A page is requested with `?limit=N` (plus `after=<token>` for the next one)
+and an optional whitelisted `sort=<column>` / `sort=-<column>`. Pages are
+cut with a keyset predicate on the ORDER BY keys instead of OFFSET, so page
+50 costs the same as page 1 and rows can't shift between pages.
+
+The `after` token is opaque to clients: base64url JSON holding the sort it
+belongs to and the last row's key values.
+
+`fields=a,b,c` (or `fields=all`) projects the columns a list returns;
+without it each endpoint sends its own "lite" set, which leaves out the
+long free-text columns.
+
+`format=columns` sends the rows as arrays under one list of column names,
+`{"columns": [...], "rows": [[...], ...]}`, instead of an object per row
+that repeats every name.
+"""
+import base64
+import binascii
+import json
+import math
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+FORMATS = ("rows", "columns")
+
+
+class PageError(ValueError):
+    """Bad limit / sort / after / fields parameter — reported to the client as a 400."""
+
+
+def parse_limit(raw: str | None, after: str | None) -> int | None:
+    """Page size, or None for the legacy "everything in one array" response."""
+    if raw in (None, ""):
+        return DEFAULT_LIMIT if after else None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PageError(f"limit must be an integer, got {raw!r}")
+    if limit < 1:
+        raise PageError("limit must be ≥ 1")
+    return min(limit, MAX_LIMIT)
+
+
+def parse_sort(raw: str | None, allowed, default: str) -> tuple[str, bool]:
+    """(column, descending) from `sort=col` / `sort=-col`, checked against `allowed`."""
+    raw = (raw or "").strip() or default
+    desc = raw.startswith("-")
+    column = raw.lstrip("-")
+    if column not in allowed:
+        raise PageError(f"Unsupported sort '{column}' — use one of: {', '.join(sorted(allowed))}")
+    return column, desc
+
+
+def parse_fields(raw: str | None, columns, lite, computed=()) -> list[str]:
+    """Output field names from `fields=` — `lite` when absent, everything for "all".
+
+    `columns` are the table's columns, `computed` extra derived fields the
+    endpoint knows how to select.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return list(lite)
+    if raw == "all":
+        return list(columns) + list(computed)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in columns and f not in computed]
+    if unknown:
+        raise PageError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def parse_format(raw: str | None) -> bool:
+    """True for `format=columns`, False for the default objects-per-row."""
+    raw = (raw or "").strip() or "rows"
+    if raw not in FORMATS:
+        raise PageError(f"Unsupported format '{raw}' — use one of: {', '.join(FORMATS)}")
+    return raw == "columns"
+
+
+def encode_cursor(sort: str, values: list) -> str:
+    raw = json.dumps({"s": sort, "k": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str, n_keys: int) -> list:
+    """Key values from an `after` token issued for the same `sort`."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values = data["k"]
+        token_sort = data["s"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise PageError("Malformed 'after' cursor")
+    if token_sort != sort or not isinstance(values, list) or len(values) != n_keys:
+        raise PageError("'after' cursor belongs to a different sort order — restart from the first page")
+    if not all(_is_key_value(v) for v in values):
+        raise PageError("Malformed 'after' cursor")
+    return values
+
+
+def _is_key_value(v) -> bool:
+    """A value a row's sort key can hold: what encode_cursor() was given."""
+    if isinstance(v, float):
+        return math.isfinite(v)
+    return v is None or (isinstance(v, (str, int)) and not isinstance(v, bool))
+
+
+def keyset_clause(keys: list[tuple[str, bool]], values: list) -> tuple[str, list]:
+    """WHERE fragment selecting rows strictly after `values` in ORDER BY `keys`.
+
+    `keys` is [(sql_expr, descending)], ending with a unique non-NULL
+    tie-breaker. NULLs sort first ascending and last descending (SQLite's
+    order), so every key's "after" test spells out the NULL case.
+    """
+    ors, params = [], []
+    for i, (expr, desc) in enumerate(keys):
+        terms, term_params = [], []
+        for prev_expr, _ in keys[:i]:
+            terms.append(f"{prev_expr} IS ?")
+        term_params.extend(values[:i])
+        v = values[i]
+        if not desc:
+            if v is None:
+                terms.append(f"{expr} IS NOT NULL")
+            else:
+                terms.append(f"{expr} > ?")
+                term_params.append(v)
+        else:
+            if v is None:
+                continue  # nothing sorts after NULL when descending
+            terms.append(f"({expr} < ? OR {expr} IS NULL)")
+            term_params.append(v)
+        ors.append("(" + " AND ".join(terms) + ")")
+        params.extend(term_params)
+    return ("(" + " OR ".join(ors) + ")") if ors else "0", params
+
+
+def order_by(keys: list[tuple[str, bool]]) -> str:
+    return ", ".join(f"{expr} DESC" if desc else expr for expr, desc in keys)
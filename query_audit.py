@@ -0,0 +1,200 @@
+"""
+Revenue Report — query-plan audit.
+
+Replays representative requests against every dashboard endpoint, with every
+whitelisted sort, each filter, a second keyset page and a search. While they
+run, the connection trace callback records each SQL statement `app.py`
+executes, already expanded with its bound parameters. Every distinct
+statement then goes through EXPLAIN QUERY PLAN.
+
+A plan fails the audit when it
+  • scans a base table without an index (`SCAN revenue_team`), or
+  • sorts, groups or de-duplicates in a temp B-tree,
+unless EXPECTED lists the statement with the reason that's unavoidable.
+
+    python query_audit.py [--db wfm_data.db] [-v]
+
+Exits non-zero on any unexpected plan. Run it against a freshly imported DB,
+since the importer builds the indexes and the planner statistics (ANALYZE).
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from urllib.parse import quote
+
+# (statement regex, finding regex, why that plan is fine)
+EXPECTED = [
+    (r"FROM revenue_meta\b", r"SCAN revenue_meta",
+     "revenue_meta is read whole (a handful of key/value rows)"),
+    (r"FROM agg_\w+ ORDER BY pos", r"SCAN agg_\w+",
+     "rollup tables are read whole, in rowid (pos) order"),
+    (r"ESCAPE '\\'", r"SCAN revenue_hcr",
+     "LIKE fallback for search terms shorter than a trigram"),
+    (r"ORDER BY m\.score", r"TEMP B-TREE",
+     "relevance order is the bm25 score computed per query"),
+    (r"^\s*WITH t AS", r"TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY",
+     "per-team sort runs over one manager tab, after the group window"),
+    (r"AS _miss, COUNT\(\*\) FROM revenue_hcr JOIN", r"TEMP B-TREE FOR GROUP BY",
+     "facet counts for a search group the matching rows, not the whole index"),
+    (r"FROM account_analysis .*ORDER BY row_order$", r"SCAN account_analysis",
+     "grr_engine loads the whole account book into columns once per data version"),
+]
+# Housekeeping, plus the "-- …" statements SQLite runs inside FTS5
+IGNORED = re.compile(r"^\s*(--|(SELECT 1|BEGIN|ROLLBACK|COMMIT|PRAGMA)\b)", re.I)
+
+
+# ─────────────────────────── statement capture ───────────────────────────
+def representative_urls(conn) -> list[str]:
+    """URLs covering every endpoint, sort and filter, with values taken from the DB."""
+    from app import FACETS, HCR_SORTS, MANAGER_TABS, TEAM_SORTS
+
+    def first(sql, *params):
+        row = conn.execute(sql, params).fetchone()
+        return row[0] if row else ""
+
+    def top(col):
+        return first(f"SELECT {col} FROM revenue_hcr WHERE {col} IS NOT NULL "
+                     f"GROUP BY {col} ORDER BY COUNT(*) DESC LIMIT 1")
+
+    manager = next((m for m in MANAGER_TABS
+                    if first("SELECT 1 FROM revenue_team WHERE manager_tab = ?", m)), MANAGER_TABS[0])
+    team = first("SELECT team FROM revenue_team WHERE manager_tab = ? AND is_total = 0 "
+                 "AND team IS NOT NULL LIMIT 1", manager)
+    emp_id = first("SELECT emp_id FROM revenue_team WHERE manager_tab = ? AND emp_id IS NOT NULL "
+                   "LIMIT 1", manager)
+    name = first("SELECT full_name FROM revenue_hcr WHERE full_name IS NOT NULL LIMIT 1") or "sales"
+    m = quote(manager)
+
+    urls = ["/api/health", "/api/meta", "/api/team_counts", "/api/leaderboard", "/api/grrnrr",
+            "/api/hcr/summary", "/api/hcr/filters", "/api/hcr/facets", "/api/hcr",
+            f"/api/hcr?q={quote(name.split()[0])}", "/api/hcr?q=an",
+            f"/api/hcr/typeahead?q={quote(name[:4])}",
+            f"/api/hcr/facets?status={quote(top('status'))}&division={quote(top('division'))}"
+            f"&q={quote(name.split()[0])}",
+            f"/api/team/{m}", f"/api/team/{m}/summary", f"/api/team/{m}/remarks/{quote(emp_id)}",
+            f"/api/team/{m}?status=Active", f"/api/team/{m}?team={quote(team)}",
+            f"/api/download/{m}",
+            f"/api/bootstrap?parts=leaderboard,grrnrr,team_counts,meta",
+            f"/api/bootstrap?parts=team,team_summary&manager={m}&format=columns"]
+    for facet, col in FACETS.items():
+        urls.append(f"/api/hcr?{facet}={quote(top(col))}")
+    for sort in sorted(HCR_SORTS):
+        urls += [f"/api/hcr?limit=20&sort={sort}", f"/api/hcr?limit=20&sort=-{sort}"]
+    urls.append(f"/api/hcr?limit=20&q={quote(name.split()[0])}")
+    for sort in sorted(TEAM_SORTS):
+        urls += [f"/api/team/{m}?limit=20&sort={sort}", f"/api/team/{m}?limit=20&sort=-{sort}"]
+    return urls
+
+
+def capture_statements(db_path: str, verbose: bool = False) -> list[str]:
+    """Distinct SQL statements app.py runs for representative_urls()."""
+    import datastore
+    datastore.DB_PATH = db_path                   # before app binds it
+    import app
+
+    statements: dict = {}
+    open_conn = app.DB_POOL._open
+
+    def traced_open():
+        conn = open_conn()
+        conn.set_trace_callback(lambda sql: statements.setdefault(sql.strip(), None))
+        return conn
+
+    app.DB_POOL._open = traced_open
+    client = app.app.test_client()
+    with client.session_transaction() as s:
+        s["authed"] = True
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    urls = representative_urls(conn)
+    conn.close()
+    for url in urls:
+        resp = client.get(url)
+        body = resp.get_json(silent=True)
+        # Follow one `next` token so the keyset predicate is audited too
+        if isinstance(body, dict) and body.get("next"):
+            sep = "&" if "?" in url else "?"
+            resp = client.get(f"{url}{sep}after={body['next']}")
+        if verbose or resp.status_code != 200:
+            print(f"  {resp.status_code} {url}")
+    return [s for s in statements if not IGNORED.match(s)]
+
+
+# ─────────────────────────── plan checks ───────────────────────────
+def plan(conn, sql: str) -> list[str]:
+    return [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def findings(conn, details: list[str]) -> list[str]:
+    """Full base-table scans and temp B-trees in a plan."""
+    tables = {r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'")}
+    out = []
+    for d in details:
+        m = re.match(r"SCAN (\w+)$", d)
+        if m and m.group(1) in tables:
+            out.append(d)
+        elif "TEMP B-TREE" in d:
+            out.append(d)
+    return out
+
+
+def expected(sql: str, finding: str) -> str | None:
+    for sql_re, finding_re, reason in EXPECTED:
+        if re.search(sql_re, sql, re.M) and re.search(finding_re, finding):
+            return reason
+    return None
+
+
+def audit(db_path: str, verbose: bool = False) -> int:
+    """Audit every captured statement; returns the number of unexpected plans."""
+    statements = capture_statements(db_path, verbose)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        print("  ⚠ No sqlite_stat1 — DB was imported without ANALYZE; plans may differ from production")
+
+    failed = 0
+    for sql in statements:
+        details = plan(conn, sql)
+        problems, allowed = [], []
+        for f in findings(conn, details):
+            reason = expected(sql, f)
+            if reason is None:
+                problems.append(f)
+            else:
+                allowed.append(f"{f} — {reason}")
+        one_line = " ".join(sql.split())
+        if problems:
+            failed += 1
+            print(f"\n❌ {one_line[:200]}")
+            for d in details:
+                print(f"     {'→ ' if d in problems else '  '}{d}")
+        elif verbose:
+            print(f"  ✓ {one_line[:120]}")
+            for a in allowed:
+                print(f"      · {a}")
+    conn.close()
+
+    if failed:
+        print(f"\n❌ {failed} of {len(statements)} statements scan or sort unexpectedly")
+    else:
+        print(f"✅ {len(statements)} statements — no unexpected scans or temp B-trees")
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", default=None, help="DB to audit (default: wfm_data.db)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="list every statement and request")
+    args = ap.parse_args()
+    from datastore import DB_PATH
+    db_path = os.path.abspath(args.db or DB_PATH)
+    if not os.path.exists(db_path):
+        sys.exit(f"{db_path} not found")
+    sys.exit(1 if audit(db_path, args.verbose) else 0)
+
+
+if __name__ == "__main__":
+    main()
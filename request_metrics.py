@@ -0,0 +1,230 @@
+"""
+Revenue Report — per-request timing and endpoint latency metrics.
+
+install(app) hooks every route. Each request is timed end to end and counted
+into a per-endpoint latency histogram (status codes, response bytes). A
+sample of requests (RG_METRICS_SAMPLE, 0..1, default 0.05) is also broken
+down into:
+
+  • db        — checking a connection out of the pool (get_db)
+  • sql       — time inside SQLite, execute plus fetches, and the query count
+                (datastore.TimedCursor)
+  • serialize — payload → JSON bytes (responses.py)
+  • compress  — gzip / brotli of a cached body, the first time it's asked for
+  • app       — everything else: view code, dict(r) conversion, routing
+
+and, for authenticated sessions, answered with a Server-Timing header, so the
+browser's devtools show the split next to the network time. Sampled requests
+run their SQL through the Python-level TimedCursor, so keep the rate low in
+production; unsampled requests cost two perf_counter() calls and a histogram
+update. RG_METRICS_SAMPLE=0 turns the breakdown off, 1 samples everything.
+
+snapshot() / prometheus() render the aggregate for /api/metrics.
+"""
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request, session
+
+SAMPLE_RATE = float(os.environ.get("RG_METRICS_SAMPLE", "0.05"))
+# Histogram upper bounds in ms (plus an implicit +Inf)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PHASES = ("db", "sql", "serialize", "compress", "app")
+
+
+class RequestMetrics:
+    """Phase timings for one sampled request (seconds)."""
+
+    __slots__ = ("start", "db", "sql", "queries", "serialize", "compress")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.db = self.sql = self.serialize = self.compress = 0.0
+        self.queries = 0
+
+    def add_sql(self, seconds: float, queries: int = 0):
+        self.sql += seconds
+        self.queries += queries
+
+    def phases(self, total: float) -> dict:
+        spent = {"db": self.db, "sql": self.sql, "serialize": self.serialize, "compress": self.compress}
+        spent["app"] = max(total - sum(spent.values()), 0.0)
+        return spent
+
+
+def current() -> RequestMetrics | None:
+    """The sampled request's metrics, or None (unsampled, or outside a request)."""
+    return g.get("metrics") if has_request_context() else None
+
+
+def record(phase: str, t0: float):
+    """Add the time since perf_counter() `t0` to `phase` of the current sample."""
+    metrics = current()
+    if metrics is not None:
+        setattr(metrics, phase, getattr(metrics, phase) + time.perf_counter() - t0)
+
+
+# ─────────────────────────── aggregation ───────────────────────────
+class EndpointStats:
+    __slots__ = ("buckets", "count", "seconds", "bytes", "statuses", "sampled", "queries", "phases")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)  # non-cumulative; last is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.statuses: dict = {}
+        self.sampled = 0
+        self.queries = 0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+    def quantile_ms(self, q: float) -> float | None:
+        """Latency quantile estimated from the histogram (linear within a bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                if i == len(BUCKETS_MS):
+                    return float(BUCKETS_MS[-1])
+                lower = BUCKETS_MS[i - 1] if i else 0.0
+                return lower + (BUCKETS_MS[i] - lower) * (rank - seen) / n
+            seen += n
+        return float(BUCKETS_MS[-1])
+
+
+class Registry:
+    """Process-wide per-endpoint counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, EndpointStats] = {}
+        self.started = time.time()
+
+    def observe(self, endpoint: str, status: int, seconds: float, size: int, metrics: RequestMetrics | None):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.bytes += size
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if metrics is not None:
+                stats.sampled += 1
+                stats.queries += metrics.queries
+                for phase, spent in metrics.phases(seconds).items():
+                    stats.phases[phase] += spent
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """JSON view: per endpoint latency, statuses, bytes and the sampled breakdown."""
+        with self._lock:
+            endpoints = {}
+            for name, s in sorted(self._endpoints.items()):
+                cumulative, total = [], 0
+                for bound, n in zip(BUCKETS_MS + ("+Inf",), s.buckets):
+                    total += n
+                    cumulative.append([bound, total])  # [le, count]: a list, keys would be re-sorted
+                endpoints[name] = {
+                    "count":       s.count,
+                    "statuses":    {str(k): v for k, v in sorted(s.statuses.items())},
+                    "latency_ms":  {"mean": s.seconds * 1000 / s.count, "p50": s.quantile_ms(0.5),
+                                    "p95": s.quantile_ms(0.95), "p99": s.quantile_ms(0.99)},
+                    "buckets_ms":  cumulative,
+                    "bytes":       s.bytes,
+                    "bytes_mean":  s.bytes / s.count,
+                    "sampled":     s.sampled,
+                    "queries_mean": s.queries / s.sampled if s.sampled else None,
+                    "phases_ms_mean": ({p: v * 1000 / s.sampled for p, v in s.phases.items()}
+                                       if s.sampled else None),
+                }
+            return {"since": self.started, "sample_rate": SAMPLE_RATE, "endpoints": endpoints}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            lines = ["# HELP rg_request_duration_seconds Request latency by endpoint.",
+                     "# TYPE rg_request_duration_seconds histogram"]
+            for name, s in items:
+                label = f'endpoint="{_escape(name)}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS_MS + (None,), s.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound is None else f"{bound / 1000:g}"
+                    lines.append(f'rg_request_duration_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f"rg_request_duration_seconds_sum{{{label}}} {s.seconds:.6f}")
+                lines.append(f"rg_request_duration_seconds_count{{{label}}} {s.count}")
+            lines += ["# HELP rg_responses_total Responses by endpoint and status code.",
+                      "# TYPE rg_responses_total counter"]
+            for name, s in items:
+                for status, n in sorted(s.statuses.items()):
+                    lines.append(f'rg_responses_total{{endpoint="{_escape(name)}",status="{status}"}} {n}')
+            lines += ["# HELP rg_response_bytes_total Response body bytes sent, as encoded.",
+                      "# TYPE rg_response_bytes_total counter"]
+            lines += [f'rg_response_bytes_total{{endpoint="{_escape(name)}"}} {s.bytes}' for name, s in items]
+            lines += ["# HELP rg_sampled_requests_total Requests broken down into phases (RG_METRICS_SAMPLE).",
+                      "# TYPE rg_sampled_requests_total counter"]
+            lines += [f'rg_sampled_requests_total{{endpoint="{_escape(name)}"}} {s.sampled}' for name, s in items]
+            lines += ["# HELP rg_sql_queries_total SQL statements run by sampled requests.",
+                      "# TYPE rg_sql_queries_total counter"]
+            lines += [f'rg_sql_queries_total{{endpoint="{_escape(name)}"}} {s.queries}' for name, s in items]
+            lines += ["# HELP rg_request_phase_seconds_total Time spent per phase by sampled requests.",
+                      "# TYPE rg_request_phase_seconds_total counter"]
+            for name, s in items:
+                for phase, spent in s.phases.items():
+                    lines.append(f'rg_request_phase_seconds_total{{endpoint="{_escape(name)}",phase="{phase}"}}'
+                                 f" {spent:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+
+# ─────────────────────────── Flask hooks ───────────────────────────
+def _server_timing(metrics: RequestMetrics, total: float, size: int) -> str:
+    spent = metrics.phases(total)
+    parts = [f"{phase};dur={spent[phase] * 1000:.2f}" for phase in PHASES]
+    parts[1] += f';desc="{metrics.queries} queries"'
+    parts.append(f'total;dur={total * 1000:.2f};desc="{size} bytes"')
+    return ", ".join(parts)
+
+
+def _start():
+    start = time.perf_counter()
+    g.request_started = start
+    if SAMPLE_RATE > 0 and (SAMPLE_RATE >= 1 or random.random() < SAMPLE_RATE):
+        g.metrics = RequestMetrics(start)
+
+
+def _finish(resp):
+    start = g.get("request_started")
+    if start is None:
+        return resp
+    total = time.perf_counter() - start
+    size = resp.content_length or 0
+    metrics = g.get("metrics")
+    if metrics is not None and session.get("authed"):  # timings aren't for anonymous callers
+        resp.headers["Server-Timing"] = _server_timing(metrics, total, size)
+    REGISTRY.observe(request.endpoint or "<unmatched>", resp.status_code, total, size, metrics)
+    return resp
+
+
+def install(app):
+    """Time every request of `app`. Call before registering other hooks so the
+    timing wraps them (before_request runs first, after_request last)."""
+    app.before_request(_start)
+    app.after_request(_finish)
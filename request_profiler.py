@@ -0,0 +1,211 @@
+"""
+Revenue Report — on-demand cProfile capture of single requests.
+
+An authenticated session can run one request under cProfile by adding
+
+    ?_profile=1            (or the header  X-Profile: 1)
+
+to it. The request is served as usual and the capture stored in the
+ProfileStore directory; the response names it in X-Profile-Id. With
+`_profile=text` or `_profile=collapsed` the response is that report instead
+(the capture is stored either way). Each capture is kept as:
+
+  • <id>.pstats     — cProfile data, for `python -m pstats`, snakeviz, …
+  • <id>.collapsed  — folded stacks for flamegraph.pl / speedscope, expanded
+                      from the caller→callee graph (cProfile records edges,
+                      not whole stacks, so deep paths are apportioned by time)
+  • <id>.txt        — the top functions by cumulative time
+  • <id>.json       — the index entry: request, status, time, hottest functions
+
+Profiled requests skip the result cache, 304 answers and the export cache
+(see capturing()) so they measure the real work. Without the switch the only
+cost is looking for it in the query string and headers.
+"""
+import cProfile
+import glob
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import threading
+import time
+
+from flask import g, has_request_context, request, session
+
+PARAM = "_profile"
+HEADER = "X-Profile"
+FORMATS = {"pstats": "application/octet-stream", "collapsed": "text/plain", "txt": "text/plain"}
+REPORT_LINES = 40
+ID_RE = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}$")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+_ADDRESS = re.compile(r" at 0x[0-9a-f]+")
+
+
+def capturing() -> bool:
+    """True while the current request runs under the profiler."""
+    return has_request_context() and g.get("profiler") is not None
+
+
+# ─────────────────────────── formats ───────────────────────────
+def _label(func: tuple) -> str:
+    """pstats (file, line, name) → 'dir/file.py:name:line' — the repo's own
+    files relative to it, others by their last two path parts; no ';'
+    (flamegraph's separator) and no object addresses."""
+    filename, line, name = func
+    if filename == "~":  # built-ins
+        return _ADDRESS.sub("", name).replace(";", ",")
+    if filename.startswith(ROOT + os.sep):
+        where = os.path.relpath(filename, ROOT)
+    else:
+        where = "/".join(filename.replace(os.sep, "/").split("/")[-2:])
+    return f"{where}:{name}:{line}".replace(";", ",")
+
+
+def collapsed(stats: pstats.Stats, max_depth: int = 64) -> str:
+    """Folded stacks ('a;b;c <µs>' per line) expanded from the profile's call graph.
+
+    Each function's time on a path is its cumulative time scaled by the share
+    the calling edge contributed, split into self time and its callees.
+    """
+    raw = stats.stats
+    callees: dict = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, (_, _, _, _, callers) in raw.items() if not callers]
+    folded: dict[str, float] = {}
+
+    def walk(func, path: list, seconds: float):
+        _, _, tt, ct, _ = raw[func]
+        scale = seconds / ct if ct else 0.0
+        stack = ";".join(path)
+        folded[stack] = folded.get(stack, 0.0) + tt * scale
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, ()):
+            label = _label(callee)
+            if label in path or not edge_ct:  # recursion: already on this stack
+                continue
+            walk(callee, path + [label], edge_ct * scale)
+
+    for root in roots:
+        walk(root, [_label(root)], raw[root][3])
+    return "".join(f"{stack} {round(s * 1e6)}\n" for stack, s in sorted(folded.items()) if s * 1e6 >= 1)
+
+
+def report(stats: pstats.Stats, lines: int = REPORT_LINES) -> str:
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(lines)
+    return out.getvalue()
+
+
+def hottest(stats: pstats.Stats, n: int = 5) -> list:
+    """[label, self ms, cumulative ms] for the n functions with the most self time."""
+    ranked = sorted(stats.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+    return [[_label(func), round(tt * 1000, 3), round(ct * 1000, 3)] for func, (_, _, tt, ct, _) in ranked]
+
+
+# ─────────────────────────── storage ───────────────────────────
+class ProfileStore:
+    """Captured profiles on disk, newest `keep` kept."""
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def save(self, profile: cProfile.Profile, meta: dict) -> tuple[str, dict]:
+        """Write every format for `profile` → (id, {format: text}) for the text ones."""
+        os.makedirs(self.directory, exist_ok=True)
+        capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+        stats = pstats.Stats(profile)
+        base = os.path.join(self.directory, capture_id)
+        stats.dump_stats(f"{base}.pstats")
+        texts = {"collapsed": collapsed(stats), "txt": report(stats)}
+        for fmt, text in texts.items():
+            with open(f"{base}.{fmt}", "w", encoding="utf-8") as f:
+                f.write(text)
+        meta = {"id": capture_id, **meta, "calls": stats.total_calls, "hottest": hottest(stats)}
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self._prune()
+        return capture_id, texts
+
+    def _prune(self):
+        with self._lock:
+            ids = sorted(os.path.basename(p)[:-5] for p in glob.glob(os.path.join(self.directory, "*.json")))
+            for old in ids[:-self.keep] if self.keep > 0 else ids:
+                for fmt in list(FORMATS) + ["json"]:
+                    path = os.path.join(self.directory, f"{old}.{fmt}")
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    def index(self) -> list[dict]:
+        """Index entries, newest first."""
+        entries = []
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json")), reverse=True):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # pruned or half-written meanwhile
+        return entries
+
+    def path(self, capture_id: str, fmt: str) -> str | None:
+        """File for one capture in `fmt`, or None if the id / format is unknown."""
+        if fmt not in FORMATS or not ID_RE.match(capture_id):
+            return None
+        path = os.path.join(self.directory, f"{capture_id}.{fmt}")
+        return path if os.path.exists(path) else None
+
+
+# ─────────────────────────── Flask hooks ───────────────────────────
+def install(app, store: ProfileStore):
+    """Let authenticated requests ask for a profile. Call early, so the
+    profile covers the other hooks too."""
+
+    def start():
+        mode = request.args.get(PARAM) or request.headers.get(HEADER)
+        if not mode or not session.get("authed"):
+            return
+        mode = "txt" if mode == "text" else mode
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler is active on this thread
+            return
+        g.profiler = (profile, mode, time.perf_counter())
+
+    def finish(resp):
+        capture = g.pop("profiler", None)
+        if capture is None:
+            return resp
+        profile, mode, t0 = capture
+        profile.disable()
+        meta = {
+            "at":       time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "method":   request.method,
+            "path":     request.full_path.rstrip("?"),
+            "endpoint": request.endpoint,
+            "status":   resp.status_code,
+            "ms":       round((time.perf_counter() - t0) * 1000, 3),
+            "bytes":    resp.content_length,
+        }
+        capture_id, texts = store.save(profile, meta)
+        if mode in texts:
+            resp = app.response_class(texts[mode], mimetype="text/plain")
+            resp.headers["X-Profile-Status"] = str(meta["status"])
+        resp.headers["X-Profile-Id"] = capture_id
+        return resp
+
+    def abandon(exc):
+        capture = g.pop("profiler", None)
+        if capture is not None:  # the response never reached finish()
+            capture[0].disable()
+
+    app.before_request(start)
+    app.after_request(finish)
+    app.teardown_request(abandon)
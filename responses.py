@@ -0,0 +1,104 @@
+"""
+Revenue Report — JSON response encoding.
+
+  • FastJSONProvider — Flask JSON provider that serializes straight to bytes
+                       with orjson (stdlib json when it isn't installed)
+  • EncodedJSON      — a payload serialized once, plus its gzip / brotli
+                       variants, each compressed on first use and then kept
+  • negotiate()      — the content coding to send for a request's
+                       Accept-Encoding
+
+The bytes match what jsonify() used to send — sorted keys, compact
+separators, dates as HTTP dates through Flask's default() — except that
+non-ASCII text goes out as UTF-8 instead of \\u escapes and NaN as null.
+
+Serialization and compression time is reported to request_metrics.py.
+orjson and brotli are optional: without brotli only gzip is offered.
+"""
+import gzip
+import json
+import time
+
+try:
+    import orjson
+except ImportError:  # optional — stdlib json instead
+    orjson = None
+try:
+    import brotli
+except ImportError:  # optional — gzip only
+    brotli = None
+
+from flask.json.provider import DefaultJSONProvider
+
+from request_metrics import record
+
+# Server preference when the client accepts several at the same quality
+CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Bodies smaller than this go out uncompressed (headers would eat the gain)
+MIN_COMPRESS_BYTES = 1024
+# Compressed once per cached body, but every new filter/search combination
+# is a new body: brotli 11 is ~15% smaller than 6 on /api/hcr at ~100x the
+# time (450 ms vs 5 ms), gzip 9 ~5% smaller than 6 at twice the time.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(obj) -> bytes:
+    """`obj` as compact, key-sorted UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=_ORJSON_OPTS)
+    return json.dumps(obj, default=DefaultJSONProvider.default, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":")).encode()
+
+
+def compress(data: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)  # mtime=0: same bytes every time
+
+
+def negotiate(accept_encodings) -> str | None:
+    """Best of CODINGS for a werkzeug Accept-Encoding header, None for identity."""
+    return accept_encodings.best_match(CODINGS)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() / dict returns through dumps() — no str round trip."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj).decode() if not kwargs else super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)  # indented for debugging
+        t0 = time.perf_counter()
+        body = dumps(obj) + b"\n"
+        record("serialize", t0)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class EncodedJSON:
+    """One cached payload as response bytes, in every coding asked for so far."""
+
+    __slots__ = ("body", "_coded")
+
+    def __init__(self, payload):
+        t0 = time.perf_counter()
+        self.body = dumps(payload) + b"\n"
+        self._coded: dict = {}
+        record("serialize", t0)
+
+    def encoded(self, coding: str | None) -> tuple[bytes, str | None]:
+        """(bytes, coding actually applied) for the negotiated `coding`."""
+        if coding is None or len(self.body) < MIN_COMPRESS_BYTES:
+            return self.body, None
+        data = self._coded.get(coding)
+        if data is None:  # two racing requests may both compress; same bytes
+            t0 = time.perf_counter()
+            data = self._coded[coding] = compress(self.body, coding)
+            record("compress", t0)
+        return data, coding
@@ -0,0 +1,268 @@
+"""
+Revenue Report — materialized rollups.
+
+Aggregates the dashboard would otherwise recompute on every request
+(per-manager headcount, GRR/NRR product cohorts, AM books, org-wide headline
+KPIs, and the whole book's /api/grrnrr?group_by= cohorts). `import_data.py` rebuilds them in the same transaction as the base
+tables; `app.py` reads them via `rollup_rows()`, which falls back to the live
+query when the DB predates the rollup tables.
+
+Each entry maps a table name to:
+  • ddl     — CREATE TABLE statement (`pos` keeps the live query's ORDER BY;
+              aggregate columns are left untyped so SUM()'s integer-vs-real
+              result is stored exactly as the live query returns it)
+  • columns — output columns, in order
+  • select  — the live query, also used by `import_data.py --check`
+  • source  — base table it is derived from (an incremental import only
+              rebuilds the rollups whose source changed)
+"""
+import sqlite3
+
+from grr_slices import band_sql
+
+# Common filter — exclude Total / filter-info rows that have no product nor AM.
+ACCOUNT_BASE = "FROM account_analysis WHERE product IS NOT NULL AND TRIM(product) != ''"
+
+_COHORT_COLUMNS = """
+            COUNT(*)                                                                 AS accounts,
+            COALESCE(SUM(rev_24_25), 0)                                              AS rev_24_25,
+            COALESCE(SUM(rev_25_26), 0)                                              AS rev_25_26,
+            ABS(COALESCE(SUM(CASE WHEN churn < 0 THEN churn ELSE 0 END), 0))         AS churn,
+            COALESCE(SUM(CASE WHEN upsell > 0 THEN upsell ELSE 0 END), 0)            AS upsell,
+            ABS(COALESCE(SUM(CASE WHEN downsell < 0 THEN downsell ELSE 0 END), 0))   AS downsell,
+            COALESCE(SUM(CASE WHEN new_revenue > 0 THEN new_revenue ELSE 0 END), 0)  AS new_revenue,
+            COALESCE(SUM(grr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS grr,
+            COALESCE(SUM(nrr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), NULL)         AS nrr"""
+
+
+def headline_select(where: str = "") -> str:
+    """Org-wide headline KPIs + composite (revenue-weighted) GRR / NRR.
+
+    `where` is appended to ACCOUNT_BASE (e.g. "AND product = ?"); it occurs
+    twice in the statement, so its parameters must be passed twice.
+    """
+    return f"""SELECT head.*, weighted.* FROM (
+           SELECT
+            COUNT(*)                                                            AS total_accounts,
+            COALESCE(SUM(rev_24_25), 0)                                         AS rev_24_25,
+            COALESCE(SUM(rev_25_26), 0)                                         AS rev_25_26,
+            ABS(COALESCE(SUM(CASE WHEN churn    < 0 THEN churn    ELSE 0 END), 0)) AS total_churn,
+            ABS(COALESCE(SUM(CASE WHEN downsell < 0 THEN downsell ELSE 0 END), 0)) AS total_downsell,
+            COALESCE(SUM(CASE WHEN upsell      > 0 THEN upsell      ELSE 0 END), 0) AS total_upsell,
+            COALESCE(SUM(CASE WHEN new_revenue > 0 THEN new_revenue ELSE 0 END), 0) AS total_new_revenue,
+            SUM(CASE WHEN churn    IS NOT NULL AND churn    < 0 THEN 1 ELSE 0 END) AS churned_accounts,
+            SUM(CASE WHEN downsell IS NOT NULL AND downsell < 0 THEN 1 ELSE 0 END) AS downsell_accounts,
+            SUM(CASE WHEN upsell   IS NOT NULL AND upsell   > 0 THEN 1 ELSE 0 END) AS upsell_accounts,
+            SUM(CASE WHEN nrr IS NOT NULL AND nrr > 1.10 THEN 1 ELSE 0 END)        AS growth_accounts,
+            SUM(CASE WHEN nrr IS NOT NULL AND nrr < 0.90 THEN 1 ELSE 0 END)        AS at_risk_accounts,
+            SUM(CASE WHEN grr IS NOT NULL AND grr = 0    THEN 1 ELSE 0 END)        AS fully_lost_accounts,
+            SUM(CASE WHEN new_revenue IS NOT NULL AND new_revenue > 0 THEN 1 ELSE 0 END) AS new_logo_accounts
+           {ACCOUNT_BASE} {where}) AS head, (
+           -- Composite (revenue-weighted) GRR / NRR
+           SELECT
+            COALESCE(SUM(grr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), 0) AS composite_grr,
+            COALESCE(SUM(nrr * rev_24_25) / NULLIF(SUM(rev_24_25), 0), 0) AS composite_nrr
+           {ACCOUNT_BASE} {where} AND rev_24_25 IS NOT NULL AND rev_24_25 > 0) AS weighted"""
+
+
+def cohort_select(key: str, where: str = "", having: str = "",
+                  key_expr: str | None = None, order: str | None = None) -> str:
+    """_COHORT_COLUMNS per `key` — a column, or `key_expr` output as `key`.
+    `where` is appended to ACCOUNT_BASE. Default order: largest rev_25_26
+    first, ties by `key` (grr_engine.cohorts sorts the same way)."""
+    having = f"\n           HAVING {having}" if having else ""
+    order = order or f"rev_25_26 DESC, {key}"
+    return f"""SELECT
+            {key_expr or key} AS {key},{_COHORT_COLUMNS}
+           {ACCOUNT_BASE} {where}
+           GROUP BY {key}{having}
+           ORDER BY {order}"""
+
+
+_COHORT_DDL = """
+    accounts,
+    rev_24_25,
+    rev_25_26,
+    churn,
+    upsell,
+    downsell,
+    new_revenue,
+    grr,
+    nrr"""
+
+_COHORT_NAMES = ["accounts", "rev_24_25", "rev_25_26", "churn", "upsell",
+                 "downsell", "new_revenue", "grr", "nrr"]
+
+ROLLUPS = {
+    # Active vs Inactive HC per manager tab — tab badges + leaderboard context
+    "agg_manager_headcount": {
+        "source": "revenue_team",
+        "ddl": """
+CREATE TABLE agg_manager_headcount (
+    pos          INTEGER PRIMARY KEY,
+    manager_tab  TEXT NOT NULL UNIQUE,
+    active       INTEGER,
+    inactive     INTEGER
+);
+""",
+        "columns": ["manager_tab", "active", "inactive"],
+        "select": """SELECT manager_tab,
+                  SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) AS active,
+                  SUM(CASE WHEN status != 'Active' OR status IS NULL THEN 1 ELSE 0 END) AS inactive
+           FROM revenue_team
+           WHERE is_total = 0
+           GROUP BY manager_tab""",
+    },
+
+    # Org-wide GRR/NRR headline KPIs (single row)
+    "agg_account_headline": {
+        "source": "account_analysis",
+        "ddl": """
+CREATE TABLE agg_account_headline (
+    pos                  INTEGER PRIMARY KEY,
+    total_accounts,
+    rev_24_25,
+    rev_25_26,
+    total_churn,
+    total_downsell,
+    total_upsell,
+    total_new_revenue,
+    churned_accounts,
+    downsell_accounts,
+    upsell_accounts,
+    growth_accounts,
+    at_risk_accounts,
+    fully_lost_accounts,
+    new_logo_accounts,
+    composite_grr,
+    composite_nrr
+);
+""",
+        "columns": ["total_accounts", "rev_24_25", "rev_25_26", "total_churn",
+                    "total_downsell", "total_upsell", "total_new_revenue",
+                    "churned_accounts", "downsell_accounts", "upsell_accounts",
+                    "growth_accounts", "at_risk_accounts", "fully_lost_accounts",
+                    "new_logo_accounts", "composite_grr", "composite_nrr"],
+        "select": headline_select(),
+    },
+
+    # Product cohort breakdown
+    "agg_account_product": {
+        "source": "account_analysis",
+        "ddl": f"""
+CREATE TABLE agg_account_product (
+    pos          INTEGER PRIMARY KEY,
+    product      TEXT,{_COHORT_DDL}
+);
+""",
+        "columns": ["product"] + _COHORT_NAMES,
+        "select": cohort_select("product"),
+    },
+
+    # AM books (only AMs with a revenue book)
+    "agg_account_am": {
+        "source": "account_analysis",
+        "ddl": f"""
+CREATE TABLE agg_account_am (
+    pos          INTEGER PRIMARY KEY,
+    am           TEXT,{_COHORT_DDL}
+);
+""",
+        "columns": ["am"] + _COHORT_NAMES,
+        "select": cohort_select("am", "AND am IS NOT NULL AND TRIM(am) != ''",
+                                # not the alias: HAVING binds a bare name to the table column
+                                having="SUM(rev_24_25) > 0"),
+    },
+
+    # /api/grrnrr?group_by=am for the whole book — every AM, with a book or not
+    "agg_account_am_groups": {
+        "source": "account_analysis",
+        "ddl": f"""
+CREATE TABLE agg_account_am_groups (
+    pos          INTEGER PRIMARY KEY,
+    am           TEXT,{_COHORT_DDL}
+);
+""",
+        "columns": ["am"] + _COHORT_NAMES,
+        "select": cohort_select("am", "AND am IS NOT NULL AND TRIM(am) != ''"),
+    },
+
+    # /api/grrnrr?group_by=band for the whole book (band = REVENUE_BANDS index)
+    "agg_account_band": {
+        "source": "account_analysis",
+        "ddl": f"""
+CREATE TABLE agg_account_band (
+    pos          INTEGER PRIMARY KEY,
+    band         INTEGER,{_COHORT_DDL}
+);
+""",
+        "columns": ["band"] + _COHORT_NAMES,
+        "select": cohort_select("band", key_expr=band_sql(), order="band"),
+    },
+}
+
+
+def build_rollups(conn: sqlite3.Connection, tables=None):
+    """(Re)create the rollup tables from the base tables on `conn`.
+
+    `tables` limits the rebuild to rollups derived from those base tables
+    (default: all). Runs on the caller's connection/transaction, so the
+    rollups commit (or roll back) together with the base-table load.
+    """
+    cur = conn.cursor()
+    for name, spec in ROLLUPS.items():
+        if tables is not None and spec["source"] not in tables:
+            continue
+        cols = ", ".join(spec["columns"])
+        cur.execute(f"DROP TABLE IF EXISTS {name}")
+        cur.execute(spec["ddl"])
+        cur.execute(f"INSERT INTO {name} ({cols}) SELECT {cols} FROM ({spec['select']})")
+        n = cur.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        print(f"  ✓ {name}: {n} rows")
+
+
+def has_rollup(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def rollup_rows(conn: sqlite3.Connection, name: str) -> list:
+    """Rows of a rollup — the materialized table when present, else the live query."""
+    spec = ROLLUPS[name]
+    if has_rollup(conn, name):
+        sql = f"SELECT {', '.join(spec['columns'])} FROM {name} ORDER BY pos"
+    else:
+        sql = spec["select"]
+    return conn.execute(sql).fetchall()
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is b
+        return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+    return a == b
+
+
+def check_rollups(conn: sqlite3.Connection) -> list[str]:
+    """Compare every materialized rollup with a live recomputation.
+
+    Returns a list of human-readable mismatches (empty when all match).
+    """
+    problems = []
+    for name, spec in ROLLUPS.items():
+        if not has_rollup(conn, name):
+            problems.append(f"{name}: table missing")
+            continue
+        cols = ", ".join(spec["columns"])
+        stored = conn.execute(f"SELECT {cols} FROM {name} ORDER BY pos").fetchall()
+        live = conn.execute(f"SELECT {cols} FROM ({spec['select']})").fetchall()
+        if len(stored) != len(live):
+            problems.append(f"{name}: {len(stored)} stored rows vs {len(live)} live")
+            continue
+        for i, (s_row, l_row) in enumerate(zip(stored, live)):
+            if not all(_same(a, b) for a, b in zip(s_row, l_row)):
+                problems.append(f"{name}: row {i + 1} differs — stored {tuple(s_row)} vs live {tuple(l_row)}")
+                break
+    return problems
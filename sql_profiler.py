@@ -0,0 +1,272 @@
+"""
+Revenue Report — SQL statement profiler and slow-query log (opt-in).
+
+    RG_SQL_PROFILE=1       turn it on (off: no callbacks, stock cursors)
+    RG_SQL_SLOW_MS=50      slow-query threshold, ms inside SQLite per execution
+    RG_SQL_PROFILE_DIR     where stats and the slow log go (default: <tmp>/rg_sql_profile)
+
+Every statement app.py runs on a pooled connection is recorded under its
+normalized text (whitespace collapsed, literals → ?, IN lists folded), so the
+f-string WHERE clauses of /api/hcr and /api/team group by shape, not by
+value. Per statement it keeps the execution count, cumulative and max time
+inside SQLite (execute plus every fetch, timed by datastore.TimedCursor),
+rows returned, and VM instructions counted by the connection's progress
+handler — a cost that doesn't move with machine load. The trace callback
+supplies each execution as SQLite expanded it with its bound values;
+executions over the threshold are appended to slow.jsonl with that text,
+their time, rows and the request.
+
+Each process writes its aggregate to sqlprofile-<pid>.json every
+FLUSH_SECONDS and at exit; /api/sql/profile serves it live. The report
+merges every process's file and ranks statements by cost:
+
+    python sql_profiler.py [--dir DIR] [--by total|count|mean|max|rows|steps] [--top 20] [--slow 10]
+    python sql_profiler.py --clear
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+from flask import has_request_context, request
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "rg_sql_profile")
+PROGRESS_EVERY = 1000   # VM instructions per progress-handler call
+FLUSH_SECONDS = 30.0
+SLOW_LOG = "slow.jsonl"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql: str) -> str:
+    """Statement shape: literals → ?, `(?, ?, …)` → `(?, …)`, whitespace collapsed."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?, …)", sql)
+
+
+class _Trace:
+    """Per-connection callback state: progress ticks and the last traced statement."""
+
+    __slots__ = ("ticks", "traced")
+
+    def __init__(self):
+        self.ticks = 0
+        self.traced = None
+
+    def on_statement(self, sql: str):
+        if self.traced is None:  # the top-level statement, not FTS5's nested ones
+            self.traced = sql
+
+    def on_progress(self):
+        self.ticks += 1
+        return 0  # keep going
+
+
+class _Run:
+    """One execution of a statement, open until its cursor is exhausted or dropped."""
+
+    __slots__ = ("sql", "expanded", "seconds", "rows", "ticks")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.expanded = None
+        self.seconds = 0.0
+        self.rows = 0
+        self.ticks = 0
+
+
+def _empty() -> dict:
+    return {"count": 0, "seconds": 0.0, "max": 0.0, "rows": 0, "steps": 0, "slow": 0}
+
+
+class SqlProfiler:
+    """Process-wide per-statement aggregate, fed by datastore.TimedCursor."""
+
+    def __init__(self, directory: str = DEFAULT_DIR, slow_ms: float = 50.0):
+        self.directory = directory
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        self._since = time.time()
+        self._flushed = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    # ── hooks (datastore.TimedCursor / get_db) ──
+    def attach(self, conn):
+        """Route `conn`'s cursors through the profiler; callbacks are installed once."""
+        if getattr(conn, "_sql_trace", None) is None:
+            trace = _Trace()
+            conn.set_trace_callback(trace.on_statement)
+            conn.set_progress_handler(trace.on_progress, PROGRESS_EVERY)
+            conn._sql_trace = trace
+        conn.profiler = self
+
+    def steps(self, conn) -> int:
+        return conn._sql_trace.ticks
+
+    def begin(self, cursor, sql: str):
+        self.end(cursor)
+        cursor.connection._sql_trace.traced = None
+        cursor._sql_run = _Run(sql)
+
+    def spent(self, cursor, seconds: float, rows: int, ticks_before: int, done: bool):
+        run = getattr(cursor, "_sql_run", None)
+        if run is None:
+            return
+        trace = cursor.connection._sql_trace
+        run.seconds += seconds
+        run.rows += rows
+        run.ticks += trace.ticks - ticks_before
+        if run.expanded is None:
+            run.expanded = trace.traced
+        if done:
+            self.end(cursor)
+
+    def end(self, cursor):
+        run = cursor.__dict__.pop("_sql_run", None)
+        if run is not None:
+            self._record(run)
+
+    # ── aggregation ──
+    def _record(self, run: _Run):
+        key = normalize(run.sql)
+        slow = run.seconds * 1000 >= self.slow_ms
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _empty()
+            stats["count"] += 1
+            stats["seconds"] += run.seconds
+            stats["max"] = max(stats["max"], run.seconds)
+            stats["rows"] += run.rows
+            stats["steps"] += run.ticks * PROGRESS_EVERY
+            stats["slow"] += slow
+            flush = time.monotonic() - self._flushed > FLUSH_SECONDS
+        if slow:
+            self._log_slow(run, key)
+        if flush:
+            self.flush()
+
+    def _log_slow(self, run: _Run, key: str):
+        entry = {
+            "at":         time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "ms":         round(run.seconds * 1000, 3),
+            "rows":       run.rows,
+            "steps":      run.ticks * PROGRESS_EVERY,
+            "request":    f"{request.method} {request.full_path.rstrip('?')}" if has_request_context() else None,
+            "sql":        (run.expanded or run.sql).strip(),
+            "normalized": key,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with open(os.path.join(self.directory, SLOW_LOG), "a", encoding="utf-8") as f:
+            f.write(line)  # one write per line: appends from several workers don't interleave
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"pid": os.getpid(), "since": self._since, "slow_ms": self.slow_ms,
+                    "statements": {k: dict(v) for k, v in self._stats.items()}}
+
+    def flush(self):
+        """Write this process's aggregate to sqlprofile-<pid>.json (atomically)."""
+        snap = self.snapshot()
+        with self._lock:
+            self._flushed = time.monotonic()
+        path = os.path.join(self.directory, f"sqlprofile-{snap['pid']}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+# ─────────────────────────── report ───────────────────────────
+RANKINGS = {
+    "total": lambda s: s["seconds"],
+    "count": lambda s: s["count"],
+    "mean":  lambda s: s["seconds"] / s["count"],
+    "max":   lambda s: s["max"],
+    "rows":  lambda s: s["rows"],
+    "steps": lambda s: s["steps"],
+}
+
+
+def merged(directory: str) -> tuple[dict, int]:
+    """Every process's stats file in `directory` summed → ({statement: stats}, files read)."""
+    out: dict[str, dict] = {}
+    files = glob.glob(os.path.join(directory, "sqlprofile-*.json"))
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            snap = json.load(f)
+        for key, s in snap["statements"].items():
+            into = out.setdefault(key, _empty())
+            for field in ("count", "seconds", "rows", "steps", "slow"):
+                into[field] += s[field]
+            into["max"] = max(into["max"], s["max"])
+    return out, len(files)
+
+
+def slow_entries(directory: str, n: int) -> list[dict]:
+    path = os.path.join(directory, SLOW_LOG)
+    if n <= 0 or not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()[-n:]
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def report(directory: str, by: str = "total", top: int = 20, slow: int = 10, width: int = 100):
+    stats, files = merged(directory)
+    if not stats:
+        print(f"No profile data in {directory} — run the app with RG_SQL_PROFILE=1 first.")
+        return
+    total = sum(s["seconds"] for s in stats.values()) or 1.0
+    ranked = sorted(stats.items(), key=lambda kv: RANKINGS[by](kv[1]), reverse=True)[:top]
+    print(f"{len(stats)} statements from {files} process file(s), {total * 1000:,.1f} ms in SQLite "
+          f"— top {len(ranked)} by {by}\n")
+    print(f"  {'total ms':>10}{'share':>7}{'count':>8}{'mean ms':>9}{'max ms':>9}{'rows':>10}"
+          f"{'k steps':>10}{'slow':>6}  statement")
+    for key, s in ranked:
+        print(f"  {s['seconds'] * 1000:>10.1f}{s['seconds'] / total:>7.1%}{s['count']:>8,}"
+              f"{s['seconds'] * 1000 / s['count']:>9.2f}{s['max'] * 1000:>9.2f}{s['rows']:>10,}"
+              f"{s['steps'] // 1000:>10,}{s['slow']:>6,}  {key[:width]}")
+    entries = slow_entries(directory, slow)
+    if entries:
+        print(f"\nlast {len(entries)} slow executions ({os.path.join(directory, SLOW_LOG)}):")
+        for e in entries:
+            print(f"  {e['at']}{e['ms']:>10.1f} ms{e['rows']:>9,} rows  {e['request'] or '—'}")
+            print(f"      {e['sql'][:width * 2]}")
+
+
+def clear(directory: str):
+    paths = glob.glob(os.path.join(directory, "sqlprofile-*.json")) + [os.path.join(directory, SLOW_LOG)]
+    removed = 0
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    print(f"✓ removed {removed} file(s) from {directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank the SQL statements recorded with RG_SQL_PROFILE=1.")
+    parser.add_argument("--dir", default=os.environ.get("RG_SQL_PROFILE_DIR", DEFAULT_DIR))
+    parser.add_argument("--by", choices=sorted(RANKINGS), default="total")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=10, help="last N slow-log entries to show")
+    parser.add_argument("--width", type=int, default=100, help="statement text columns")
+    parser.add_argument("--clear", action="store_true", help="delete the stats files and slow log")
+    args = parser.parse_args()
+    if args.clear:
+        clear(args.dir)
+    else:
+        report(args.dir, args.by, args.top, args.slow, args.width)
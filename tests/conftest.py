@@ -0,0 +1,61 @@
+"""
+Shared fixtures: a synthetic wfm_data.db built through the importer
+(benchmarks/synth_data.py) and the Flask app pointed at it.
+
+app.py reads DB_PATH when it is imported, so it is only imported by the
+`app_module` fixture, after datastore.DB_PATH has been redirected.
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import datastore  # noqa: E402
+import synth_data  # noqa: E402
+from helpers import write_sources  # noqa: E402
+
+SCALE = 0.3
+
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("db") / "wfm_data.db")
+    synth_data.build_db(path, SCALE)
+    return path
+
+
+@pytest.fixture(scope="session")
+def app_module(db_path, tmp_path_factory):
+    saved = datastore.DB_PATH
+    datastore.DB_PATH = db_path
+    os.environ["RG_EXPORT_CACHE_DIR"] = str(tmp_path_factory.mktemp("xlsx_cache"))
+    os.environ["RG_PROFILE_DIR"] = str(tmp_path_factory.mktemp("profiles"))
+    try:
+        yield importlib.import_module("app")
+    finally:
+        datastore.DB_PATH = saved
+
+
+@pytest.fixture
+def client(app_module):
+    app_module.RESULT_CACHE.clear()
+    c = app_module.app.test_client()
+    with c.session_transaction() as s:
+        s["authed"] = True
+    return c
+
+
+# ─────────────────────────── importer ───────────────────────────
+@pytest.fixture(scope="session")
+def base_sources():
+    return synth_data.sources(SCALE)
+
+
+@pytest.fixture(scope="session")
+def source_dir(base_sources, tmp_path_factory):
+    return write_sources(tmp_path_factory.mktemp("sources"), base_sources)
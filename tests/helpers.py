@@ -0,0 +1,57 @@
+"""Helpers shared by the test modules: running the importer on a directory of
+source workbooks and comparing the DBs it writes."""
+import contextlib
+import io
+import os
+import sqlite3
+
+import import_data
+import synth_data
+
+
+def write_sources(directory, data: dict) -> str:
+    """Save `data` ({unit: sheet rows}) as the three source workbooks in `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    synth_data.write_workbooks(str(directory), data)
+    return str(directory)
+
+
+def run_import(source_dir, db: str, jobs: int = 1, incremental: bool = False) -> bool:
+    """import_data.main() on the workbooks in `source_dir`, publishing to `db`.
+    True if it wrote a new DB."""
+    saved = (import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX, import_data.DB_PATH)
+    import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX = (
+        os.path.join(source_dir, os.path.basename(p)) for p in saved[:3])
+    import_data.DB_PATH = db
+    try:
+        before = os.stat(db).st_ino if os.path.exists(db) else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_data.main(incremental=incremental, jobs=jobs)
+        return os.stat(db).st_ino != before
+    finally:
+        import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX, import_data.DB_PATH = saved
+
+
+def dump(path: str) -> dict:
+    """{table: [rows…]} for every table, skipping the import timestamp and
+    the exports stamped with it.
+
+    Virtual tables (the FTS5 index) are compared by their rows, not their
+    shadow tables. sqlite_stat1 is compared by (table, index): ANALYZE writes
+    it in schema order, which moves when a reload recreates a rollup table.
+    """
+    conn = sqlite3.connect(path)
+    schema = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+    virtual = [name for name, sql in schema if sql.upper().startswith("CREATE VIRTUAL TABLE")]
+    tables = [name for name, sql in schema
+              if not any(name.startswith(f"{v}_") for v in virtual) and "WITHOUT ROWID" not in sql.upper()
+              and name != "export_xlsx"]
+    out = {}
+    for t in tables:
+        order = "tbl, idx" if t == "sqlite_stat1" else "rowid"
+        rows = conn.execute(f"SELECT * FROM {t} ORDER BY {order}").fetchall()
+        if t == "revenue_meta":
+            rows = [r for r in rows if r[0] != "last_loaded_at"]
+        out[t] = rows
+    conn.close()
+    return out
@@ -0,0 +1,44 @@
+"""/api/bootstrap: combined payloads, and every error path answered as a 4xx."""
+from urllib.parse import quote
+
+import pytest
+
+
+def test_parts_match_their_own_endpoints(client, app_module):
+    manager = quote(app_module.MANAGER_TABS[0])
+    resp = client.get(f"/api/bootstrap?parts=leaderboard,grrnrr,team,team_summary&manager={manager}")
+    assert resp.status_code == 200
+    out = resp.get_json()
+    assert out["leaderboard"] == client.get("/api/leaderboard").get_json()
+    assert out["grrnrr"] == client.get("/api/grrnrr").get_json()
+    assert out["team"] == client.get(f"/api/team/{manager}").get_json()
+    assert out["team_summary"] == client.get(f"/api/team/{manager}/summary").get_json()
+
+
+def test_unknown_part_is_400(client):
+    resp = client.get("/api/bootstrap?parts=leaderboard,nope")
+    assert resp.status_code == 400
+    assert "leaderboard" in resp.get_json()["parts"]
+
+
+def test_unknown_manager_is_404(client):
+    assert client.get("/api/bootstrap?parts=team&manager=Nobody").status_code == 404
+
+
+@pytest.mark.parametrize("query", [
+    "parts=grrnrr&min_rev=abc",
+    "parts=leaderboard,grrnrr&group_by=region",
+    "parts=team&manager={manager}&sort=bogus",
+    "parts=team&manager={manager}&limit=abc",
+    "parts=team,team_summary&manager={manager}&fields=nope",
+])
+def test_a_part_rejecting_its_parameters_fails_the_call_with_its_400(client, app_module, query):
+    url = "/api/bootstrap?" + query.format(manager=quote(app_module.MANAGER_TABS[0]))
+    for _ in range(2):  # the error isn't cached as a payload either
+        resp = client.get(url)
+        assert resp.status_code == 400
+        assert "error" in resp.get_json()
+
+
+def test_unauthenticated_is_401(app_module):
+    assert app_module.app.test_client().get("/api/bootstrap").status_code == 401
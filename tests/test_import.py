@@ -0,0 +1,160 @@
+"""import_data: sheet fingerprints, --incremental and --jobs all produce the
+same DB as a serial full rebuild (an incremental one up to revenue_team's
+row_order ids)."""
+import os
+import sqlite3
+
+import pytest
+
+import import_data
+import synth_data
+from helpers import dump, run_import, write_sources
+from import_data import MANAGER_TABS, TEAM_UNIT, fingerprint
+
+CHANGED_TAB = MANAGER_TABS[2]
+
+
+@pytest.fixture(scope="module")
+def edited_sources(base_sources):
+    """The base workbooks with one manager tab (now shorter) and the leader pivot replaced."""
+    data = dict(base_sources)
+    data[TEAM_UNIT + CHANGED_TAB] = synth_data.manager_sheet(CHANGED_TAB, 3, seed=99)
+    data["leader_perf_pivot"] = synth_data.leader_perf_sheet(2, seed=99)
+    return data
+
+
+@pytest.fixture(scope="module")
+def edited_dir(edited_sources, tmp_path_factory):
+    return write_sources(tmp_path_factory.mktemp("edited"), edited_sources)
+
+
+@pytest.fixture(scope="module")
+def full_edited_db(edited_dir, tmp_path_factory):
+    db = str(tmp_path_factory.mktemp("full") / "wfm_data.db")
+    run_import(edited_dir, db)
+    return db
+
+
+def sheet_fingerprints(source_dir: str) -> dict:
+    """{unit: fingerprint} of the workbooks as the importer reads them back."""
+    paths = tuple(os.path.join(source_dir, os.path.basename(p))
+                  for p in (import_data.XLSX_PATH, import_data.GRR_NRR_XLSX, import_data.LEADER_PERF_XLSX))
+    return {unit: fingerprint(rows) for unit, rows in import_data.load_sources(paths=paths).items()}
+
+
+def stored_fingerprints(db: str) -> dict:
+    conn = sqlite3.connect(db)
+    try:
+        return import_data.stored_fingerprints(conn)
+    finally:
+        conn.close()
+
+
+def team_rows(db: str) -> dict:
+    """{manager_tab: [(row_order, sort_order), …]} of revenue_team."""
+    conn = sqlite3.connect(db)
+    try:
+        rows = conn.execute("SELECT manager_tab, row_order, sort_order FROM revenue_team ORDER BY row_order").fetchall()
+    finally:
+        conn.close()
+    out = {}
+    for tab, row_order, sort_order in rows:
+        out.setdefault(tab, []).append((row_order, sort_order))
+    return out
+
+
+def without_team_ids(tables: dict) -> dict:
+    """dump() with revenue_team's row_order ids (and their sequence) left out —
+    an incremental reload appends a changed tab after the others."""
+    tables = dict(tables)
+    tables["revenue_team"] = sorted(row[1:] for row in tables["revenue_team"])
+    tables["sqlite_sequence"] = [row for row in tables["sqlite_sequence"] if row[0] != "revenue_team"]
+    return tables
+
+
+# ─────────────────────────── fingerprints ───────────────────────────
+def test_fingerprint_ignores_trailing_empty_cells():
+    rows = [("Name", "Value"), ("a", 1)]
+    assert fingerprint(rows) == fingerprint([("Name", "Value", None), ("a", 1, None, None)])
+
+
+@pytest.mark.parametrize("other", [
+    [("Name", "Value"), ("a", 2)],
+    [("Name", "Value"), ("a", 1), ("b", 1)],
+    [("Name", "Value"), (None, "a", 1)],
+    [("Name", "Value"), ("a", "1")],
+])
+def test_fingerprint_changes_with_any_value(other):
+    assert fingerprint([("Name", "Value"), ("a", 1)]) != fingerprint(other)
+
+
+def test_import_stores_every_units_fingerprint(source_dir, tmp_path):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(source_dir, db)
+    assert stored_fingerprints(db) == sheet_fingerprints(source_dir)
+
+
+def test_changed_units_names_only_the_edited_sheets(source_dir, edited_dir, tmp_path, monkeypatch):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(source_dir, db)
+    monkeypatch.setattr(import_data, "DB_PATH", db)
+    assert import_data.changed_units(sheet_fingerprints(source_dir)) == []
+    assert import_data.changed_units(sheet_fingerprints(edited_dir)) == [TEAM_UNIT + CHANGED_TAB, "leader_perf_pivot"]
+
+
+def test_synthetic_db_has_planner_statistics(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        analyzed = {t for (t,) in conn.execute("SELECT DISTINCT tbl FROM sqlite_stat1")}
+    finally:
+        conn.close()
+    assert {"revenue_hcr", "revenue_team", "account_analysis"} <= analyzed
+
+
+# ─────────────────────────── incremental ───────────────────────────
+def test_incremental_without_changes_leaves_the_db_alone(source_dir, tmp_path):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(source_dir, db)
+    before = os.stat(db)
+    assert not run_import(source_dir, db, incremental=True)
+    after = os.stat(db)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_incremental_reload_matches_a_full_rebuild(source_dir, edited_dir, full_edited_db, tmp_path, jobs):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(source_dir, db)
+    assert run_import(edited_dir, db, jobs=jobs, incremental=True)
+    # row_order (outside revenue_team), sqlite_sequence and sqlite_stat1 included
+    assert without_team_ids(dump(db)) == without_team_ids(dump(full_edited_db))
+
+
+def test_incremental_reloads_only_the_changed_tab(source_dir, edited_dir, tmp_path, monkeypatch):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(source_dir, db)
+    before = team_rows(db)
+    loaded = []
+    import_unit = import_data.import_unit
+    monkeypatch.setattr(import_data, "import_unit", lambda unit, rows, conn: (loaded.append(unit), import_unit(unit, rows, conn)))
+    assert run_import(edited_dir, db, incremental=True)
+    assert loaded == [TEAM_UNIT + CHANGED_TAB, "leader_perf_pivot"]
+    after = team_rows(db)
+    # untouched tabs keep their rows, ids included; the edited one is appended
+    assert {tab: rows for tab, rows in after.items() if tab != CHANGED_TAB} == \
+           {tab: rows for tab, rows in before.items() if tab != CHANGED_TAB}
+    assert min(r for r, _ in after[CHANGED_TAB]) > max(r for rows in before.values() for r, _ in rows)
+
+
+def test_incremental_without_stored_fingerprints_rebuilds(edited_dir, full_edited_db, tmp_path):
+    db = str(tmp_path / "wfm_data.db")
+    assert run_import(edited_dir, db, incremental=True)
+    assert dump(db) == dump(full_edited_db)
+
+
+# ─────────────────────────── --jobs ───────────────────────────
+@pytest.mark.parametrize("jobs", [2, 4])
+def test_parallel_import_matches_serial(edited_dir, full_edited_db, tmp_path, jobs):
+    db = str(tmp_path / "wfm_data.db")
+    run_import(edited_dir, db, jobs=jobs)
+    assert dump(db) == dump(full_edited_db)
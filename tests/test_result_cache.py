@@ -0,0 +1,110 @@
+"""ResultCache: per-version caching and what happens when an import swaps the
+DB while a value is being computed."""
+import threading
+
+import pytest
+
+import datastore
+from datastore import ResultCache
+
+
+@pytest.fixture
+def version(monkeypatch):
+    """The data version ResultCache sees; set `version.now` to simulate an import."""
+
+    class Version:
+        now = "v1"
+
+    monkeypatch.setattr(datastore, "data_version", lambda: Version.now)
+    return Version
+
+
+def test_cached_within_a_version_and_flushed_by_a_new_one(version):
+    cache = ResultCache()
+    assert cache.get_or_compute("k", lambda: 1) == 1
+    assert cache.get_or_compute("k", lambda: 2) == 1
+    version.now = "v2"
+    assert cache.get_or_compute("k", lambda: 3) == 3
+    assert cache.invalidations == 1
+
+
+def test_not_cacheable_values_are_not_stored(version):
+    cache = ResultCache()
+    assert cache.get_or_compute("k", lambda: None, cacheable=lambda v: v is not None) is None
+    assert cache.get_or_compute("k", lambda: 5, cacheable=lambda v: v is not None) == 5
+
+
+def test_swap_during_compute_doesnt_file_the_old_value_under_the_new_version(version):
+    cache = ResultCache()
+
+    def compute_on_old_snapshot():
+        version.now = "v2"                                    # an import lands meanwhile …
+        assert cache.get_or_compute("other", lambda: "new") == "new"  # … and another request sees it
+        return "old"
+
+    assert cache.get_or_compute("k", compute_on_old_snapshot) == "old"
+    assert cache.get_or_compute("k", lambda: "new") == "new"
+
+
+def test_value_pinned_to_a_superseded_version_is_neither_served_nor_stored(version):
+    cache = ResultCache()
+    version.now = "v2"
+    assert cache.get_or_compute("k", lambda: "v2 value") == "v2 value"
+    # A request still holding a v1 connection computes its own value …
+    assert cache.get_or_compute("k", lambda: "v1 value", version="v1") == "v1 value"
+    # … without touching the v2 entry
+    assert cache.get_or_compute("k", lambda: "recomputed") == "v2 value"
+    assert cache.get_or_compute("j", lambda: "v1 value", version="v1") == "v1 value"
+    assert cache.get_or_compute("j", lambda: "v2 value") == "v2 value"
+
+
+def test_pinned_to_the_current_version_caches_normally(version):
+    cache = ResultCache()
+    assert cache.get_or_compute("k", lambda: 1, version="v1") == 1
+    assert cache.get_or_compute("k", lambda: 2) == 1
+
+
+def test_concurrent_misses_compute_once(version):
+    cache = ResultCache()
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_request_connection_is_pinned_to_its_snapshot(app_module, monkeypatch):
+    """Nested lookups (counts, facets, columns) made on a request's connection
+    aren't cached once the file it reads has been superseded."""
+    app_module.RESULT_CACHE.clear()
+    with app_module.app.test_request_context("/api/hcr"):
+        conn = app_module.get_db()
+        assert conn.snapshot_version == datastore.data_version()
+        calls = []
+
+        def count():
+            calls.append(1)
+            return conn.execute("SELECT COUNT(*) FROM revenue_hcr").fetchone()[0]
+
+        monkeypatch.setattr(datastore, "data_version", lambda: "after-an-import")
+        first = app_module.snapshot_cached(conn, ("test-count",), count)
+        assert app_module.snapshot_cached(conn, ("test-count",), count) == first
+        assert len(calls) == 2
+        monkeypatch.undo()
+        assert app_module.snapshot_cached(conn, ("test-count",), count) == first
+        assert app_module.snapshot_cached(conn, ("test-count",), count) == first
+        assert len(calls) == 3
@@ -0,0 +1,108 @@
+"""xlsx exports: byte-stable rendering, the copies the importer stores in the
+DB and the export cache for DBs without them."""
+import hashlib
+import io
+import os
+import sqlite3
+import zipfile
+from datetime import datetime
+from urllib.parse import quote
+
+import pytest
+
+import datastore
+from helpers import run_import
+from import_data import MANAGER_TABS
+from xlsx_export import ExportCache, render_team_xlsx, stored_export
+
+STAMP = datetime(2026, 5, 1, 10, 30)
+
+
+@pytest.fixture
+def render(db_path):
+    manager = MANAGER_TABS[0]
+
+    def render(out):
+        conn = sqlite3.connect(db_path)
+        try:
+            render_team_xlsx(conn, manager, STAMP, out)
+        finally:
+            conn.close()
+    return render
+
+
+def test_render_is_byte_stable_and_stamped(render):
+    first, second = io.BytesIO(), io.BytesIO()
+    render(first)
+    render(second)
+    assert first.getvalue() == second.getvalue()
+    with zipfile.ZipFile(first) as z:
+        assert {info.date_time for info in z.infolist()} == {STAMP.timetuple()[:6]}
+        core = z.read("docProps/core.xml").decode()
+    assert core.count("2026-05-01T10:30:00Z") == 2  # created and modified
+
+
+@pytest.mark.parametrize("on_disk", [True, False])
+def test_cache_renders_once_per_version(render, tmp_path, on_disk):
+    cache = ExportCache(str(tmp_path) if on_disk else None)
+    entry = cache.get_or_render("v1", "m", render)
+    assert cache.get_or_render("v1", "m", render) == entry
+    assert (cache.hits, cache.renders) == (1, 1)
+    if on_disk:
+        with open(entry["path"], "rb") as fh:
+            data = fh.read()
+        assert os.listdir(os.path.dirname(entry["path"])) == [f"{entry['sha']}.xlsx"]  # no temp files left
+    else:
+        data = entry["data"]
+    expected = io.BytesIO()
+    render(expected)
+    assert data == expected.getvalue()
+
+
+def test_download_etag_is_stable(client, app_module):
+    url = f"/api/download/{quote(app_module.MANAGER_TABS[0])}"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.data[:2] == b"PK"
+    assert client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+@pytest.fixture(scope="module")
+def imported_db(source_dir, tmp_path_factory):
+    db = str(tmp_path_factory.mktemp("imported") / "wfm_data.db")
+    run_import(source_dir, db)
+    return db
+
+
+def test_import_stores_every_export_as_the_app_would_render_it(imported_db):
+    conn = sqlite3.connect(imported_db)
+    try:
+        loaded_at = conn.execute("SELECT value FROM revenue_meta WHERE key = 'last_loaded_at'").fetchone()[0]
+        # app.py stamps its renders with data_last_modified() in local time
+        generated_at = datastore._loaded_at_utc(loaded_at, 0).astimezone().replace(tzinfo=None)
+        for manager in MANAGER_TABS:
+            entry = stored_export(conn, manager)
+            expected = io.BytesIO()
+            render_team_xlsx(conn, manager, generated_at, expected)
+            assert entry["data"] == expected.getvalue(), manager
+            assert entry["sha"] == hashlib.sha256(entry["data"]).hexdigest()
+    finally:
+        conn.close()
+
+
+def test_download_serves_the_stored_export(client, app_module, imported_db, monkeypatch):
+    conn = sqlite3.connect(imported_db)
+    entry = stored_export(conn, MANAGER_TABS[0])
+    conn.close()
+    monkeypatch.setattr(app_module, "stored_export", lambda conn, manager: entry)
+    renders = app_module.EXPORT_CACHE.renders
+    resp = client.get(f"/api/download/{quote(MANAGER_TABS[0])}")
+    assert resp.data == entry["data"]
+    assert resp.headers["ETag"] == f'"{entry["sha"]}"'
+    assert app_module.EXPORT_CACHE.renders == renders
+
+
+def test_page_load_renders_nothing(client, app_module):
+    renders = app_module.EXPORT_CACHE.renders
+    assert client.get("/").status_code == 200
+    assert app_module.EXPORT_CACHE.renders == renders
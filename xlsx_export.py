@@ -0,0 +1,440 @@
+"""
+Revenue Report — Excel export engine for /api/download/<manager>.
+
+Uses openpyxl's write-only mode: rows are streamed from the SQLite cursor
+straight into the worksheet XML instead of building the whole workbook in
+memory, and every cell reuses one of a small set of named styles registered
+once per workbook instead of allocating its own Font / Alignment / PatternFill.
+
+Layout (unchanged from the original in-memory export):
+  row 1  title bar (merged across all columns)
+  row 2  "Generated … · N rows" (merged)
+  row 4  header row, frozen at E5 together with Team/Status/Emp ID/Name
+  row 5+ data rows — team subtotals and the grand total get filled rows
+
+Rendered files are byte-stable for a given data version (timestamps inside
+the package are pinned to `generated_at`), so each is served with its content
+hash as ETag: pre-rendered by the importer into the DB's export_xlsx table,
+or — for a DB without one — rendered on first download into ExportCache.
+"""
+import atexit
+import hashlib
+import io
+import os
+import shutil
+import threading
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.writer.excel import ExcelWriter
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# (header, revenue_team column, width, format kind)
+#   kind: text = left-aligned · wrap = wrapped remarks · cur / pct / mult = right-aligned numbers
+EXPORT_COLUMNS = [
+    ("Team",                       "team",                    22, "text"),
+    ("Status",                     "status",                  12, "text"),
+    ("Emp ID",                     "emp_id",                  10, "text"),
+    ("Name",                       "emp_name",                28, "text"),
+    ("Tenure",                     "tenure_ymd",              16, "text"),
+    ("Budget FY 25-26",            "budget_fy_25_26",         16, "cur"),
+    ("Budget YTD 25-26",           "budget_ytd_25_26",        16, "cur"),
+    ("New Sales 25-26",            "new_sales_25_26",         16, "cur"),
+    ("Ach % (25-26)",              "ach_pct_25_26",           14, "pct"),
+    ("Salary 25-26",               "salary_25_26",            14, "cur"),
+    ("Salary Multiple (25-26)",    "salary_multiple_25_26",   16, "mult"),
+    ("Total Expenses 25-26",       "total_expenses_25_26",    16, "cur"),
+    ("Sales Multiple (25-26)",     "sales_multiple_25_26",    16, "mult"),
+    ("GRR",                        "grr",                     10, "pct"),
+    ("NRR",                        "nrr",                     10, "pct"),
+    ("Q4 Pipe Target",             "q4_pipe_target",          16, "cur"),
+    ("Q4 Pipe Creation",           "q4_pipe_creation",        16, "cur"),
+    ("Q4 Pipe Ach %",              "q4_pipe_achievement_pct", 14, "pct"),
+    ("Q3 Remarks",                 "q3_remarks",              60, "wrap"),
+    ("Q4 Remarks (HR-calibrated)", "q4_remarks",              60, "wrap"),
+]
+
+HEADER_ROW = 4
+FREEZE_AT = "E5"  # freeze top headers + Team/Status/EmpId/Name columns
+
+_NUMBER_FORMATS = {"cur": "#,##0", "pct": "0.0%", "mult": "0.00\"x\""}
+
+# Shared style components — built once per process, immutable once assigned.
+_THIN = Side(style="thin", color="DDDDDD")
+_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_ROW_KINDS = {
+    # is_total → (name suffix, font colour, bold, fill colour)
+    0: ("data",     "1A1A1A", False, None),
+    1: ("subtotal", "FFFFFF", True,  "2C1E57"),
+    2: ("grand",    "FFFFFF", True,  "3A1A6A"),
+}
+
+
+def _named_styles() -> list[NamedStyle]:
+    """Title, subtitle, header and one style per (row kind × column kind)."""
+    styles = [
+        NamedStyle(
+            name="rg_title",
+            font=Font(bold=True, size=14, color="FFFFFF"),
+            fill=PatternFill("solid", fgColor="5C2DB8"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ),
+        NamedStyle(name="rg_subtitle", font=Font(italic=True, size=10, color="6B6B6B")),
+        NamedStyle(
+            name="rg_header",
+            font=Font(bold=True, color="FFFFFF", size=10),
+            fill=PatternFill("solid", fgColor="2A2C54"),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=_BORDER,
+        ),
+    ]
+    for suffix, color, bold, fill in _ROW_KINDS.values():
+        font = Font(color=color, bold=bold, size=10)
+        for kind in ("text", "wrap", "cur", "pct", "mult"):
+            style = NamedStyle(
+                name=f"rg_{suffix}_{kind}",
+                font=font,
+                alignment=Alignment(
+                    vertical="top",
+                    wrap_text=(kind == "wrap"),
+                    horizontal="left" if kind in ("text", "wrap") else "right",
+                ),
+                border=_BORDER,
+                number_format=_NUMBER_FORMATS.get(kind, "General"),
+            )
+            if fill:
+                style.fill = PatternFill("solid", fgColor=fill)
+            styles.append(style)
+    return styles
+
+
+def _row_style_names() -> dict[int, list[str]]:
+    """is_total → per-column style name, precomputed once."""
+    return {
+        is_total: [f"rg_{suffix}_{kind}" for _, _, _, kind in EXPORT_COLUMNS]
+        for is_total, (suffix, _, _, _) in _ROW_KINDS.items()
+    }
+
+
+_ROW_STYLE_NAMES = _row_style_names()
+
+EXPORT_SQL = f"""SELECT {", ".join(c for _, c, _, _ in EXPORT_COLUMNS)}, is_total
+           FROM revenue_team
+           WHERE manager_tab = ?
+           ORDER BY sort_order"""
+
+
+def _team_workbook(conn, manager: str, generated_at: datetime):
+    """`manager`'s write-only workbook with the rows streamed in, ready to save."""
+    n_rows = conn.execute(
+        "SELECT COUNT(*) FROM revenue_team WHERE manager_tab = ?", (manager,)
+    ).fetchone()[0]
+    n_cols = len(EXPORT_COLUMNS)
+
+    wb = openpyxl.Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    ws = wb.create_sheet(title=manager[:31])  # Excel limit on sheet name length
+
+    # Sheet-level settings must be in place before the first row is written
+    for i, (_, _, width, _) in enumerate(EXPORT_COLUMNS, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.row_dimensions[HEADER_ROW].height = 36
+    ws.freeze_panes = FREEZE_AT
+    for row in (1, 2):
+        ws.merged_cells.add(CellRange(min_row=row, min_col=1, max_row=row, max_col=n_cols))
+
+    def styled(value, style):
+        c = WriteOnlyCell(ws, value=value)
+        c.style = style
+        return c
+
+    ws.append([styled(f"{manager} — Team Performance & Q4 Commentary", "rg_title")])
+    ws.append([styled(f"Generated {generated_at.strftime('%d %b %Y, %H:%M')} · {n_rows} rows", "rg_subtitle")])
+    ws.append([])
+    ws.append([styled(h, "rg_header") for h, _, _, _ in EXPORT_COLUMNS])
+
+    # Data rows — iterate the cursor lazily instead of fetchall()
+    for row in conn.execute(EXPORT_SQL, (manager,)):
+        names = _ROW_STYLE_NAMES.get(row[n_cols] or 0, _ROW_STYLE_NAMES[0])
+        ws.append([styled(row[i], names[i]) for i in range(n_cols)])
+    return wb
+
+
+def write_team_workbook(conn, manager: str, out, generated_at: datetime | None = None):
+    """Stream `manager`'s revenue_team rows into an .xlsx written to `out`
+    (a path or binary file object)."""
+    _team_workbook(conn, manager, generated_at or datetime.now()).save(out)
+
+
+# ─────────────────────────── byte-stable rendering ───────────────────────────
+class _PinnedZipFile(zipfile.ZipFile):
+    """Write-mode ZipFile stamping every entry with one fixed time, where
+    openpyxl would use "now" (or the worksheet temp file's mtime)."""
+
+    def __init__(self, file, date_time: tuple):
+        super().__init__(file, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+        self._date_time = date_time
+
+    def _info(self, name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=self._date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o600 << 16
+        return info
+
+    def writestr(self, zinfo_or_arcname, data, *args, **kwargs):
+        if isinstance(zinfo_or_arcname, str):
+            zinfo_or_arcname = self._info(zinfo_or_arcname)
+        super().writestr(zinfo_or_arcname, data, *args, **kwargs)
+
+    def write(self, filename, arcname=None, *args, **kwargs):
+        # Copied across in chunks, so the sheet XML is never held in memory
+        info = self._info(arcname or os.path.basename(filename))
+        info.external_attr = (os.stat(filename).st_mode & 0xFFFF) << 16  # as ZipFile.write() records it
+        with open(filename, "rb") as src, self.open(info, "w") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def render_team_xlsx(conn, manager: str, generated_at: datetime, out):
+    """Byte-stable export for `manager`, written to the binary file `out`.
+
+    Zip entry times and docProps created/modified are all `generated_at`,
+    so identical input gives identical bytes.
+    """
+    wb = _team_workbook(conn, manager, generated_at)
+    wb.properties.created = wb.properties.modified = generated_at
+    # ExcelWriter directly: Workbook.save() re-stamps `modified` with now
+    ExcelWriter(wb, _PinnedZipFile(out, generated_at.timetuple()[:6])).save()
+
+
+# ─────────────────────────── pre-rendered exports ───────────────────────────
+# import_data.py renders every manager's export into the DB it publishes, so a
+# download is served from the snapshot it belongs to on every worker — and on
+# read-only or serverless hosts — without rendering anything at request time.
+EXPORTS_TABLE = "export_xlsx"
+DDL_EXPORTS = f"""
+CREATE TABLE {EXPORTS_TABLE} (
+    manager_tab  TEXT PRIMARY KEY,
+    sha          TEXT NOT NULL,   -- sha256 of data, the download's ETag
+    data         BLOB NOT NULL
+)
+"""
+
+
+def store_exports(conn, managers, generated_at: datetime) -> int:
+    """(Re)build EXPORTS_TABLE with each manager's export stamped `generated_at`
+    → total bytes stored."""
+    conn.execute(f"DROP TABLE IF EXISTS main.{EXPORTS_TABLE}")
+    conn.execute(DDL_EXPORTS)
+    total = 0
+    for manager in managers:
+        buf = io.BytesIO()
+        render_team_xlsx(conn, manager, generated_at, buf)
+        data = buf.getvalue()
+        conn.execute(f"INSERT INTO main.{EXPORTS_TABLE} VALUES (?, ?, ?)",
+                     (manager, hashlib.sha256(data).hexdigest(), data))
+        total += len(data)
+    return total
+
+
+def stored_export(conn, manager: str) -> dict | None:
+    """{"sha", "path", "data"} of `manager`'s pre-rendered export, or None when
+    the DB has none (an import that predates them, or a synthetic DB)."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (EXPORTS_TABLE,)).fetchone() is None:
+        return None
+    row = conn.execute(f"SELECT sha, data FROM {EXPORTS_TABLE} WHERE manager_tab = ?", (manager,)).fetchone()
+    return {"sha": row[0], "path": None, "data": row[1]} if row else None
+
+
+# ─────────────────────────── export cache ───────────────────────────
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def _sweep_exited(root: str):
+    """Remove the cache directories of processes that are no longer running."""
+    for name in os.listdir(root):
+        pid = name[len("pid-"):]
+        if name.startswith("pid-") and pid.isdigit() and not _alive(int(pid)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class ExportCache:
+    """Content-addressed store of rendered exports, one per (data version, manager).
+
+    Files are named by the SHA-256 of their bytes and kept under
+    `root`/pid-<pid> (or in memory when no directory is usable), evicted LRU
+    once the total exceeds `max_bytes`. Entries for superseded data versions
+    are dropped as soon as a new version is seen.
+
+    Each process owns its subdirectory, so a worker only ever deletes files it
+    indexed itself; a process removes its directory at exit, and the
+    directories of processes that died without doing so are swept when
+    another one starts (a forked worker gets its own on first use).
+    """
+
+    def __init__(self, directory: str | None, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.root = directory
+        self.directory = None
+        self._pid = None
+        self._index: OrderedDict = OrderedDict()  # (version, manager) → sha
+        self._sizes: dict = {}                    # sha → bytes
+        self._blobs: dict = {}                    # sha → data (memory mode only)
+        self._lock = threading.Lock()
+        self._key_locks: dict = {}
+        self.hits = 0
+        self.renders = 0
+        self.evictions = 0
+
+    def _attach(self):
+        # Caller holds self._lock. Binds the cache to this process's own
+        # directory; after a fork the parent's index doesn't apply here.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        self._index.clear()
+        self._sizes.clear()
+        self._blobs.clear()
+        self.directory = None
+        if not self.root:
+            return
+        own = os.path.join(self.root, f"pid-{pid}")
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            _sweep_exited(self.root)
+            shutil.rmtree(own, ignore_errors=True)  # a recycled pid's leftovers
+            os.makedirs(own)
+        except OSError:
+            return  # read-only filesystem — fall back to memory
+        self.directory = own
+        atexit.register(shutil.rmtree, own, True)
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.directory, f"{sha}.xlsx")
+
+    def _drop_sha_if_unused(self, sha: str):
+        # Caller holds self._lock.
+        if sha in self._index.values():
+            return
+        self._sizes.pop(sha, None)
+        self._blobs.pop(sha, None)
+        if self.directory:
+            try:
+                os.remove(self._path(sha))
+            except OSError:
+                pass
+
+    def _forget_other_versions(self, version):
+        # Caller holds self._lock.
+        for key in [k for k in self._index if k[0] != version]:
+            self._drop_sha_if_unused(self._index.pop(key))
+
+    def _lookup(self, key):
+        # Caller holds self._lock.
+        sha = self._index.get(key)
+        if sha is None:
+            return None
+        if self.directory and not os.path.exists(self._path(sha)):
+            del self._index[key]  # file vanished (e.g. /tmp cleaned) — re-render
+            self._sizes.pop(sha, None)
+            return None
+        self._index.move_to_end(key)
+        self.hits += 1
+        return self._entry(sha)
+
+    def _entry(self, sha: str) -> dict:
+        if self.directory:
+            return {"sha": sha, "path": self._path(sha), "data": None}
+        return {"sha": sha, "path": None, "data": self._blobs[sha]}
+
+    def _render(self, render) -> tuple[str, int, bytes | None]:
+        """(sha, size, data) of `render(out)`: written straight to a file in
+        the cache directory (data None), or to memory without one."""
+        if not self.directory:
+            buf = io.BytesIO()
+            render(buf)
+            data = buf.getvalue()
+            return hashlib.sha256(data).hexdigest(), len(data), data
+        tmp = os.path.join(self.directory, f"render.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w+b") as fh:
+                render(fh)
+                fh.seek(0)
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                size = fh.tell()
+            sha = digest.hexdigest()
+            os.replace(tmp, self._path(sha))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return sha, size, None
+
+    def _store(self, key, sha: str, size: int, data: bytes | None) -> dict:
+        with self._lock:
+            if sha not in self._sizes:
+                if data is not None:
+                    self._blobs[sha] = data
+                self._sizes[sha] = size
+            self._index[key] = sha
+            self._index.move_to_end(key)
+            while sum(self._sizes.values()) > self.max_bytes and len(self._index) > 1:
+                _, old_sha = self._index.popitem(last=False)
+                self._drop_sha_if_unused(old_sha)
+                self.evictions += 1
+            return self._entry(sha)
+
+    def get_or_render(self, version, manager: str, render) -> dict:
+        """{"sha", "path", "data"} for the export — `render(out)` writes it to
+        a binary file, at most once per (version, manager) even under
+        concurrent requests."""
+        key = (version, manager)
+        with self._lock:
+            self._attach()
+            self._forget_other_versions(version)
+            hit = self._lookup(key)
+            if hit:
+                return hit
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                hit = self._lookup(key)
+                if hit:
+                    return hit
+            try:
+                rendered = self._render(render)
+                self.renders += 1
+                return self._store(key, *rendered)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._attach()
+            return {
+                "storage":   self.directory or "memory",
+                "entries":   len(self._index),
+                "bytes":     sum(self._sizes.values()),
+                "max_bytes": self.max_bytes,
+                "hits":      self.hits,
+                "renders":   self.renders,
+                "evictions": self.evictions,
+            }